@@ -6,12 +6,32 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 
 from .config import DEFAULT_MODEL_NAME, DEFAULT_TEMPERATURE
 from .exceptions import APIKeyError, ConversationError, TopicGenerationError
+from .llm_registry import llm_key, llm_registry
 from .models import TopicStances
 from .utils import get_api_key
 
 logger = logging.getLogger(__name__)
 
 
+def _shared_llm(model_name: str, temperature: float) -> ChatGoogleGenerativeAI:
+    """Get the process-wide Gemini client for a model and temperature.
+
+    Args:
+        model_name: Name of the Gemini model.
+        temperature: Temperature parameter for generation.
+
+    Returns:
+        ChatGoogleGenerativeAI instance from the client registry.
+    """
+    api_key = get_api_key()
+    return llm_registry.get(
+        llm_key(model_name, temperature),
+        lambda: ChatGoogleGenerativeAI(
+            model=model_name, temperature=temperature, api_key=api_key
+        ),
+    )
+
+
 class GeminiAgent:
     """A Gemini-based AI agent for journalist discussions."""
 
@@ -50,16 +70,14 @@ class GeminiAgent:
         """Configure the Gemini LLM.
 
         Returns:
-            Configured ChatGoogleGenerativeAI instance.
+            ChatGoogleGenerativeAI instance shared by every agent with the same
+            model and temperature.
 
         Raises:
             APIKeyError: If the API key is not available.
         """
         try:
-            api_key = get_api_key()
-            return ChatGoogleGenerativeAI(
-                model=self.model_name, temperature=self.temperature, api_key=api_key
-            )
+            return _shared_llm(self.model_name, self.temperature)
         except Exception as e:
             logger.error(f"Failed to configure LLM: {e}")
             raise APIKeyError(f"Failed to configure LLM: {e}") from e
@@ -173,10 +191,7 @@ class GeminiTopicAgent:
             APIKeyError: If the API key is not available.
         """
         try:
-            api_key = get_api_key()
-            llm = ChatGoogleGenerativeAI(
-                model=self.model_name, temperature=self.temperature, api_key=api_key
-            )
+            llm = _shared_llm(self.model_name, self.temperature)
             return llm.with_structured_output(TopicStances)
         except Exception as e:
             logger.error(f"Failed to configure topic LLM: {e}")
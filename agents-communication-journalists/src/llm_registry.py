@@ -0,0 +1,93 @@
+"""Process-wide registry of Gemini chat clients.
+
+Same ``llm_key``/``get``/``stats``/``clear`` API as the registries of the
+supermarket and wholesaler agents.
+"""
+
+import logging
+import threading
+from collections.abc import Callable, Iterable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+LLMKey = tuple[str, float, tuple[str, ...], str]
+
+
+def llm_key(
+    model: str, temperature: float, tools: Iterable = (), tools_version: str = ""
+) -> LLMKey:
+    """Build the registry key of a chat client.
+
+    Args:
+        model: Name of the Gemini model.
+        temperature: Temperature parameter for generation.
+        tools: Tools bound to the client, as tool objects or names.
+        tools_version: Tells apart tools whose names are unchanged but whose
+            schemas differ.
+
+    Returns:
+        Hashable key identifying the client.
+    """
+    names = tuple(sorted(getattr(tool, "name", None) or str(tool) for tool in tools))
+    return (model, float(temperature), names, tools_version)
+
+
+class LLMClientRegistry:
+    """Shares chat clients between the agents and Streamlit sessions of a process.
+
+    Each ChatGoogleGenerativeAI opens its own HTTP transports, so a client is
+    built once per key and reused by every agent that asks for the same key.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        # Reentrant so a factory can build on another registry entry
+        self._lock = threading.RLock()
+        self._clients: dict[LLMKey, Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: LLMKey, factory: Callable[[], Any]) -> Any:
+        """Get the client for a key, building it on first use.
+
+        Args:
+            key: Key returned by ``llm_key``.
+            factory: Builds the client when the key is not registered yet.
+
+        Returns:
+            The shared client.
+        """
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self.hits += 1
+                return client
+            client = factory()
+            self._clients[key] = client
+            self.misses += 1
+        logger.info(f"Created LLM client {key}")
+        return client
+
+    def stats(self) -> dict[str, int]:
+        """Get the pool statistics.
+
+        Returns:
+            Number of clients and of lookups served from the pool or not.
+        """
+        with self._lock:
+            return {
+                "clients": len(self._clients),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def clear(self) -> None:
+        """Forget every client and reset the counters, e.g. after the API key changed."""
+        with self._lock:
+            self._clients.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+llm_registry = LLMClientRegistry()
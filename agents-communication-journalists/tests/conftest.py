@@ -4,6 +4,16 @@ from unittest.mock import Mock, patch
 
 import pytest
 
+from src.llm_registry import llm_registry
+
+
+@pytest.fixture(autouse=True)
+def clear_llm_registry():
+    """Keep clients built with mocked classes from leaking between tests."""
+    llm_registry.clear()
+    yield
+    llm_registry.clear()
+
 
 @pytest.fixture
 def mock_streamlit():
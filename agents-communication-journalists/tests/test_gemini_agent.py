@@ -6,6 +6,7 @@ import pytest
 
 from src.exceptions import APIKeyError, ConversationError
 from src.gemini_agent import GeminiAgent
+from src.llm_registry import llm_registry
 
 
 class TestGeminiAgent:
@@ -97,3 +98,23 @@ class TestGeminiAgent:
 
         with pytest.raises(ConversationError):
             agent.generate_response("Test prompt", "Test history")
+
+
+class TestLLMRegistry:
+    """Test the sharing of Gemini clients between agents."""
+
+    @patch('src.gemini_agent.get_api_key')
+    @patch('src.gemini_agent.ChatGoogleGenerativeAI')
+    def test_agents_share_client(self, mock_chat_llm, mock_get_api_key):
+        """Agents with the same model and temperature reuse one client."""
+        mock_get_api_key.return_value = "fake-api-key"
+        mock_chat_llm.side_effect = lambda **kwargs: Mock()
+
+        first = GeminiAgent("Agent1")
+        second = GeminiAgent("Agent2")
+        other = GeminiAgent("Agent3", temperature=0.2)
+
+        assert first.llm is second.llm
+        assert other.llm is not first.llm
+        assert mock_chat_llm.call_count == 2
+        assert llm_registry.stats() == {"clients": 2, "hits": 1, "misses": 2}
@@ -41,6 +41,7 @@ chat_ui.render_chat_history()
 
 # Handle user input
 if prompt := chat_ui.get_user_input():
-    with st.spinner("El agente está pensando..."):
-        run_async(st.session_state.chat_service.get_agent_response())
-        st.rerun()
+    run_async(chat_ui.render_streaming_response(
+        st.session_state.chat_service.stream_agent_response()
+    ))
+    st.rerun()
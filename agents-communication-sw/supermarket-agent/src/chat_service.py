@@ -1,112 +1,179 @@
 """
 Chat service for handling conversation logic and tool execution.
 """
+import asyncio
 import streamlit as st
-from typing import List
-from langchain_core.messages import AIMessage, ToolMessage
+from typing import Any, AsyncIterator, Dict, List
+from langchain_core.messages import AIMessage, ToolMessage, message_chunk_to_message
 import logging
 
 from .utils import convert_args_to_int
+from .config import TOOL_CALL_CONCURRENCY, TOOL_CALL_TIMEOUT
 from .exceptions import WholesalerAPIError
+from .models import ChatEvent
+from .resilience import CircuitOpenError
 
 logger = logging.getLogger(__name__)
 
+GEMINI_UNAVAILABLE_MESSAGE = (
+    "El asistente no está disponible temporalmente. "
+    "Por favor, inténtalo de nuevo en unos segundos."
+)
+
 
 class ChatService:
     """Service for handling chat conversations and tool execution."""
 
-    def __init__(self, agent):
+    def __init__(
+        self,
+        agent,
+        max_concurrency: int = TOOL_CALL_CONCURRENCY,
+        tool_timeout: float = TOOL_CALL_TIMEOUT,
+    ):
         self.agent = agent
+        self.max_concurrency = max_concurrency
+        self.tool_timeout = tool_timeout
 
     async def get_agent_response(self) -> None:
+        """Get the agent's final answer without rendering the intermediate events."""
+        async for _ in self.stream_agent_response():
+            pass
+
+    async def stream_agent_response(self) -> AsyncIterator[ChatEvent]:
         """
         Gets a final response from the agent, handling all intermediate tool calls.
-        This function loops until a response without tool calls is received.
-        It includes a workaround for an API issue where messages with empty content
-        are rejected, by replacing empty content in tool-calling messages with a space.
+        This function loops until a response without tool calls is received, and
+        stores the whole turn in the session history.
+
+        Text tokens are yielded as Gemini streams them, and every tool call
+        yields a start event and an end event when its result is ready.
         """
         history = list(st.session_state.messages)
 
         while True:
-            response = await self.agent.generate_response(history)
-
-            # WORKAROUND: If the response has tool calls but empty content, the next
-            # API call will fail. We create a new AIMessage with a single space
-            # as content to prevent this error.
-            if response.tool_calls and not response.content:
-                response = AIMessage(
-                    content=" ",  # Use a space to avoid empty content error
-                    tool_calls=response.tool_calls,
-                    invalid_tool_calls=response.invalid_tool_calls,
-                    response_metadata=response.response_metadata,
-                    usage_metadata=response.usage_metadata,
-                    id=response.id,
-                    name=response.name,
-                )
+            response = None
+            try:
+                async for chunk in self.agent.stream_response(history):
+                    response = chunk if response is None else response + chunk
+                    if chunk.text:
+                        yield ChatEvent(kind="token", text=chunk.text)
+            except CircuitOpenError:
+                logger.warning("Gemini circuit is open, skipping the LLM call")
+                history.append(AIMessage(content=GEMINI_UNAVAILABLE_MESSAGE))
+                yield ChatEvent(kind="token", text=GEMINI_UNAVAILABLE_MESSAGE)
+                break
+            if response is None:
+                break
 
+            response = self._fix_empty_content(message_chunk_to_message(response))
             history.append(response)
-
-            # If there are no tool calls, we have the final answer.
             if not response.tool_calls:
                 break
 
-            # If there are tool calls, execute them and add results to history.
-            tool_results = await self._execute_tool_calls(response.tool_calls)
-            history.extend(tool_results)
+            for tool_call in response.tool_calls:
+                yield ChatEvent(kind="tool_start", tool_name=tool_call["name"])
+            tasks = self._start_tool_calls(response.tool_calls)
+            names = {tool_call["id"]: tool_call["name"] for tool_call in response.tool_calls}
+            for finished in asyncio.as_completed(tasks):
+                tool_message = await finished
+                yield ChatEvent(
+                    kind="tool_end", tool_name=names.get(tool_message.tool_call_id, "")
+                )
+            history.extend(task.result() for task in tasks)
 
-        # Update the session state with the complete conversation history.
         st.session_state.messages = history
 
-    async def _execute_tool_calls(self, tool_calls: List) -> List[ToolMessage]:
-        """Execute tool calls and return tool messages."""
+    @staticmethod
+    def _fix_empty_content(response: AIMessage) -> AIMessage:
+        """Give tool-calling messages without text a single space as content.
+
+        WORKAROUND: If the response has tool calls but empty content, the next
+        API call will fail.
+        """
+        if response.tool_calls and not response.content:
+            response = AIMessage(
+                content=" ",  # Use a space to avoid empty content error
+                tool_calls=response.tool_calls,
+                invalid_tool_calls=response.invalid_tool_calls,
+                response_metadata=response.response_metadata,
+                usage_metadata=response.usage_metadata,
+                id=response.id,
+                name=response.name,
+            )
+        return response
+
+    def _start_tool_calls(self, tool_calls: List) -> List[asyncio.Task]:
+        """Start every tool call concurrently, bounded by ``max_concurrency``.
+
+        The tasks keep the order of ``tool_calls`` so each ToolMessage can
+        follow its matching tool_call_id.
+        """
         available_tools = {tool.name: tool for tool in self.agent.tools}
-        tool_results = []
-
-        for tool_call in tool_calls:
-            tool_to_invoke = available_tools.get(tool_call["name"])
-            if tool_to_invoke:
-                try:
-                    converted_args = convert_args_to_int(tool_call["args"])
-                    tool_output = await tool_to_invoke.ainvoke(converted_args)
-                    tool_output_str = (
-                        str(tool_output)
-                        if tool_output is not None and str(tool_output).strip() != ""
-                        else "OK"
-                    )
-                    tool_results.append(
-                        ToolMessage(
-                            content=tool_output_str,
-                            tool_call_id=tool_call["id"]
-                        )
-                    )
-                except WholesalerAPIError as e:
-                    logger.warning(
-                        f"Wholesaler API error for tool {tool_call['name']}: {e}"
-                    )
-                    tool_results.append(
-                        ToolMessage(
-                            content=f"Servicio no disponible temporalmente: {str(e)}",
-                            tool_call_id=tool_call["id"]
-                        )
-                    )
-                except Exception as e:
-                    logger.error(f"Error executing tool {tool_call['name']}: {e}")
-                    tool_results.append(
-                        ToolMessage(
-                            content=f"Error ejecutando herramienta: {str(e)}",
-                            tool_call_id=tool_call["id"]
-                        )
-                    )
-            else:
-                error_message = (
-                    f"Error: Tool '{tool_call['name']}' was called but is not "
-                    "available."
-                )
-                tool_results.append(
-                    ToolMessage(
-                        content=error_message,
-                        tool_call_id=tool_call['id']
-                    )
-                )
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        return [
+            asyncio.ensure_future(
+                self._execute_tool_call(tool_call, available_tools, semaphore)
+            )
+            for tool_call in tool_calls
+        ]
 
-        return tool_results
+    async def _execute_tool_call(
+        self,
+        tool_call: Dict[str, Any],
+        available_tools: Dict[str, Any],
+        semaphore: asyncio.Semaphore,
+    ) -> ToolMessage:
+        """Execute a single tool call, turning any failure into a ToolMessage."""
+        tool_to_invoke = available_tools.get(tool_call["name"])
+        if not tool_to_invoke:
+            error_message = (
+                f"Error: Tool '{tool_call['name']}' was called but is not "
+                "available."
+            )
+            return ToolMessage(
+                content=error_message,
+                tool_call_id=tool_call['id']
+            )
+
+        try:
+            converted_args = convert_args_to_int(tool_call["args"])
+            async with semaphore:
+                tool_output = await asyncio.wait_for(
+                    tool_to_invoke.ainvoke(converted_args),
+                    timeout=self.tool_timeout,
+                )
+            tool_output_str = (
+                str(tool_output)
+                if tool_output is not None and str(tool_output).strip() != ""
+                else "OK"
+            )
+            return ToolMessage(
+                content=tool_output_str,
+                tool_call_id=tool_call["id"]
+            )
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Tool {tool_call['name']} timed out after {self.tool_timeout}s"
+            )
+            return ToolMessage(
+                content=(
+                    "Tiempo de espera agotado ejecutando herramienta "
+                    f"'{tool_call['name']}'"
+                ),
+                tool_call_id=tool_call["id"]
+            )
+        except WholesalerAPIError as e:
+            logger.warning(
+                f"Wholesaler API error for tool {tool_call['name']}: {e}"
+            )
+            return ToolMessage(
+                content=f"Servicio no disponible temporalmente: {str(e)}",
+                tool_call_id=tool_call["id"]
+            )
+        except Exception as e:
+            logger.error(f"Error executing tool {tool_call['name']}: {e}")
+            return ToolMessage(
+                content=f"Error ejecutando herramienta: {str(e)}",
+                tool_call_id=tool_call["id"]
+            )
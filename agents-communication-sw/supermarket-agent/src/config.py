@@ -11,14 +11,54 @@ DEFAULT_PERSONALITY = "un amigable y servicial agente de supermercado"
 # A2A configuration
 WHOLESALER_A2A_URL = "http://localhost:8586"
 WHOLESALER_TIMEOUT = 30.0
+WHOLESALER_MAX_CONNECTIONS = 20
+WHOLESALER_MAX_KEEPALIVE_CONNECTIONS = 10
+WHOLESALER_KEEPALIVE_EXPIRY = 30.0
+WHOLESALER_AGENT_CARD_TTL = 300.0
+# Artifact streamed by the wholesaler in chunks of allocated products
+RESTOCK_ARTIFACT_NAME = "restockable_products"
+
+# Tool execution configuration
+TOOL_CALL_CONCURRENCY = 4
+TOOL_CALL_TIMEOUT = 45.0
+
+# History sent to Gemini: the last turns go as they are, older tool results
+# are summarized and the oldest turns dropped over the (estimated) budget
+HISTORY_TOKEN_BUDGET = 8000
+HISTORY_RECENT_TURNS = 2
+HISTORY_TOOL_SUMMARY_CHARS = 300
+HISTORY_SUMMARY_MAX_CHARS = 2000
+
+# Gemini circuit breaker
+GEMINI_BREAKER_FAILURE_THRESHOLD = 5
+GEMINI_BREAKER_RECOVERY_TIMEOUT = 30.0
 
 # MCP Server configuration
+MCP_SERVER_NAME = "supermarket"
+# "stdio" starts the prebuilt server binary as a child process;
+# "streamable_http" connects to a server started with `make local-mcp-http`
+MCP_TRANSPORT = "stdio"
+MCP_SERVER_URL = "http://localhost:8087/mcp"
+# Covers a `go run` compile when the binary has not been built
+MCP_CONNECT_TIMEOUT = 60.0
+MCP_CALL_TIMEOUT = 30.0
+MCP_HEALTH_CHECK_INTERVAL = 30.0
+
+# Inventory listing reused between turns; buy/restock calls drop it at once
+INVENTORY_CACHE_TTL = 10.0
+INVENTORY_LIST_TOOL = "list_items"
+INVENTORY_WRITE_TOOLS = ("buy_items", "restock_items")
+
 def get_mcp_server_path():
     """Get the path to the MCP server relative to the current file"""
     return os.path.abspath(
         os.path.join(os.path.dirname(__file__), '..', '..', 'supermarket-api')
     )
 
+def get_mcp_server_binary():
+    """Get the path of the MCP server binary built by `make build-mcp`"""
+    return os.path.join(get_mcp_server_path(), 'mcp-server')
+
 # System prompts
 AGENT_SYSTEM_PROMPT = """
 Eres un agente de IA que representa a un supermercado.
@@ -47,9 +87,18 @@ usuario esté siempre informado y evita enviar mensajes vacíos.
 2.  **Uso encadenado:** A veces necesitarás hacer varias llamadas a
 diferentes herramientas para completar una tarea. Por ejemplo, para
 comprar un producto, puede que primero necesites buscar su ID con la
-herramienta de listar productos y luego usar la herramienta de compra.
+herramienta find_products y luego usar la herramienta de compra.
 3.  **Búsqueda de IDs:** Si necesitas el ID de algún producto para
 otra herramienta (como comprar o reponer), utiliza primero la
-herramienta de listado de productos para encontrarlo. No asumas que
-conoces el ID.
+herramienta find_products con sus nombres para encontrarlo. No asumas
+que conoces el ID. Usa el listado completo de productos sólo cuando
+necesites el inventario entero, por ejemplo para revisar qué productos
+hay que reponer.
+"""
+
+# Appended to the system prompt when old turns are left out of the history
+HISTORY_SUMMARY_PROMPT = """
+Resumen de la parte anterior de la conversación (los resultados de
+herramientas antiguos no se incluyen; vuelve a consultarlas si los necesitas):
+{summary}
 """
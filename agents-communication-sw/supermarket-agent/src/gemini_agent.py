@@ -3,26 +3,61 @@ Gemini agent for the supermarket application.
 """
 import streamlit as st
 from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import SystemMessage
-from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_core.messages import AIMessageChunk, SystemMessage
+from langchain_core.utils.function_calling import convert_to_openai_tool
 import logging
+import threading
+from typing import AsyncIterator
 
 from .models import AgentConfig
-from .config import get_mcp_server_path, AGENT_SYSTEM_PROMPT
-from .tools import wholesaler_restock
+from .config import (
+    AGENT_SYSTEM_PROMPT,
+    HISTORY_SUMMARY_PROMPT,
+    GEMINI_BREAKER_FAILURE_THRESHOLD,
+    GEMINI_BREAKER_RECOVERY_TIMEOUT,
+)
+from .tools import find_products, wholesaler_restock
 from .exceptions import AgentInitializationError
+from .history import HistoryManager
+from .llm_registry import llm_key, llm_registry
+from .mcp_manager import get_mcp_manager
+from .resilience import CircuitBreaker
 
 logger = logging.getLogger(__name__)
 
+# Shared by every chat session of the process
+gemini_breaker = CircuitBreaker(
+    "gemini",
+    failure_threshold=GEMINI_BREAKER_FAILURE_THRESHOLD,
+    recovery_timeout=GEMINI_BREAKER_RECOVERY_TIMEOUT,
+)
+
+# Tool schemas converted for Gemini, by tool names and MCP tools version
+_tool_schemas = {}
+_tool_schemas_lock = threading.Lock()
+
+
+def get_tool_schemas(tools, tools_version: str = ""):
+    """Return the function-calling schemas of ``tools``, converted once per process."""
+    key = (tuple(tool.name for tool in tools), tools_version)
+    with _tool_schemas_lock:
+        schemas = _tool_schemas.get(key)
+        if schemas is None:
+            schemas = [convert_to_openai_tool(tool) for tool in tools]
+            _tool_schemas[key] = schemas
+        return schemas
+
 class GeminiAgent:
     """Gemini-based agent for supermarket operations."""
 
     def __init__(self, config: AgentConfig):
         self.config = config
         self.tools = []
+        self.tools_version = ""
         self.llm = None
-        self.mcp_server_path = get_mcp_server_path()
-        self.mcp_client = None
+        self.mcp_client = get_mcp_manager()
+        self.breaker = gemini_breaker
+        self.history = HistoryManager()
 
     @classmethod
     def create_default(cls, name: str, personality: str, stance: str = ""):
@@ -52,25 +87,14 @@ class GeminiAgent:
     async def _initialize_mcp_tools(self):
         """Initialize MCP tools and fallback to wholesaler tool if needed."""
         try:
-            logger.info(f"Attempting to connect to MCP server at: {self.mcp_server_path}")
-
-            # Create MCP client for the supermarket API
-            self.mcp_client = MultiServerMCPClient({
-                "supermarket": {
-                    "command": "go",
-                    "args": ["run", "./cmd/mcp-server/mcp_server.go"],
-                    "cwd": self.mcp_server_path,
-                    "transport": "stdio"
-                }
-            })
-
-            logger.info("MCP client created, attempting to get tools...")
-            # Get tools from MCP client (supermarket API)
+            # The MCP session is shared by every chat session of the process
+            logger.info("Getting tools from the shared MCP connection...")
             mcp_tools = await self.mcp_client.get_tools()
             logger.info(f"Retrieved {len(mcp_tools)} MCP tools")
 
-            # Add our custom wholesaler tool
-            self.tools = mcp_tools + [wholesaler_restock]
+            # Add the cached product lookup and our custom wholesaler tool
+            self.tools = mcp_tools + [find_products, wholesaler_restock]
+            self.tools_version = self.mcp_client.tools_version
             logger.info("MCP tools initialized successfully")
         except Exception as e:
             logger.warning(f"MCP client initialization failed: {type(e).__name__}: {e}")
@@ -79,22 +103,40 @@ class GeminiAgent:
             self.tools = [wholesaler_restock]
 
     def _configure_llm(self):
-        """Configure the language model with tools."""
+        """Configure the language model with tools.
+
+        The client and its tool binding come from the process-wide registry,
+        so agents with the same model, temperature and tools share them, and
+        the tool schemas are converted only once per process. Calls go
+        through the registry, which runs them on its own event loop.
+        """
         try:
-            llm = ChatGoogleGenerativeAI(
-                model=self.config.model_name,
-                temperature=self.config.temperature,
-                api_key=st.secrets["GOOGLE_API_KEY"]
+            model, temperature = self.config.model_name, self.config.temperature
+            api_key = st.secrets["GOOGLE_API_KEY"]
+
+            def build_client():
+                return ChatGoogleGenerativeAI(
+                    model=model, temperature=temperature, api_key=api_key
+                )
+
+            def bind_tools():
+                client = llm_registry.get(llm_key(model, temperature), build_client)
+                # Schemas are already converted, binding them is cheap
+                return client.bind_tools(get_tool_schemas(self.tools, self.tools_version))
+
+            llm = llm_registry.get(
+                llm_key(model, temperature, self.tools, self.tools_version), bind_tools
             )
-            return llm.bind_tools(self.tools)
+            logger.info(f"LLM client pool: {llm_registry.stats()}")
+            return llm
         except Exception as e:
             logger.error(f"Failed to configure LLM: {e}")
             raise AgentInitializationError(
                 f"LLM configuration failed: {e}"
             ) from e
 
-    async def generate_response(self, history):
-        """Generate response from the agent."""
+    def _build_messages(self, history):
+        """Prepend the system prompt to the windowed conversation history."""
         if not self.llm:
             raise AgentInitializationError(
                 "Agent not initialized. Call initialize() first."
@@ -105,7 +147,21 @@ class GeminiAgent:
             personality=self.config.personality
         )
 
-        messages = [SystemMessage(content=prompt)]
-        messages.extend(history)
+        summary, window = self.history.window(history)
+        if summary:
+            prompt += HISTORY_SUMMARY_PROMPT.format(summary=summary)
 
-        return await self.llm.ainvoke(messages)
+        messages = [SystemMessage(content=prompt)]
+        messages.extend(window)
+        return messages
+
+    async def stream_response(self, history) -> AsyncIterator[AIMessageChunk]:
+        """Generate a response from the agent, yielding chunks as they arrive.
+
+        Raises:
+            CircuitOpenError: If Gemini has been failing and is not being called.
+        """
+        messages = self._build_messages(history)
+        async with self.breaker.guard():
+            async for chunk in llm_registry.astream(self.llm, messages):
+                yield chunk
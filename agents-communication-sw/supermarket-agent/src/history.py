@@ -0,0 +1,162 @@
+"""
+Token-budgeted view of the chat history sent to Gemini.
+"""
+import json
+import logging
+from typing import List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+
+from .config import (
+    HISTORY_RECENT_TURNS,
+    HISTORY_SUMMARY_MAX_CHARS,
+    HISTORY_TOKEN_BUDGET,
+    HISTORY_TOOL_SUMMARY_CHARS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Rough average for Spanish text and JSON; only used to stay under the budget
+CHARS_PER_TOKEN = 4
+# Longest user or agent message kept in the summary of dropped turns
+SUMMARY_LINE_CHARS = 200
+
+
+def estimate_tokens(message: BaseMessage) -> int:
+    """Approximate number of prompt tokens used by a message."""
+    size = len(message.text)
+    if isinstance(message, AIMessage):
+        size += sum(
+            len(call["name"]) + len(json.dumps(call["args"]))
+            for call in message.tool_calls
+        )
+    return size // CHARS_PER_TOKEN + 1
+
+
+def _shorten(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit].rstrip() + "…"
+
+
+def summarize_tool_output(content: str, limit: int = HISTORY_TOOL_SUMMARY_CHARS) -> str:
+    """Short version of a tool result, e.g. of a full inventory listing."""
+    if len(content) <= limit:
+        return content
+    try:
+        data = json.loads(content)
+    except ValueError:
+        data = None
+    prefix = f"[{len(data)} elementos] " if isinstance(data, list) else ""
+    return (
+        f"{prefix}{_shorten(content, limit)} "
+        f"(resultado resumido, {len(content)} caracteres en total)"
+    )
+
+
+def _split_turns(history: List[BaseMessage]) -> List[int]:
+    """Indexes where turns start: each user message opens a new one."""
+    starts = [i for i, message in enumerate(history) if isinstance(message, HumanMessage)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    return starts
+
+
+class HistoryManager:
+    """Builds the part of a conversation that is sent to the model.
+
+    The last ``recent_turns`` turns are sent as they are. Older turns keep
+    their messages but tool results are replaced by short summaries, and
+    once the estimated size goes over ``token_budget`` the oldest turns are
+    dropped and described in a running summary instead.
+
+    Compacted tool results and the summary are cached, so each new turn only
+    processes the messages it added. Once dropped, turns stay dropped: the
+    start of the prompt does not change from one call to the next.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = HISTORY_TOKEN_BUDGET,
+        recent_turns: int = HISTORY_RECENT_TURNS,
+        summary_max_chars: int = HISTORY_SUMMARY_MAX_CHARS,
+    ):
+        self.token_budget = token_budget
+        self.recent_turns = recent_turns
+        self.summary_max_chars = summary_max_chars
+        self._compacted = {}
+        self._first: Optional[BaseMessage] = None
+        self._summarized = 0
+        self._summary_lines: List[str] = []
+
+    def _compact(self, message: BaseMessage) -> BaseMessage:
+        if not isinstance(message, ToolMessage):
+            return message
+        compacted = self._compacted.get(message.tool_call_id)
+        if compacted is None:
+            compacted = message.model_copy(
+                update={"content": summarize_tool_output(message.text)}
+            )
+            self._compacted[message.tool_call_id] = compacted
+        return compacted
+
+    def _summarize(self, messages: List[BaseMessage]) -> None:
+        for message in messages:
+            if isinstance(message, HumanMessage):
+                self._summary_lines.append(
+                    f"- Usuario: {_shorten(message.text, SUMMARY_LINE_CHARS)}"
+                )
+            elif isinstance(message, AIMessage):
+                if message.text.strip():
+                    self._summary_lines.append(
+                        f"- Agente: {_shorten(message.text, SUMMARY_LINE_CHARS)}"
+                    )
+                for call in message.tool_calls:
+                    args = _shorten(json.dumps(call["args"], ensure_ascii=False), 80)
+                    self._summary_lines.append(f"- Agente usó {call['name']}({args})")
+        # Keep the most recent lines within the limit
+        size = 0
+        for i in range(len(self._summary_lines) - 1, -1, -1):
+            size += len(self._summary_lines[i]) + 1
+            if size > self.summary_max_chars:
+                del self._summary_lines[: i + 1]
+                break
+
+    def _reset(self, history: List[BaseMessage]) -> None:
+        self._compacted.clear()
+        self._first = history[0] if history else None
+        self._summarized = 0
+        self._summary_lines = []
+
+    def window(self, history: List[BaseMessage]) -> Tuple[str, List[BaseMessage]]:
+        """Messages to send for ``history`` and the summary of dropped turns.
+
+        Returns:
+            The summary (empty when nothing was dropped) and the messages.
+        """
+        if not history or history[0] is not self._first or len(history) < self._summarized:
+            # Another conversation, or the history was cleared
+            self._reset(history)
+
+        starts = _split_turns(history)
+        recent = starts[max(len(starts) - self.recent_turns, 0)]
+        used = sum(estimate_tokens(message) for message in history[recent:])
+
+        # Walk older turns from the newest, while they fit in the budget
+        cut = recent
+        for start in reversed(starts):
+            if start >= recent or start < self._summarized:
+                continue
+            cost = sum(estimate_tokens(self._compact(m)) for m in history[start:cut])
+            if used + cost > self.token_budget:
+                break
+            used += cost
+            cut = start
+        cut = max(cut, self._summarized)
+
+        if cut > self._summarized:
+            self._summarize(history[self._summarized:cut])
+            self._summarized = cut
+            logger.info(f"History window starts at message {cut} of {len(history)}")
+
+        messages = [self._compact(m) for m in history[cut:recent]] + history[recent:]
+        return "\n".join(self._summary_lines), messages
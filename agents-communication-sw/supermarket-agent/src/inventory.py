@@ -0,0 +1,124 @@
+"""
+Short-lived snapshot of the supermarket inventory, read through the MCP list tool.
+"""
+import difflib
+import json
+import logging
+import threading
+import time
+import unicodedata
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from mcp.types import CallToolResult
+
+from .config import INVENTORY_CACHE_TTL
+from .exceptions import ToolExecutionError
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase a product name and strip its accents and extra spaces."""
+    decomposed = unicodedata.normalize("NFKD", name)
+    plain = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(plain.lower().split())
+
+
+def parse_items(result: CallToolResult) -> List[Dict[str, Any]]:
+    """Items of a ``list_items`` result, which the server sends as JSON text."""
+    text = "".join(getattr(block, "text", "") for block in result.content)
+    items = json.loads(text) if text.strip() else []
+    return items if isinstance(items, list) else []
+
+
+class _Snapshot:
+    """One ``list_items`` result with its items indexed by normalized name."""
+
+    def __init__(self, result: CallToolResult):
+        self.result = result
+        self.taken_at = time.monotonic()
+        self.items = [] if result.isError else parse_items(result)
+        self.by_name = {normalize_name(str(item.get("name", ""))): item for item in self.items}
+
+    def find(self, name: str) -> List[Dict[str, Any]]:
+        """Items matching ``name``: exact name, else partial, else close matches."""
+        key = normalize_name(name)
+        if key in self.by_name:
+            return [self.by_name[key]]
+        partial = [item for n, item in self.by_name.items() if key and n and (key in n or n in key)]
+        if partial:
+            return partial
+        close = difflib.get_close_matches(key, self.by_name, n=3, cutoff=0.75)
+        return [self.by_name[n] for n in close]
+
+
+class InventoryCache:
+    """Read-through cache of the inventory listing, shared by every chat session.
+
+    A listing is reused for ``ttl`` seconds and dropped as soon as stock
+    changes through a buy or restock call. Fetches that were already running
+    when the cache was invalidated do not store their (possibly stale) result.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], Awaitable[CallToolResult]],
+        ttl: float = INVENTORY_CACHE_TTL,
+    ):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._snapshot: Optional[_Snapshot] = None
+        self._generation = 0
+
+    def _fresh(self) -> Optional[_Snapshot]:
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and time.monotonic() - snapshot.taken_at < self.ttl:
+                self.hits += 1
+                return snapshot
+            self.misses += 1
+            return None
+
+    async def _get(self) -> _Snapshot:
+        snapshot = self._fresh()
+        if snapshot is not None:
+            return snapshot
+
+        with self._lock:
+            generation = self._generation
+        result = await self.fetch()
+        snapshot = _Snapshot(result)
+        if not result.isError:
+            with self._lock:
+                if self._generation == generation:
+                    self._snapshot = snapshot
+        return snapshot
+
+    async def get_result(self) -> CallToolResult:
+        """The ``list_items`` result, from the cache when it is fresh."""
+        return (await self._get()).result
+
+    async def find(self, name: str) -> List[Dict[str, Any]]:
+        """Look products up by name without sending the whole listing to the model.
+
+        Raises:
+            ToolExecutionError: If the inventory could not be listed.
+        """
+        snapshot = await self._get()
+        if snapshot.result.isError:
+            raise ToolExecutionError("The inventory could not be listed")
+        return snapshot.find(name)
+
+    def invalidate(self) -> None:
+        """Forget the snapshot, e.g. after stock was bought or restocked."""
+        with self._lock:
+            self._snapshot = None
+            self._generation += 1
+        logger.debug("Inventory snapshot invalidated")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,132 @@
+"""
+Process-wide registry of chat model clients.
+
+The wholesaler has the same ``llm_key``/``get``/``stats``/``clear`` API
+without ``ainvoke``/``astream``: each of its workers runs a single loop.
+"""
+import asyncio
+import logging
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LLMKey = Tuple[str, float, Tuple[str, ...], str]
+
+
+def llm_key(
+    model: str, temperature: float, tools: Iterable = (), tools_version: str = ""
+) -> LLMKey:
+    """Registry key of a chat model: model name, temperature and bound tools.
+
+    ``tools`` may be tool objects or names. ``tools_version`` tells apart
+    tools whose names are unchanged but whose schemas differ.
+    """
+    names = tuple(sorted(getattr(tool, "name", None) or str(tool) for tool in tools))
+    return (model, float(temperature), names, tools_version)
+
+
+class LLMClientRegistry:
+    """Shares chat model clients between the agents and sessions of a process.
+
+    Every ChatGoogleGenerativeAI opens its own HTTP transports, so a client is
+    built once per key and reused. Async transports are bound to the event
+    loop that first uses them, and each Streamlit session runs its own loop,
+    so async calls made through ``ainvoke`` and ``astream`` run on a
+    background loop owned by the registry and are forwarded to the caller's
+    loop. Clients never hold on to the callers' loops.
+    """
+
+    def __init__(self):
+        # Reentrant so a factory can build on another registry entry
+        self._lock = threading.RLock()
+        self._clients: Dict[LLMKey, Any] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: LLMKey, factory: Callable[[], Any]) -> Any:
+        """Return the client for ``key``, building it with ``factory`` on first use."""
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self.hits += 1
+                return client
+            client = factory()
+            self._clients[key] = client
+            self.misses += 1
+        logger.info(f"Created LLM client {key}")
+        return client
+
+    def _start(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="llm-clients", daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    async def ainvoke(self, runnable: Any, input: Any, **kwargs) -> Any:
+        """``runnable.ainvoke(input)`` on the registry loop, awaited from any loop."""
+        future = asyncio.run_coroutine_threadsafe(
+            runnable.ainvoke(input, **kwargs), self._start()
+        )
+        # Cancelling the caller cancels the call on the registry loop too
+        return await asyncio.wrap_future(future)
+
+    async def astream(self, runnable: Any, input: Any, **kwargs) -> AsyncIterator[Any]:
+        """``runnable.astream(input)`` on the registry loop, iterated from any loop."""
+        caller = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        def put(item):
+            try:
+                caller.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                pass  # The caller's loop is already closed
+
+        async def pump():
+            try:
+                async for chunk in runnable.astream(input, **kwargs):
+                    put(chunk)
+            except BaseException as e:
+                put(e)
+                raise
+            put(done)
+
+        future = asyncio.run_coroutine_threadsafe(pump(), self._start())
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    return
+                if isinstance(item, BaseException):
+                    if isinstance(item, asyncio.CancelledError):
+                        raise asyncio.CancelledError()
+                    raise item
+                yield item
+        finally:
+            future.cancel()
+
+    def stats(self) -> Dict[str, int]:
+        """Number of clients and lookups served from the pool."""
+        with self._lock:
+            return {
+                "clients": len(self._clients),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def clear(self) -> None:
+        """Forget every client and reset the counters, e.g. after the API key changed."""
+        with self._lock:
+            self._clients.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+llm_registry = LLMClientRegistry()
@@ -0,0 +1,328 @@
+"""
+Long-lived MCP connection to the supermarket API, shared by every chat session.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+import anyio
+from langchain_core.tools import BaseTool
+from langchain_mcp_adapters.sessions import create_session
+from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
+from mcp import ClientSession, McpError
+from mcp.types import CONNECTION_CLOSED
+
+from .config import (
+    MCP_CALL_TIMEOUT,
+    INVENTORY_LIST_TOOL,
+    INVENTORY_WRITE_TOOLS,
+    MCP_CONNECT_TIMEOUT,
+    MCP_HEALTH_CHECK_INTERVAL,
+    MCP_SERVER_NAME,
+    MCP_SERVER_URL,
+    MCP_TRANSPORT,
+    get_mcp_server_binary,
+    get_mcp_server_path,
+)
+from .exceptions import MCPConnectionError
+from .inventory import InventoryCache
+from .models import MCPServerConfig
+
+logger = logging.getLogger(__name__)
+
+# Errors meaning the session's streams are gone, as opposed to a failed call
+_TRANSPORT_ERRORS = (
+    anyio.BrokenResourceError,
+    anyio.ClosedResourceError,
+    anyio.EndOfStream,
+    OSError,
+)
+
+
+def get_mcp_connection() -> Dict[str, Any]:
+    """Connection settings of the supermarket MCP server.
+
+    With the stdio transport the prebuilt binary (``make build-mcp`` in
+    supermarket-api) is started; ``go run`` is only used when it is missing.
+    """
+    if MCP_TRANSPORT == "streamable_http":
+        return {"transport": "streamable_http", "url": MCP_SERVER_URL}
+
+    binary = get_mcp_server_binary()
+    if os.path.exists(binary):
+        server = MCPServerConfig(command=binary, args=[], cwd=get_mcp_server_path())
+    else:
+        logger.warning(
+            f"MCP server binary not found at {binary}, falling back to 'go run' "
+            "(run 'make build-mcp' in supermarket-api to avoid compiling on start)"
+        )
+        server = MCPServerConfig(
+            command="go",
+            args=["run", "./cmd/mcp-server/mcp_server.go"],
+            cwd=get_mcp_server_path(),
+        )
+    return {"transport": "stdio", **server.model_dump()}
+
+
+def tools_version(tools) -> str:
+    """Hash of the names, descriptions and input schemas of MCP tools."""
+    payload = json.dumps(
+        [[tool.name, tool.description, tool.inputSchema] for tool in tools],
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+class _SessionProxy:
+    """Stands in for a ClientSession in tools, forwarding calls to the manager."""
+
+    def __init__(self, manager: "MCPConnectionManager"):
+        self.manager = manager
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any], **kwargs):
+        return await self.manager.call_tool(name, arguments)
+
+
+class MCPConnectionManager:
+    """One MCP session shared by every chat session of the process.
+
+    Stdio pipes and HTTP streams belong to the event loop that opened them,
+    and each Streamlit session runs its own loop, so the session lives on a
+    background loop thread and calls from any loop are forwarded to it. The
+    server is started (or connected to) on first use; a periodic ping checks
+    it and the session is reopened after a failed ping or call.
+
+    The LangChain tools are built once and reused until a new session
+    reports tools with a different schema hash (``tools_version``).
+
+    Inventory listings go through ``inventory``, a short-lived cache that
+    buy and restock calls invalidate.
+    """
+
+    def __init__(
+        self,
+        connection: Optional[Dict[str, Any]] = None,
+        connect_timeout: float = MCP_CONNECT_TIMEOUT,
+        call_timeout: float = MCP_CALL_TIMEOUT,
+        health_check_interval: float = MCP_HEALTH_CHECK_INTERVAL,
+    ):
+        self.connection = connection
+        self.connect_timeout = connect_timeout
+        self.call_timeout = call_timeout
+        self.health_check_interval = health_check_interval
+        self.connects = 0
+        self.tools_version: Optional[str] = None
+        self.inventory = InventoryCache(
+            lambda: self._run(self._call_tool(INVENTORY_LIST_TOOL, {}))
+        )
+        self._thread_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        # Only used on the manager loop
+        self._session: Optional[ClientSession] = None
+        self._session_task: Optional[asyncio.Task] = None
+        self._session_stop: Optional[asyncio.Event] = None
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._health_task: Optional[asyncio.Task] = None
+        self._tools: Optional[List[BaseTool]] = None
+        # Value of ``connects`` when the cached tools were last checked
+        self._tools_checked = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._session is not None
+
+    def _start(self) -> asyncio.AbstractEventLoop:
+        with self._thread_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._run_loop, name="mcp-connection", daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._connect_lock = asyncio.Lock()
+        self._health_task = self._loop.create_task(self._health_check())
+        self._loop.run_forever()
+
+    async def _run(self, coro):
+        """Run a coroutine on the manager loop and await it from the caller's loop."""
+        loop = self._start()
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    async def _hold_session(self, ready: asyncio.Future, stop: asyncio.Event) -> None:
+        """Keep a session open until ``stop`` is set or the connection breaks.
+
+        The transport has to be closed by the task that opened it, hence a
+        task owning the whole session lifetime.
+        """
+        connection = self.connection or get_mcp_connection()
+        opened = None
+        try:
+            async with create_session(connection) as session:
+                await session.initialize()
+                opened = session
+                ready.set_result(session)
+                await stop.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logger.warning(f"MCP connection lost: {type(e).__name__}: {e}")
+        finally:
+            if opened is not None and self._session is opened:
+                self._session = None
+
+    async def _ensure_session(self) -> ClientSession:
+        async with self._connect_lock:
+            if self._session is not None:
+                return self._session
+
+            ready = asyncio.get_running_loop().create_future()
+            self._session_stop = asyncio.Event()
+            self._session_task = asyncio.create_task(
+                self._hold_session(ready, self._session_stop)
+            )
+            try:
+                session = await asyncio.wait_for(asyncio.shield(ready), self.connect_timeout)
+            except Exception as e:
+                self._session_task.cancel()
+                raise MCPConnectionError(f"Could not connect to the MCP server: {e}") from e
+            self._session = session
+            self.connects += 1
+            logger.info("MCP session opened")
+            return session
+
+    async def _reset(self) -> None:
+        """Close the current session; the next call opens a new one."""
+        self._session = None
+        task, stop = self._session_task, self._session_stop
+        self._session_task = self._session_stop = None
+        if task is None:
+            return
+        stop.set()
+        try:
+            await asyncio.wait_for(task, self.connect_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            task.cancel()
+
+    async def _shutdown(self) -> None:
+        self._health_task.cancel()
+        await self._reset()
+
+    async def _call_tool(self, name: str, arguments: Dict[str, Any]):
+        session = await self._ensure_session()
+        try:
+            return await asyncio.wait_for(
+                session.call_tool(name, arguments), self.call_timeout
+            )
+        except asyncio.TimeoutError:
+            # A slow call says nothing about the session, which other
+            # sessions may be using; the health check pings it instead
+            raise
+        except McpError as e:
+            # An error answer from the server leaves the session usable
+            if e.error.code == CONNECTION_CLOSED and self._session is session:
+                await self._reset()
+            raise
+        except _TRANSPORT_ERRORS:
+            # The next call reconnects; this one is not retried because
+            # buy/restock are not idempotent
+            if self._session is session:
+                await self._reset()
+            raise
+
+    async def _list_tools(self, session: ClientSession):
+        tools, cursor = [], None
+        while True:
+            page = await asyncio.wait_for(session.list_tools(cursor=cursor), self.call_timeout)
+            tools.extend(page.tools)
+            cursor = page.nextCursor
+            if not cursor:
+                return tools
+
+    async def _get_tools(self) -> List[BaseTool]:
+        session = await self._ensure_session()
+        if self._tools is not None and self._tools_checked == self.connects:
+            return self._tools
+
+        # First use or new session: the server may have been updated
+        mcp_tools = await self._list_tools(session)
+        version = tools_version(mcp_tools)
+        if version != self.tools_version:
+            proxy = _SessionProxy(self)
+            self._tools = [
+                convert_mcp_tool_to_langchain_tool(proxy, tool, server_name=MCP_SERVER_NAME)
+                for tool in mcp_tools
+            ]
+            self.tools_version = version
+            logger.info(f"Loaded {len(self._tools)} MCP tools (version {version})")
+        self._tools_checked = self.connects
+        return self._tools
+
+    async def _health_check(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            session = self._session
+            if session is None:
+                continue
+            try:
+                await asyncio.wait_for(session.send_ping(), self.call_timeout)
+            except Exception as e:
+                logger.warning(f"MCP health check failed, reconnecting: {e}")
+                if self._session is session:
+                    await self._reset()
+                try:
+                    await self._ensure_session()
+                except MCPConnectionError as e:
+                    logger.warning(str(e))
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]):
+        """Call an MCP tool through the shared session."""
+        if name == INVENTORY_LIST_TOOL:
+            return await self.inventory.get_result()
+        try:
+            return await self._run(self._call_tool(name, arguments))
+        finally:
+            # Also on failure: the stock may have changed anyway
+            if name in INVENTORY_WRITE_TOOLS:
+                self.inventory.invalidate()
+
+    async def get_tools(self) -> List[BaseTool]:
+        """LangChain tools for the server's MCP tools, bound to the shared session.
+
+        Raises:
+            MCPConnectionError: If the server cannot be reached.
+        """
+        return list(await self._run(self._get_tools()))
+
+    def close(self) -> None:
+        """Close the session and stop the background loop."""
+        with self._thread_lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(self.connect_timeout)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(self.connect_timeout)
+
+
+_manager: Optional[MCPConnectionManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_mcp_manager() -> MCPConnectionManager:
+    """Return the process-wide MCP connection manager."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = MCPConnectionManager()
+        return _manager
@@ -1,7 +1,7 @@
 """
 Data models for the supermarket agent application.
 """
-from typing import List
+from typing import List, Literal
 from pydantic import BaseModel, Field
 
 
@@ -25,3 +25,10 @@ class MCPServerConfig(BaseModel):
     command: str
     args: List[str]
     cwd: str
+
+
+class ChatEvent(BaseModel):
+    """Progress of an agent turn, streamed to the chat page"""
+    kind: Literal["token", "tool_start", "tool_end"]
+    text: str = ""
+    tool_name: str = ""
@@ -2,19 +2,47 @@
 Tools for the supermarket agent.
 """
 from typing import List, Dict, Any
+import json
 import logging
-import httpx
 from uuid import uuid4
 from langchain_core.tools import tool
-from a2a.client import A2ACardResolver, A2AClient
-from a2a.types import MessageSendParams, SendMessageRequest
+from a2a.types import (
+    JSONRPCErrorResponse,
+    Message,
+    MessageSendParams,
+    SendStreamingMessageRequest,
+    TaskArtifactUpdateEvent,
+    TaskState,
+    TaskStatusUpdateEvent,
+)
+from a2a.utils import get_data_parts, get_message_text
 from .models import ProductRestockRequest
-from .config import WHOLESALER_TIMEOUT
+from .config import RESTOCK_ARTIFACT_NAME
 from .exceptions import WholesalerAPIError
+from .mcp_manager import get_mcp_manager
+from .wholesaler_client import get_wholesaler_pool
 
 logger = logging.getLogger(__name__)
 
 
+@tool
+async def find_products(names: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """Find supermarket products by name, to get their IDs, prices and stock.
+
+    Prefer this tool to listing the whole inventory when looking for
+    specific products.
+
+    Args:
+        names: Names of the products to look for
+
+    Returns:
+        For each name, the matching products with their id, name, price,
+        quantity and max_stock (an empty list when none matches)
+    """
+    inventory = get_mcp_manager().inventory
+    return {name: await inventory.find(name) for name in names}
+
+
 @tool
 async def wholesaler_restock(
     products: List[ProductRestockRequest]
@@ -37,82 +65,87 @@ async def wholesaler_restock(
             for product in products
         ]
 
-        # Wholesaler agent A2A server URL
-        wholesaler_base_url = 'http://localhost:8586'
-
-        async with httpx.AsyncClient(timeout=WHOLESALER_TIMEOUT) as httpx_client:
-            # Initialize A2ACardResolver to fetch agent card
-            resolver = A2ACardResolver(
-                httpx_client=httpx_client,
-                base_url=wholesaler_base_url,
-            )
-
-            # Fetch the agent card from wholesaler
-            logger.info(f"Fetching wholesaler agent card from {wholesaler_base_url}")
-            agent_card = await resolver.get_agent_card()
-            logger.info("Successfully fetched wholesaler agent card")
-
-            # Initialize A2A client
-            client = A2AClient(
-                httpx_client=httpx_client,
-                agent_card=agent_card
-            )
-
-            # Prepare the message to send to wholesaler
-            message_text = f"Please restock the following products: {products_data}"
-
-            send_message_payload = {
-                'message': {
-                    'role': 'user',
-                    'parts': [
-                        {'kind': 'text', 'text': message_text}
-                    ],
-                    'messageId': uuid4().hex,
-                },
-            }
-
-            request = SendMessageRequest(
-                id=str(uuid4()),
-                params=MessageSendParams(**send_message_payload)
-            )
-
-            # Send message to wholesaler agent via A2A
-            logger.info("Sending restock request to wholesaler agent via A2A")
-            response = await client.send_message(request)
-
-            # Extract the response message
-            response_text = ""
-            if hasattr(response, 'root') and hasattr(response.root, 'result'):
-                # Handle the nested response structure
-                result = response.root.result
-                if hasattr(result, 'parts') and result.parts:
-                    response_text = result.parts[0].text if hasattr(result.parts[0], 'text') else str(result.parts[0])
-            elif hasattr(response, 'result') and hasattr(response.result, 'parts'):
-                response_text = response.result.parts[0].text if response.result.parts else "No response"
+        # The restock list goes as structured data, so the wholesaler
+        # allocates it without parsing any text
+        send_message_payload = {
+            'message': {
+                'role': 'user',
+                'parts': [
+                    {'kind': 'data', 'data': {'products': products_data}}
+                ],
+                'messageId': uuid4().hex,
+            },
+        }
+
+        request = SendStreamingMessageRequest(
+            id=str(uuid4()),
+            params=MessageSendParams(**send_message_payload)
+        )
+
+        # Stream the wholesaler's events: artifact chunks of allocated
+        # products, then a final status carrying the full response both as
+        # JSON text and as structured data
+        logger.info("Sending restock request to wholesaler agent via A2A")
+        streamed_products: List[Dict[str, Any]] = []
+        response_text = ""
+        wholesaler_data = None
+        async for event in get_wholesaler_pool().send_message_streaming(request):
+            if isinstance(event.root, JSONRPCErrorResponse):
+                raise WholesalerAPIError(
+                    f"Wholesaler returned an error: {event.root.error.message}"
+                )
+
+            result = event.root.result
+            if isinstance(result, TaskArtifactUpdateEvent):
+                if result.artifact.name == RESTOCK_ARTIFACT_NAME:
+                    streamed_products.extend(get_data_parts(result.artifact.parts))
+                    logger.info(f"Wholesaler allocated {len(streamed_products)} products so far")
+                continue
+
+            if isinstance(result, TaskStatusUpdateEvent):
+                message = result.status.message
+            elif isinstance(result, Message):
+                message = result
             else:
-                logger.warning(f"Unexpected response format: {type(response)}")
-                return products_data
-
-            logger.info(f"Wholesaler response: {response_text}")
-
-            # Try to parse JSON response from wholesaler
+                continue
+            if message:
+                response_text = get_message_text(message)
+                data_parts = get_data_parts(message.parts)
+                if data_parts:
+                    wholesaler_data = data_parts[0]
+
+            # The wholesaler rejects requests when overloaded; retry later
+            if (
+                isinstance(result, TaskStatusUpdateEvent)
+                and result.status.state == TaskState.rejected
+            ):
+                reason = (wholesaler_data or {}).get("message") or response_text
+                raise WholesalerAPIError(f"Wholesaler rejected the request: {reason}")
+
+        logger.info(f"Wholesaler response: {response_text}")
+
+        # Older wholesalers only send the JSON as text
+        if wholesaler_data is None:
             try:
-                import json
                 wholesaler_data = json.loads(response_text)
-
-                if wholesaler_data.get("status") == "success":
-                    restockable_products = wholesaler_data.get("restockable_products", [])
-                    logger.info(f"Wholesaler can restock {len(restockable_products)} products")
-                    return restockable_products
-                else:
-                    logger.warning(f"Wholesaler error: {wholesaler_data.get('message')}")
-                    return []
-
             except json.JSONDecodeError:
+                if streamed_products:
+                    return streamed_products
                 logger.warning("Could not parse wholesaler response as JSON")
                 # Fallback: return original products data
                 return products_data
 
+        if wholesaler_data.get("status") == "success":
+            restockable_products = (
+                streamed_products
+                or wholesaler_data.get("restockable_products", [])
+            )
+            logger.info(f"Wholesaler can restock {len(restockable_products)} products")
+            return restockable_products
+
+        logger.warning(f"Wholesaler error: {wholesaler_data.get('message')}")
+        return []
+
     except Exception as e:
         error_msg = f"A2A error calling wholesaler agent: {e}"
         logger.error(error_msg)
@@ -1,9 +1,13 @@
 """
 UI components for the supermarket agent chat interface.
 """
+from typing import AsyncIterator
+
 import streamlit as st
 from langchain_core.messages import HumanMessage, AIMessage
 
+from .models import ChatEvent
+
 
 class ChatUI:
     """UI components for the chat interface."""
@@ -32,6 +36,32 @@ class ChatUI:
                     with st.chat_message(self.agent_name, avatar=self.agent_avatar):
                         st.markdown(message.content)
 
+    async def render_streaming_response(self, events: AsyncIterator[ChatEvent]):
+        """Render the agent's answer while it is generated.
+
+        Text is written as tokens arrive and tool calls are shown in a status
+        box until their results are back.
+        """
+        with st.chat_message(self.agent_name, avatar=self.agent_avatar):
+            placeholder = st.empty()
+            status = None
+            text = ""
+            async for event in events:
+                if event.kind == "token":
+                    text += event.text
+                    placeholder.markdown(text + "▌")
+                elif event.kind == "tool_start":
+                    if status is None:
+                        status = st.status("Consultando herramientas...")
+                    status.write(f"⏳ {event.tool_name}")
+                    if text.strip() and not text.endswith("\n\n"):
+                        text += "\n\n"
+                elif event.kind == "tool_end":
+                    status.write(f"✅ {event.tool_name}")
+            placeholder.markdown(text)
+            if status is not None:
+                status.update(label="Herramientas consultadas", state="complete")
+
     def get_user_input(self) -> str:
         """Get user input and add it to the conversation."""
         prompt = st.chat_input("¿Qué te gustaría comprar?")
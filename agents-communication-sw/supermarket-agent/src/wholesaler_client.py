@@ -0,0 +1,299 @@
+"""
+Pooled A2A client for the wholesaler agent.
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import AsyncIterator, Optional
+
+import httpx
+from a2a.client import A2ACardResolver, A2AClient, A2AClientHTTPError
+from a2a.types import (
+    AgentCard,
+    SendMessageRequest,
+    SendMessageResponse,
+    SendStreamingMessageRequest,
+    SendStreamingMessageResponse,
+)
+
+from .config import (
+    WHOLESALER_A2A_URL,
+    WHOLESALER_AGENT_CARD_TTL,
+    WHOLESALER_KEEPALIVE_EXPIRY,
+    WHOLESALER_MAX_CONNECTIONS,
+    WHOLESALER_MAX_KEEPALIVE_CONNECTIONS,
+    WHOLESALER_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+# Statuses telling that no agent behind the cached card took the request,
+# e.g. the wholesaler moved to another URL
+_NOT_FOUND_STATUSES = (404, 410)
+# Failures before a connection carried the request
+_UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+def _never_delivered(error: BaseException) -> bool:
+    """Tell whether a failed send provably never reached the wholesaler.
+
+    Only those are safe to retry: a 5xx answer or a connection dropped
+    mid-request may come after the wholesaler already reserved the stock.
+    """
+    if isinstance(error, A2AClientHTTPError):
+        if error.status_code in _NOT_FOUND_STATUSES:
+            return True
+        error = error.__cause__
+    return isinstance(error, _UNSENT_ERRORS)
+
+
+class WholesalerClientPool:
+    """Long-lived A2A client with keep-alive connections and a cached agent card.
+
+    httpx connection pools are bound to the event loop that opened them, and
+    every Streamlit session runs its own loop. The pool therefore owns one
+    ``httpx.AsyncClient`` on a background loop and forwards calls to it from
+    the caller's loop, like the MCP connection manager does; the connection
+    limits apply to the whole process and no session's loop is held on to.
+    """
+
+    def __init__(
+        self,
+        base_url: str = WHOLESALER_A2A_URL,
+        timeout: float = WHOLESALER_TIMEOUT,
+        card_ttl: float = WHOLESALER_AGENT_CARD_TTL,
+        max_connections: int = WHOLESALER_MAX_CONNECTIONS,
+        max_keepalive_connections: int = WHOLESALER_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = WHOLESALER_KEEPALIVE_EXPIRY,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.card_ttl = card_ttl
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.clients_opened = 0
+        self._transport = transport
+        self._card: Optional[AgentCard] = None
+        self._card_fetched_at = 0.0
+        self._thread_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        # Only used on the pool loop
+        self._card_lock: Optional[asyncio.Lock] = None
+        self._httpx_client: Optional[httpx.AsyncClient] = None
+        self._a2a_client: Optional[A2AClient] = None
+        self._a2a_client_card: Optional[AgentCard] = None
+
+    def _start(self) -> asyncio.AbstractEventLoop:
+        with self._thread_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._run_loop, name="wholesaler-client", daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._card_lock = asyncio.Lock()
+        self._loop.run_forever()
+
+    async def _run(self, coro):
+        """Run a coroutine on the pool loop and await it from the caller's loop."""
+        loop = self._start()
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._httpx_client is None or self._httpx_client.is_closed:
+            self._httpx_client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=self.limits,
+                transport=self._transport,
+            )
+            self._a2a_client = None
+            self.clients_opened += 1
+        return self._httpx_client
+
+    def _card_is_fresh(self) -> bool:
+        return (
+            self._card is not None
+            and time.monotonic() - self._card_fetched_at < self.card_ttl
+        )
+
+    def invalidate_card(self) -> None:
+        """Drop the cached agent card so the next call fetches it again."""
+        self._card = None
+        self._card_fetched_at = 0.0
+
+    async def _get_agent_card(self) -> AgentCard:
+        if self._card_is_fresh():
+            return self._card
+
+        async with self._card_lock:
+            # Another coroutine may have refreshed it while we were waiting.
+            if self._card_is_fresh():
+                return self._card
+
+            logger.info(f"Fetching wholesaler agent card from {self.base_url}")
+            resolver = A2ACardResolver(
+                httpx_client=self._http(),
+                base_url=self.base_url,
+            )
+            card = await resolver.get_agent_card()
+            self._card = card
+            self._card_fetched_at = time.monotonic()
+            logger.info("Successfully fetched wholesaler agent card")
+            return card
+
+    async def _get_client(self) -> A2AClient:
+        card = await self._get_agent_card()
+        httpx_client = self._http()
+        if self._a2a_client is None or self._a2a_client_card is not card:
+            self._a2a_client = A2AClient(httpx_client=httpx_client, agent_card=card)
+            self._a2a_client_card = card
+        return self._a2a_client
+
+    async def get_agent_card(self) -> AgentCard:
+        """Return the cached agent card, fetching it when missing or expired."""
+        if self._card_is_fresh():
+            return self._card
+        return await self._run(self._get_agent_card())
+
+    async def _send_message(self, request: SendMessageRequest) -> SendMessageResponse:
+        client = await self._get_client()
+        try:
+            return await client.send_message(request)
+        except A2AClientHTTPError as e:
+            if not _never_delivered(e):
+                raise
+            logger.warning(
+                f"Wholesaler request not delivered ({e.status_code}), "
+                "refreshing agent card and retrying"
+            )
+            self.invalidate_card()
+            client = await self._get_client()
+            return await client.send_message(request)
+
+    async def send_message(self, request: SendMessageRequest) -> SendMessageResponse:
+        """Send a message to the wholesaler, refreshing the agent card once on error.
+
+        The request is only retried when it provably never reached the
+        wholesaler (connection refused, or no agent at the card's URL).
+        Other errors and timeouts are raised, since the wholesaler may
+        already have reserved stock for it.
+        """
+        return await self._run(self._send_message(request))
+
+    async def _send_message_streaming(
+        self, request: SendStreamingMessageRequest
+    ) -> AsyncIterator[SendStreamingMessageResponse]:
+        received = False
+        try:
+            client = await self._get_client()
+            async for event in client.send_message_streaming(
+                request, http_kwargs={"timeout": self.timeout}
+            ):
+                received = True
+                yield event
+            return
+        except (A2AClientHTTPError, httpx.TransportError) as e:
+            # Opening the stream raises httpx errors unwrapped
+            if received or not _never_delivered(e):
+                raise
+            logger.warning(
+                f"Wholesaler stream not delivered ({e}), "
+                "refreshing agent card and retrying"
+            )
+            self.invalidate_card()
+
+        client = await self._get_client()
+        async for event in client.send_message_streaming(
+            request, http_kwargs={"timeout": self.timeout}
+        ):
+            yield event
+
+    async def send_message_streaming(
+        self, request: SendStreamingMessageRequest
+    ) -> AsyncIterator[SendStreamingMessageResponse]:
+        """Stream the wholesaler's events for a message.
+
+        The agent card is refreshed and the request retried once if it
+        provably never reached the wholesaler (see ``send_message``); any
+        other failure is raised as-is.
+        """
+        caller = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        def put(item):
+            try:
+                caller.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                pass  # The caller's loop is already closed
+
+        async def pump():
+            try:
+                async for event in self._send_message_streaming(request):
+                    put(event)
+            except BaseException as e:
+                put(e)
+                raise
+            put(done)
+
+        future = asyncio.run_coroutine_threadsafe(pump(), self._start())
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    return
+                if isinstance(item, BaseException):
+                    if isinstance(item, asyncio.CancelledError):
+                        raise asyncio.CancelledError()
+                    raise item
+                yield item
+        finally:
+            # Leaving early closes the stream on the pool loop
+            future.cancel()
+
+    async def _close_client(self) -> None:
+        client, self._httpx_client = self._httpx_client, None
+        self._a2a_client = None
+        if client is not None:
+            await client.aclose()
+
+    async def aclose(self) -> None:
+        """Close the pooled connections; the next call opens new ones."""
+        if self._loop is not None:
+            await self._run(self._close_client())
+
+    def close(self) -> None:
+        """Close the connections and stop the background loop."""
+        with self._thread_lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._close_client(), loop).result(self.timeout)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(self.timeout)
+        loop.close()
+
+
+_pool: Optional[WholesalerClientPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_wholesaler_pool() -> WholesalerClientPool:
+    """Return the process-wide wholesaler client pool."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = WholesalerClientPool()
+    return _pool
@@ -0,0 +1,125 @@
+"""
+Tests for the chat service tool execution.
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+
+from src import chat_service
+from src.chat_service import ChatService
+
+
+class SlowTool:
+    """Async tool stand-in that sleeps before answering."""
+
+    def __init__(self, name: str, delay: float):
+        self.name = name
+        self.delay = delay
+
+    async def ainvoke(self, args):
+        await asyncio.sleep(self.delay)
+        return f"{self.name}:{args.get('value')}"
+
+
+def _service(*tools, **kwargs) -> ChatService:
+    return ChatService(SimpleNamespace(tools=list(tools)), **kwargs)
+
+
+def _call(name: str, call_id: str, value=1.0):
+    return {"name": name, "args": {"value": value}, "id": call_id}
+
+
+def _execute(service: ChatService, calls):
+    async def run():
+        return await asyncio.gather(*service._start_tool_calls(calls))
+    return asyncio.run(run())
+
+
+def test_tool_calls_run_concurrently_and_keep_order():
+    """Independent tool calls overlap and results follow the call order."""
+    service = _service(SlowTool("slow", 0.2), SlowTool("fast", 0.05))
+    calls = [_call("slow", "a"), _call("fast", "b"), _call("slow", "c")]
+
+    start = time.perf_counter()
+    results = _execute(service, calls)
+    elapsed = time.perf_counter() - start
+
+    assert [r.tool_call_id for r in results] == ["a", "b", "c"]
+    assert results[0].content == "slow:1"
+    assert elapsed < 0.4
+
+
+def test_tool_call_timeout_is_reported():
+    """A tool exceeding the timeout yields an error message, not an exception."""
+    service = _service(SlowTool("slow", 1.0), tool_timeout=0.05)
+
+    results = _execute(service, [_call("slow", "a")])
+
+    assert results[0].tool_call_id == "a"
+    assert "Tiempo de espera agotado" in results[0].content
+
+
+def test_unknown_tool_is_reported():
+    """Calls to missing tools produce an error ToolMessage."""
+    service = _service()
+
+    results = _execute(service, [_call("missing", "x")])
+
+    assert "not available" in results[0].content
+
+
+class StreamingAgent:
+    """Agent stand-in streaming a tool call, then the final answer."""
+
+    def __init__(self, *tools):
+        self.tools = list(tools)
+        self.turns = 0
+
+    async def stream_response(self, history):
+        self.turns += 1
+        if self.turns == 1:
+            yield AIMessageChunk(content="", tool_call_chunks=[
+                {"name": "slow", "args": '{"value": 2}', "id": "a", "index": 0},
+            ])
+            return
+        for token in ["Listo, ", "compra ", "hecha."]:
+            yield AIMessageChunk(content=token)
+
+
+def test_stream_agent_response_yields_tokens_and_tool_progress(monkeypatch):
+    """Tokens and tool events are streamed and the history gets the whole turn."""
+    session_state = SimpleNamespace(messages=[HumanMessage(content="compra")])
+    monkeypatch.setattr(chat_service.st, "session_state", session_state)
+    service = ChatService(StreamingAgent(SlowTool("slow", 0.01)))
+
+    async def collect():
+        return [event async for event in service.stream_agent_response()]
+
+    events = asyncio.run(collect())
+
+    assert [(e.kind, e.tool_name or e.text) for e in events] == [
+        ("tool_start", "slow"),
+        ("tool_end", "slow"),
+        ("token", "Listo, "),
+        ("token", "compra "),
+        ("token", "hecha."),
+    ]
+    human, call, result, answer = session_state.messages
+    assert isinstance(call, AIMessage) and call.content == " "
+    assert call.tool_calls[0]["args"] == {"value": 2}
+    assert result.tool_call_id == "a" and result.content == "slow:2"
+    assert answer.content == "Listo, compra hecha."
+
+
+def test_get_agent_response_runs_the_same_turn(monkeypatch):
+    """The non-streaming entry point stores the same history as the stream."""
+    session_state = SimpleNamespace(messages=[HumanMessage(content="compra")])
+    monkeypatch.setattr(chat_service.st, "session_state", session_state)
+    service = ChatService(StreamingAgent(SlowTool("slow", 0.01)))
+
+    asyncio.run(service.get_agent_response())
+
+    assert [m.type for m in session_state.messages] == ["human", "ai", "tool", "ai"]
+    assert session_state.messages[-1].content == "Listo, compra hecha."
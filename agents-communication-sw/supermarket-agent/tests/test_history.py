@@ -0,0 +1,82 @@
+"""
+Tests for the token-budgeted chat history.
+"""
+import json
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from src.history import HistoryManager, estimate_tokens, summarize_tool_output
+
+INVENTORY = json.dumps([
+    {"id": f"p{i}", "name": f"Producto {i}", "stock": i} for i in range(200)
+])
+
+
+def _turn(n: int):
+    """A user question answered after listing the whole inventory."""
+    return [
+        HumanMessage(content=f"pregunta {n}"),
+        AIMessage(content=" ", tool_calls=[
+            {"name": "list_items", "args": {}, "id": f"call-{n}"},
+        ]),
+        ToolMessage(content=INVENTORY, tool_call_id=f"call-{n}"),
+        AIMessage(content=f"respuesta {n}"),
+    ]
+
+
+def test_summarize_tool_output_keeps_short_results():
+    assert summarize_tool_output("ok") == "ok"
+    summary = summarize_tool_output(INVENTORY, limit=100)
+    assert summary.startswith("[200 elementos] ")
+    assert len(summary) < 200
+
+
+def test_old_tool_results_are_compacted():
+    """Only the recent turns keep their full tool results."""
+    history = _turn(1) + _turn(2) + _turn(3)
+    manager = HistoryManager(token_budget=100_000, recent_turns=1)
+
+    summary, messages = manager.window(history)
+
+    assert summary == ""
+    assert len(messages) == len(history)
+    tool_results = [m for m in messages if isinstance(m, ToolMessage)]
+    assert [m.tool_call_id for m in tool_results] == ["call-1", "call-2", "call-3"]
+    assert len(tool_results[0].content) < 500
+    assert tool_results[-1] is history[-2]
+
+
+def test_window_stays_within_budget_and_summarizes_dropped_turns():
+    """Old turns are dropped as whole turns and described in the summary."""
+    manager = HistoryManager(token_budget=3500, recent_turns=1)
+    history = []
+    sizes = []
+    for n in range(1, 21):
+        history += _turn(n)
+        summary, messages = manager.window(history)
+        sizes.append(sum(estimate_tokens(m) for m in messages))
+
+    # Growth is bounded instead of linear in the number of turns
+    assert max(sizes[5:]) <= 3500
+    assert isinstance(messages[0], HumanMessage)
+    assert "- Usuario: pregunta 1" in summary
+    assert "- Agente usó list_items({})" in summary
+    assert "pregunta 20" not in summary
+
+
+def test_summary_is_built_incrementally():
+    """Dropped turns are summarized once; the prompt start stays stable."""
+    manager = HistoryManager(token_budget=3500, recent_turns=1)
+    history = _turn(1) + _turn(2) + _turn(3) + _turn(4)
+    summary, messages = manager.window(history)
+    summarized = manager._summarized
+
+    summary_again, messages_again = manager.window(list(history))
+    assert summary_again == summary
+    assert manager._summarized == summarized
+    assert all(a is b for a, b in zip(messages, messages_again))
+
+    # A new conversation starts from scratch
+    summary, messages = manager.window(_turn(1))
+    assert summary == ""
+    assert len(messages) == 4
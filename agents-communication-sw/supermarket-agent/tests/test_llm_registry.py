@@ -0,0 +1,95 @@
+"""
+Tests for the process-wide LLM client registry.
+"""
+import asyncio
+import gc
+import weakref
+from types import SimpleNamespace
+
+from src.llm_registry import LLMClientRegistry, llm_key
+
+
+class LoopBoundClient:
+    """Client stand-in that, like Gemini's, keeps the loop it first ran on."""
+
+    def __init__(self):
+        self.loop = None
+
+    def _bind(self):
+        loop = asyncio.get_running_loop()
+        if self.loop is None:
+            self.loop = loop
+        assert loop is self.loop, "used from another event loop"
+
+    async def ainvoke(self, messages):
+        self._bind()
+        return f"answer to {messages}"
+
+    async def astream(self, messages):
+        self._bind()
+        for token in ["an", "swer"]:
+            yield token
+
+
+def test_clients_are_shared_by_key():
+    """Same model, temperature and tools reuse one client; others get their own."""
+    registry = LLMClientRegistry()
+    built = []
+
+    def factory():
+        built.append(object())
+        return built[-1]
+
+    tools = [SimpleNamespace(name="list_products"), SimpleNamespace(name="buy")]
+    first = registry.get(llm_key("gemini", 0.7, tools), factory)
+    second = registry.get(llm_key("gemini", 0.7, reversed(tools)), factory)
+    other = registry.get(llm_key("gemini", 0.2, tools), factory)
+
+    assert first is second
+    assert other is not first
+    assert registry.stats() == {"clients": 2, "hits": 1, "misses": 2}
+
+
+def test_one_client_serves_every_loop_and_frees_them():
+    """Sessions on different loops share the client, which keeps none of their loops."""
+    registry = LLMClientRegistry()
+
+    async def use():
+        client = registry.get(llm_key("gemini", 0.7), LoopBoundClient)
+        answer = await registry.ainvoke(client, "hola")
+        tokens = [token async for token in registry.astream(client, "hola")]
+        return client, answer, tokens
+
+    loops = []
+    for _ in range(5):
+        loop = asyncio.new_event_loop()
+        client, answer, tokens = loop.run_until_complete(use())
+        loop.close()
+        loops.append(weakref.ref(loop))
+        del loop
+    gc.collect()
+
+    assert answer == "answer to hola"
+    assert tokens == ["an", "swer"]
+    assert registry.stats()["clients"] == 1
+    assert client.loop is registry._loop
+    assert all(ref() is None for ref in loops)
+
+
+def test_stream_errors_reach_the_caller():
+    registry = LLMClientRegistry()
+
+    class Failing:
+        async def astream(self, messages):
+            yield "partial"
+            raise ValueError("quota")
+
+    async def consume():
+        received = []
+        try:
+            async for chunk in registry.astream(Failing(), "hola"):
+                received.append(chunk)
+        except ValueError as e:
+            return received, str(e)
+
+    assert asyncio.run(consume()) == (["partial"], "quota")
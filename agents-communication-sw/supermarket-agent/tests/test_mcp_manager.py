@@ -0,0 +1,146 @@
+"""
+Tests for the shared MCP connection manager.
+"""
+import asyncio
+import json
+import sys
+import textwrap
+
+import pytest
+
+from src.gemini_agent import get_tool_schemas
+from src.mcp_manager import MCPConnectionManager
+
+SERVER = textwrap.dedent('''
+    import json
+    import os
+    from mcp.server.fastmcp import FastMCP
+
+    server = FastMCP("supermarket")
+    listings = 0
+
+    @server.tool()
+    def list_items() -> str:
+        """List all items in the supermarket"""
+        global listings
+        listings += 1
+        return json.dumps([
+            {"id": 1, "name": "Leche Entera", "quantity": 10, "pid": os.getpid()},
+            {"id": 2, "name": "Pan Francés", "quantity": 5, "listing": listings},
+        ])
+
+    @server.tool()
+    def buy_items(items: list) -> str:
+        """Buy items from the supermarket"""
+        return "ok"
+
+    server.run()
+''')
+
+
+@pytest.fixture
+def manager(tmp_path):
+    script = tmp_path / "server.py"
+    script.write_text(SERVER)
+    manager = MCPConnectionManager(
+        {"transport": "stdio", "command": sys.executable, "args": [str(script)]},
+        health_check_interval=3600,
+    )
+    # Every listing reaches the server unless a test enables the cache
+    manager.inventory.ttl = 0
+    yield manager
+    manager.close()
+
+
+def _list_items(manager):
+    async def run():
+        tools = await manager.get_tools()
+        assert [tool.name for tool in tools] == ["list_items", "buy_items"]
+        content = await tools[0].ainvoke({})
+        return json.loads(content[0]["text"])[0]["pid"]
+    return run()
+
+
+def test_sessions_share_one_server(manager):
+    """Calls from different event loops go through a single server process."""
+    first = asyncio.run(_list_items(manager))
+    second = asyncio.run(_list_items(manager))
+
+    assert first == second
+    assert manager.connects == 1
+
+
+def test_reconnects_after_the_session_is_lost(manager):
+    """A closed session is reopened on the next call."""
+    first = asyncio.run(_list_items(manager))
+    asyncio.run_coroutine_threadsafe(manager._reset(), manager._loop).result(10)
+    assert not manager.connected
+
+    second = asyncio.run(_list_items(manager))
+    assert second != first
+    assert manager.connects == 2
+
+
+def test_tools_are_cached_until_the_schema_changes(manager):
+    """Tool objects and their schemas are reused across sessions and reconnects."""
+    first = asyncio.run(manager.get_tools())
+    version = manager.tools_version
+    asyncio.run_coroutine_threadsafe(manager._reset(), manager._loop).result(10)
+    second = asyncio.run(manager.get_tools())
+
+    assert manager.connects == 2
+    assert manager.tools_version == version
+    assert second[0] is first[0]
+    schemas = get_tool_schemas(first, version)
+    assert get_tool_schemas(second, version) is schemas
+    assert schemas[0]["function"]["name"] == "list_items"
+
+
+def test_inventory_listing_is_cached_until_stock_changes(manager):
+    """Listings are reused within the TTL and dropped after a buy."""
+    manager.inventory.ttl = 60
+
+    async def run():
+        tools = {tool.name: tool for tool in await manager.get_tools()}
+        listings = []
+        for _ in range(2):
+            content = await tools["list_items"].ainvoke({})
+            listings.append(json.loads(content[0]["text"])[1]["listing"])
+        await tools["buy_items"].ainvoke({"items": [{"id": 1, "quantity": 1}]})
+        content = await tools["list_items"].ainvoke({})
+        listings.append(json.loads(content[0]["text"])[1]["listing"])
+        return listings
+
+    assert asyncio.run(run()) == [1, 1, 2]
+    assert manager.inventory.stats() == {"hits": 1, "misses": 2}
+
+
+def test_products_are_found_by_name(manager):
+    """Lookups ignore case and accents and accept partial names."""
+    manager.inventory.ttl = 60
+
+    async def run():
+        return [
+            await manager.inventory.find(name)
+            for name in ["leche entera", "pan frances", "leche", "arroz"]
+        ]
+
+    exact, accents, partial, missing = asyncio.run(run())
+    assert [item["id"] for item in exact] == [1]
+    assert [item["id"] for item in accents] == [2]
+    assert [item["id"] for item in partial] == [1]
+    assert missing == []
+    assert manager.inventory.stats()["misses"] == 1
+
+
+def test_a_timed_out_call_keeps_the_session(manager):
+    """A call that exceeds its timeout fails alone; the session stays open."""
+    first = asyncio.run(_list_items(manager))
+    manager.call_timeout = 1e-6
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(_list_items(manager))
+    manager.call_timeout = 10
+
+    assert manager.connected
+    assert asyncio.run(_list_items(manager)) == first
+    assert manager.connects == 1
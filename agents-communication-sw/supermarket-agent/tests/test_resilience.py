@@ -0,0 +1,75 @@
+"""
+Tests for the Gemini circuit breaker.
+"""
+import asyncio
+
+import pytest
+
+from src.resilience import CircuitBreaker, CircuitOpenError
+
+
+async def _fail():
+    raise ConnectionError("gemini down")
+
+
+async def _ok():
+    return "ok"
+
+
+def test_breaker_opens_and_short_circuits():
+    """After the threshold the dependency is no longer called."""
+    breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=60)
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await _fail()
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await breaker.call(failing)
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(failing)
+
+    asyncio.run(run())
+    assert len(calls) == 2
+    assert breaker.is_open
+
+
+def test_breaker_half_open_trial_closes_or_reopens():
+    """After the recovery timeout one trial call decides the state."""
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=0.01)
+
+    async def run():
+        with pytest.raises(ConnectionError):
+            await breaker.call(_fail)
+        await asyncio.sleep(0.02)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        with pytest.raises(ConnectionError):
+            await breaker.call(_fail)
+        assert breaker.state == CircuitBreaker.OPEN
+
+        await asyncio.sleep(0.02)
+        assert await breaker.call(_ok) == "ok"
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    asyncio.run(run())
+
+
+def test_ignored_errors_do_not_open_the_circuit():
+    """Errors rejected by is_failure leave the breaker closed."""
+    breaker = CircuitBreaker(
+        "test", failure_threshold=1, is_failure=lambda e: not isinstance(e, ValueError)
+    )
+
+    async def invalid():
+        raise ValueError("bad output")
+
+    async def run():
+        with pytest.raises(ValueError):
+            await breaker.call(invalid)
+
+    asyncio.run(run())
+    assert breaker.state == CircuitBreaker.CLOSED
+
@@ -0,0 +1,168 @@
+"""
+Tests for the pooled wholesaler A2A client.
+"""
+import asyncio
+import gc
+import json
+import weakref
+from uuid import uuid4
+
+import httpx
+import pytest
+from a2a.client import A2AClientHTTPError
+from a2a.types import MessageSendParams, SendMessageRequest
+
+from src.wholesaler_client import WholesalerClientPool
+
+BASE_URL = "http://wholesaler.test"
+
+AGENT_CARD = {
+    "name": "Wholesaler Agent",
+    "description": "Test wholesaler",
+    "url": f"{BASE_URL}/",
+    "version": "1.0.0",
+    "defaultInputModes": ["text"],
+    "defaultOutputModes": ["text"],
+    "capabilities": {},
+    "skills": [],
+}
+
+
+class FakeWholesaler:
+    """Minimal A2A server answering through an httpx mock transport."""
+
+    def __init__(self, first_send_failure=None):
+        self.card_requests = 0
+        self.send_requests = 0
+        # Status code answered, or exception raised, for the first send
+        self.first_send_failure = first_send_failure
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        if request.method == "GET":
+            self.card_requests += 1
+            return httpx.Response(200, json=AGENT_CARD)
+
+        self.send_requests += 1
+        failure = self.first_send_failure
+        if failure is not None and self.send_requests == 1:
+            if isinstance(failure, Exception):
+                raise failure
+            return httpx.Response(failure)
+        return httpx.Response(200, json={
+            "jsonrpc": "2.0",
+            "id": json.loads(request.content)["id"],
+            "result": {
+                "kind": "message",
+                "role": "agent",
+                "messageId": uuid4().hex,
+                "parts": [{"kind": "text", "text": '{"status": "success"}'}],
+            },
+        })
+
+
+def _request() -> SendMessageRequest:
+    return SendMessageRequest(
+        id=str(uuid4()),
+        params=MessageSendParams(message={
+            "role": "user",
+            "parts": [{"kind": "text", "text": "hola"}],
+            "messageId": uuid4().hex,
+        }),
+    )
+
+
+def _pool(server: FakeWholesaler, card_ttl: float = 300.0) -> WholesalerClientPool:
+    return WholesalerClientPool(
+        base_url=BASE_URL,
+        card_ttl=card_ttl,
+        transport=httpx.MockTransport(server.handler),
+    )
+
+
+def test_agent_card_is_fetched_once_for_several_messages():
+    """The agent card is cached across calls while the TTL is valid."""
+    server = FakeWholesaler()
+    pool = _pool(server)
+
+    async def run():
+        for _ in range(3):
+            await pool.send_message(_request())
+        await pool.aclose()
+
+    asyncio.run(run())
+    assert server.card_requests == 1
+    assert server.send_requests == 3
+
+
+def test_agent_card_is_refetched_after_ttl():
+    """An expired card is fetched again before the next message."""
+    server = FakeWholesaler()
+    pool = _pool(server, card_ttl=0.0)
+
+    async def run():
+        await pool.send_message(_request())
+        await pool.send_message(_request())
+        await pool.aclose()
+
+    asyncio.run(run())
+    assert server.card_requests == 2
+
+
+@pytest.mark.parametrize("failure", [
+    404,
+    httpx.ConnectError("connection refused"),
+])
+def test_agent_card_is_refreshed_when_the_message_was_not_delivered(failure):
+    """A send that never reached the wholesaler refreshes the card and is retried once."""
+    server = FakeWholesaler(first_send_failure=failure)
+    pool = _pool(server)
+
+    async def run():
+        response = await pool.send_message(_request())
+        await pool.aclose()
+        return response
+
+    response = asyncio.run(run())
+    assert response.root.result.parts[0].root.text == '{"status": "success"}'
+    assert server.card_requests == 2
+    assert server.send_requests == 2
+
+
+@pytest.mark.parametrize("failure", [
+    503,
+    httpx.RemoteProtocolError("server disconnected"),
+])
+def test_message_that_may_have_been_processed_is_not_retried(failure):
+    """5xx answers and dropped connections are raised: stock may be reserved already."""
+    server = FakeWholesaler(first_send_failure=failure)
+    pool = _pool(server)
+
+    async def run():
+        try:
+            await pool.send_message(_request())
+        finally:
+            await pool.aclose()
+
+    with pytest.raises(A2AClientHTTPError):
+        asyncio.run(run())
+    assert server.send_requests == 1
+
+
+def test_sessions_share_one_client_and_their_loops_are_freed():
+    """Every loop goes through the same connections and none is kept alive."""
+    server = FakeWholesaler()
+    pool = _pool(server)
+    loops = []
+
+    for _ in range(3):
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(pool.send_message(_request()))
+        loop.close()
+        loops.append(weakref.ref(loop))
+        del loop
+    gc.collect()
+
+    assert [ref() for ref in loops] == [None, None, None]
+    assert pool.clients_opened == 1
+    assert server.send_requests == 3
+    pool.close()
@@ -1,12 +1,16 @@
 package main
 
 import (
+	"flag"
 	"fmt"
+	"os"
 
 	"supermarket-api/pkg/client"
 	"supermarket-api/pkg/types"
 
 	mcp "github.com/metoro-io/mcp-golang"
+	"github.com/metoro-io/mcp-golang/transport"
+	mcphttp "github.com/metoro-io/mcp-golang/transport/http"
 	"github.com/metoro-io/mcp-golang/transport/stdio"
 )
 
@@ -21,9 +25,17 @@ type RestockItemsArguments struct {
 }
 
 func main() {
+	httpAddr := flag.String("http", "", "serve MCP over HTTP on this address (e.g. :8087) instead of stdio")
+	flag.Parse()
+
 	done := make(chan struct{})
 
-	server := mcp.NewServer(stdio.NewStdioServerTransport())
+	// Over HTTP one long-lived server is shared by every agent session
+	var serverTransport transport.Transport = stdio.NewStdioServerTransport()
+	if *httpAddr != "" {
+		serverTransport = mcphttp.NewHTTPTransport("/mcp").WithAddr(*httpAddr)
+	}
+	server := mcp.NewServer(serverTransport)
 
 	err := server.RegisterTool("list_items", "List all items in the supermarket", func(arguments ListItemsArguments) (*mcp.ToolResponse, error) {
 		items, err := client.ListItems()
@@ -58,7 +70,8 @@ func main() {
 		panic(err)
 	}
 
-	fmt.Println("MCP Server for Supermarket API is running...")
+	// stdout carries the stdio protocol, so status goes to stderr
+	fmt.Fprintln(os.Stderr, "MCP Server for Supermarket API is running...")
 	err = server.Serve()
 	if err != nil {
 		panic(err)
@@ -1,90 +1,57 @@
-import uvicorn
-import os
+import glob
 import logging
-from dotenv import load_dotenv
-
-from a2a.server.apps import A2AStarletteApplication
-from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
-from a2a.types import (
-    AgentCapabilities,
-    AgentCard,
-    AgentSkill,
-)
-from src.agent_executor import (
-    WholesalerAgentExecutor,  # type: ignore[import-untyped]
-)
+import os
+import tempfile
 
-# Load environment variables
-load_dotenv()
+import uvicorn
 
-# Configure logging for the main module
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('/tmp/wholesaler-agent.log')
-    ]
+from src.config import (
+    LOG_FILE_PATH,
+    SERVER_HOST,
+    SERVER_PORT,
+    SERVER_WORKERS,
 )
 
-logger = logging.getLogger(__name__)
-
-
-if __name__ == '__main__':
-    logger.info("Starting Wholesaler Agent Server...")
-
-    # --8<-- [start:AgentSkill]
-    restock_skill = AgentSkill(
-        id='restock_products',
-        name='Process product restock requests',
-        description='Processes restock requests and returns available quantities for products',
-        tags=['restock', 'wholesaler', 'inventory'],
-        examples=['Please restock products', 'Check availability for products', 'Restock request'],
-    )
-
-    general_skill = AgentSkill(
-        id='general_assistance',
-        name='General wholesaler assistance',
-        description='Provides general assistance and information about wholesaler services',
-        tags=['assistance', 'wholesaler', 'general'],
-        examples=['hello', 'help', 'what can you do'],
-    )
-    # --8<-- [end:AgentSkill]
-
-    logger.info("Created agent skills for restock and general assistance")
-
-    # --8<-- [start:AgentCard]
-    # This will be the public-facing agent card
-    public_agent_card = AgentCard(
-        name='Wholesaler Agent',
-        description='AI-powered wholesaler agent for processing restock requests and inventory management',
-        url='http://localhost:8586/',
-        version='2.0.0',
-        defaultInputModes=['text'],
-        defaultOutputModes=['text'],
-        capabilities=AgentCapabilities(streaming=True),
-        skills=[restock_skill, general_skill],  # Updated skills
-        supportsAuthenticatedExtendedCard=False,  # Simplified for now
+if SERVER_WORKERS > 1 and __name__ == '__main__':
+    # Workers share their metrics through this directory; prometheus_client
+    # reads it at import time, so it is set before src.server is imported.
+    # Spawned workers re-run this module under another name and inherit it.
+    metrics_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR") or tempfile.mkdtemp(
+        prefix="wholesaler-metrics-"
     )
-    # --8<-- [end:AgentCard]
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = metrics_dir
+    os.makedirs(metrics_dir, exist_ok=True)
+    # Values left by a previous run would be added to this one's
+    for stale in glob.glob(os.path.join(metrics_dir, "*.db")):
+        os.remove(stale)
 
-    logger.info("Created public agent card")
+from src.logging_config import setup_logging
+from src.server import create_app
 
-    request_handler = DefaultRequestHandler(
-        agent_executor=WholesalerAgentExecutor(),
-        task_store=InMemoryTaskStore(),
-    )
-
-    logger.info("Created request handler with WholesalerAgentExecutor")
+# Configure non-blocking JSON logging for the whole process
+setup_logging()
 
-    server = A2AStarletteApplication(
-        agent_card=public_agent_card,
-        http_handler=request_handler,
-    )
+logger = logging.getLogger(__name__)
 
-    logger.info("Created A2A Starlette application")
-    logger.info("Server starting on localhost:8586...")
-    logger.info("Logs will be written to /tmp/wholesaler-agent.log")
 
-    uvicorn.run(server.build(), host='localhost', port=8586)
\ No newline at end of file
+if __name__ == '__main__':
+    logger.info("Starting Wholesaler Agent Server...")
+    logger.info(f"Server starting on {SERVER_HOST}:{SERVER_PORT} with {SERVER_WORKERS} worker(s)...")
+    logger.info(f"Logs will be written to {LOG_FILE_PATH}")
+    # Each worker warms up after it starts listening; /ready flips when done
+    logger.info("Readiness probe at /ready, liveness probe at /health")
+
+    # log_config=None lets uvicorn's loggers propagate to the queued root logger
+    if SERVER_WORKERS > 1:
+        # Workers import the factory themselves, so it is passed by name
+        uvicorn.run(
+            'src.server:create_app',
+            factory=True,
+            host=SERVER_HOST,
+            port=SERVER_PORT,
+            workers=SERVER_WORKERS,
+            app_dir=os.path.dirname(os.path.abspath(__file__)),
+            log_config=None,
+        )
+    else:
+        uvicorn.run(create_app(), host=SERVER_HOST, port=SERVER_PORT, log_config=None)
@@ -0,0 +1,45 @@
+"""
+Micro-benchmark for the restock payload parser.
+
+Run from the wholesaler-agent directory:
+
+    python -m benchmarks.bench_restock_parser [items] [repeats]
+"""
+import sys
+import timeit
+
+from src.restock_parser import parse_restock_items
+
+
+def build_payloads(items: int) -> dict:
+    """Build one payload per input format the wholesaler receives."""
+    products = [{"product_id": str(i), "quantity": i % 50} for i in range(items)]
+    return {
+        "python list": f"Please restock the following products: {products!r}",
+        "loose json": "Please restock products: " + " ".join(
+            f'{{"product_id": {i}, "quantity": {i % 50}}}' for i in range(items)
+        ),
+        "keyed text": "restock " + " ".join(
+            f"product_id={i} quantity={i % 50}" for i in range(items)
+        ),
+        "numbers only": "restock\n" + "\n".join(
+            f"{i} {i % 50}" for i in range(items)
+        ),
+    }
+
+
+def main(items: int = 10_000, repeats: int = 5) -> None:
+    for name, payload in build_payloads(items).items():
+        seconds = min(timeit.repeat(
+            lambda: parse_restock_items(payload, lenient=True),
+            number=1,
+            repeat=repeats,
+        ))
+        print(
+            f"{name:<14} {len(payload):>9} chars  {seconds * 1000:8.2f} ms  "
+            f"{items / seconds:12.0f} items/s"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,122 @@
+"""
+Offline stand-in for ChatGoogleGenerativeAI used by the load-test harness.
+
+It answers restock prompts in the wholesaler's structured-output schemas
+after a simulated, seeded latency, and reports token usage the way Gemini
+does in ``usage_metadata``.
+"""
+import asyncio
+import math
+import random
+import re
+from typing import List, Optional
+
+from langchain_core.messages import AIMessage
+
+from src.models import RestockBatchEntry, RestockBatchResponse, RestockResponse
+from src.restock_parser import parse_restock_items
+
+_BATCH_SEGMENT = re.compile(r"Solicitud (\d+): ")
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough Gemini token count: about four characters per token."""
+    return max(1, len(text) // 4)
+
+
+class FakeChatGoogleGenerativeAI:
+    """Simulated Gemini chat model.
+
+    Latencies follow a log-normal distribution with the given median (in
+    seconds) and ``sigma``. A ``error_rate`` fraction of calls raise, and an
+    ``invalid_rate`` fraction return output that does not match the schema.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.8,
+        sigma: float = 0.5,
+        error_rate: float = 0.0,
+        invalid_rate: float = 0.0,
+        seed: Optional[int] = 0,
+    ):
+        self.latency = latency
+        self.sigma = sigma
+        self.error_rate = error_rate
+        self.invalid_rate = invalid_rate
+        self.rng = random.Random(seed)
+        self.calls = 0
+
+    async def _wait(self) -> None:
+        self.calls += 1
+        if self.latency > 0:
+            await asyncio.sleep(self.rng.lognormvariate(math.log(self.latency), self.sigma))
+        if self.rng.random() < self.error_rate:
+            raise RuntimeError("Simulated Gemini error")
+
+    def _usage(self, prompt: str, output: str) -> dict:
+        input_tokens = _estimate_tokens(prompt)
+        output_tokens = _estimate_tokens(output)
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+
+    def _answer(self, message: str) -> RestockResponse:
+        products = [
+            {"product_id": item.product_id, "quantity": self.rng.randint(0, item.quantity)}
+            for item in parse_restock_items(message, lenient=True)
+        ]
+        return RestockResponse(
+            status="success",
+            restockable_products=products,
+            message="Respuesta simulada",
+        )
+
+    async def ainvoke(self, messages, **kwargs) -> AIMessage:
+        """Plain chat call, used by the startup warm-up."""
+        await self._wait()
+        prompt = "".join(str(m.content) for m in messages)
+        return AIMessage(content="pong", usage_metadata=self._usage(prompt, "pong"))
+
+    def with_structured_output(self, schema, include_raw: bool = False):
+        return _StructuredRunnable(self, schema, include_raw)
+
+
+class _StructuredRunnable:
+    """What ``with_structured_output`` returns: parsed answers in ``schema``."""
+
+    def __init__(self, llm: FakeChatGoogleGenerativeAI, schema, include_raw: bool):
+        self.llm = llm
+        self.schema = schema
+        self.include_raw = include_raw
+
+    def _parse(self, text: str):
+        if self.schema is RestockBatchResponse:
+            parts: List[str] = _BATCH_SEGMENT.split(text)[1:]
+            return RestockBatchResponse(responses=[
+                RestockBatchEntry(
+                    request_id=int(request_id),
+                    **self.llm._answer(message).model_dump(),
+                )
+                for request_id, message in zip(parts[0::2], parts[1::2])
+            ])
+        return self.llm._answer(text)
+
+    async def ainvoke(self, messages, **kwargs):
+        await self.llm._wait()
+        prompt = "".join(str(m.content) for m in messages)
+        parsed = self._parse(str(messages[-1].content))
+        output = parsed.model_dump_json()
+
+        parsing_error = None
+        if self.llm.rng.random() < self.llm.invalid_rate:
+            parsed, parsing_error = None, ValueError("Simulated schema violation")
+
+        if not self.include_raw:
+            if parsing_error is not None:
+                raise parsing_error
+            return parsed
+        raw = AIMessage(content=output, usage_metadata=self.llm._usage(prompt, output))
+        return {"raw": raw, "parsed": parsed, "parsing_error": parsing_error}
@@ -0,0 +1,303 @@
+"""
+Offline load test for the wholesaler.
+
+Drives WholesalerAgentExecutor through the real Starlette app (in process,
+over httpx's ASGI transport) with a simulated Gemini model, and reports
+throughput, latency percentiles and error rates. Runs are reproducible for
+a given ``--seed``.
+
+Run from the wholesaler-agent directory:
+
+    python -m benchmarks.load_test --requests 500 --concurrency 50
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import statistics
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+import httpx
+from a2a.client import A2AClient
+from a2a.server.tasks import InMemoryTaskStore
+from a2a.types import (
+    JSONRPCErrorResponse,
+    MessageSendParams,
+    SendMessageRequest,
+    Task,
+    TaskState,
+)
+from a2a.utils import get_message_text
+
+from src.agent_executor import WholesalerAgent, WholesalerAgentExecutor
+from src.concurrency_limiter import AdaptiveConcurrencyLimiter
+from src.config import LLM_CONCURRENCY_INITIAL, LLM_QUEUE_SIZE
+from src.inventory_store import InMemoryInventoryStore
+from src.metrics import FALLBACKS, LLM_TOKENS, total, value
+from src.server import create_app
+
+from .fake_llm import FakeChatGoogleGenerativeAI
+
+BASE_URL = "http://wholesaler"
+
+
+class LoadTestResult:
+    """Outcome of a load-test run."""
+
+    def __init__(
+        self,
+        latencies: List[float],
+        errors: Dict[str, int],
+        duration: float,
+        llm_calls: int,
+        llm_tokens: float,
+        fallbacks: float,
+    ):
+        self.latencies = sorted(latencies)
+        self.errors = dict(errors)
+        self.duration = duration
+        self.llm_calls = llm_calls
+        self.llm_tokens = llm_tokens
+        self.fallbacks = fallbacks
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def error_count(self) -> int:
+        return sum(self.errors.values())
+
+    @property
+    def error_rate(self) -> float:
+        return self.error_count / self.requests if self.requests else 0.0
+
+    @property
+    def throughput(self) -> float:
+        return self.requests / self.duration if self.duration else 0.0
+
+    def percentile(self, p: float) -> float:
+        """Latency percentile in seconds (``p`` between 0 and 100)."""
+        if not self.latencies:
+            return 0.0
+        if len(self.latencies) == 1:
+            return self.latencies[0]
+        cuts = statistics.quantiles(self.latencies, n=100, method="inclusive")
+        return cuts[min(98, max(0, round(p) - 1))]
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": self.error_rate,
+            "duration_s": self.duration,
+            "throughput_rps": self.throughput,
+            "p50_ms": self.percentile(50) * 1000,
+            "p95_ms": self.percentile(95) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "max_ms": (self.latencies[-1] if self.latencies else 0.0) * 1000,
+            "llm_calls": self.llm_calls,
+            "llm_tokens": self.llm_tokens,
+            "fallbacks": self.fallbacks,
+        }
+
+    def report(self) -> str:
+        data = self.as_dict()
+        lines = [
+            f"requests      {data['requests']}",
+            f"duration      {data['duration_s']:.2f} s",
+            f"throughput    {data['throughput_rps']:.1f} req/s",
+            f"latency p50   {data['p50_ms']:.1f} ms",
+            f"latency p95   {data['p95_ms']:.1f} ms",
+            f"latency p99   {data['p99_ms']:.1f} ms",
+            f"latency max   {data['max_ms']:.1f} ms",
+            f"errors        {self.error_count} ({self.error_rate:.2%})",
+        ]
+        lines.extend(f"  {kind:<16}{count}" for kind, count in sorted(self.errors.items()))
+        lines.append(f"llm calls     {self.llm_calls}")
+        lines.append(f"llm tokens    {self.llm_tokens:.0f}")
+        lines.append(f"fallbacks     {self.fallbacks:.0f}")
+        return "\n".join(lines)
+
+
+def build_messages(count: int, llm_ratio: float, distinct: int, seed: int) -> List[str]:
+    """Build the request messages of a run.
+
+    A ``llm_ratio`` fraction are free-text restock requests that need Gemini;
+    the rest are the structured payloads the supermarket sends, which the
+    rule engine answers. With ``distinct`` > 0 messages are drawn from that
+    many variants, so repeats hit the response cache.
+    """
+    rng = random.Random(seed)
+
+    def make() -> str:
+        products = [
+            (rng.randint(1, 500), rng.randint(1, 100)) for _ in range(rng.randint(1, 5))
+        ]
+        if rng.random() < llm_ratio:
+            return "I need to restock products: " + ", ".join(
+                f"product {pid} about {qty} units" for pid, qty in products
+            )
+        payload = [{"product_id": str(pid), "quantity": qty} for pid, qty in products]
+        return f"Please restock the following products: {payload}"
+
+    if distinct > 0:
+        variants = [make() for _ in range(distinct)]
+        return [rng.choice(variants) for _ in range(count)]
+    return [make() for _ in range(count)]
+
+
+def _classify(response) -> Optional[str]:
+    """Return the error kind of an A2A response, or None on success."""
+    if isinstance(response.root, JSONRPCErrorResponse):
+        return "jsonrpc_error"
+    result = response.root.result
+    if isinstance(result, Task):
+        if result.status.state != TaskState.completed:
+            return f"task_{result.status.state.value}"
+        text = get_message_text(result.status.message) if result.status.message else ""
+    else:
+        text = get_message_text(result)
+    try:
+        if json.loads(text).get("status") == "error":
+            return "status_error"
+    except (ValueError, AttributeError):
+        return "invalid_json"
+    return None
+
+
+def _tokens() -> float:
+    return sum(
+        value(LLM_TOKENS, call=call, kind="total") for call in ("single", "batch")
+    )
+
+
+async def run_load_test(
+    requests: int = 200,
+    concurrency: int = 20,
+    llm_ratio: float = 0.5,
+    distinct: int = 0,
+    llm_latency: float = 0.8,
+    llm_sigma: float = 0.5,
+    llm_error_rate: float = 0.0,
+    llm_invalid_rate: float = 0.0,
+    seed: int = 0,
+    limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+) -> LoadTestResult:
+    """Run a load test and return its result.
+
+    ``limiter`` replaces the Gemini concurrency limiter built from the config.
+    """
+    llm = FakeChatGoogleGenerativeAI(
+        latency=llm_latency,
+        sigma=llm_sigma,
+        error_rate=llm_error_rate,
+        invalid_rate=llm_invalid_rate,
+        seed=seed,
+    )
+    agent = WholesalerAgent(llm=llm, inventory=InMemoryInventoryStore(default_stock=10**9))
+    if limiter is not None:
+        agent.gemini_agent.limiter = limiter
+    executor = WholesalerAgentExecutor(agent)
+    app = create_app(agent_executor=executor, task_store=InMemoryTaskStore())
+    messages = build_messages(requests, llm_ratio, distinct, seed)
+
+    latencies: List[float] = []
+    errors: Counter = Counter()
+    pending = iter(messages)
+    tokens_before = _tokens()
+    fallbacks_before = total(FALLBACKS)
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url=BASE_URL, timeout=None
+    ) as http:
+        client = A2AClient(httpx_client=http, url=f"{BASE_URL}/")
+
+        async def worker() -> None:
+            for text in pending:
+                request = SendMessageRequest(
+                    id=str(uuid4()),
+                    params=MessageSendParams(message={
+                        "role": "user",
+                        "parts": [{"kind": "text", "text": text}],
+                        "messageId": uuid4().hex,
+                    }),
+                )
+                started = time.perf_counter()
+                try:
+                    error = _classify(await client.send_message(request))
+                except Exception as e:
+                    error = type(e).__name__
+                latencies.append(time.perf_counter() - started)
+                if error:
+                    errors[error] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        duration = time.perf_counter() - started
+
+    executor.cleanup()
+    return LoadTestResult(
+        latencies,
+        errors,
+        duration,
+        llm.calls,
+        _tokens() - tokens_before,
+        total(FALLBACKS) - fallbacks_before,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--llm-ratio", type=float, default=0.5,
+                        help="fraction of free-text requests that need Gemini")
+    parser.add_argument("--distinct", type=int, default=0,
+                        help="number of distinct messages (0: all unique)")
+    parser.add_argument("--llm-latency-ms", type=float, default=800,
+                        help="median simulated Gemini latency")
+    parser.add_argument("--llm-sigma", type=float, default=0.5,
+                        help="log-normal spread of the simulated latency")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-invalid-rate", type=float, default=0.0)
+    parser.add_argument("--llm-concurrency", type=float, default=None,
+                        help="initial adaptive limit on concurrent Gemini calls")
+    parser.add_argument("--llm-queue-size", type=int, default=None,
+                        help="Gemini calls allowed to wait for a slot")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args(argv)
+
+    limiter = None
+    if args.llm_concurrency is not None or args.llm_queue_size is not None:
+        limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=args.llm_concurrency or LLM_CONCURRENCY_INITIAL,
+            max_queue=(
+                LLM_QUEUE_SIZE if args.llm_queue_size is None else args.llm_queue_size
+            ),
+        )
+
+    result = asyncio.run(run_load_test(
+        requests=args.requests,
+        concurrency=args.concurrency,
+        llm_ratio=args.llm_ratio,
+        distinct=args.distinct,
+        llm_latency=args.llm_latency_ms / 1000,
+        llm_sigma=args.llm_sigma,
+        llm_error_rate=args.llm_error_rate,
+        llm_invalid_rate=args.llm_invalid_rate,
+        seed=args.seed,
+        limiter=limiter,
+    ))
+    print(json.dumps(result.as_dict(), indent=2) if args.json else result.report())
+
+
+if __name__ == "__main__":
+    # Only warnings from the server; the report is the output
+    logging.disable(logging.INFO)
+    main()
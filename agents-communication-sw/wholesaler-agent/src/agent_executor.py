@@ -1,68 +1,115 @@
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events import EventQueue
-from a2a.utils import new_agent_text_message
+from a2a.server.tasks import TaskUpdater
+from a2a.types import DataPart, Part, TaskNotCancelableError, TaskState, TextPart
+from a2a.utils import new_agent_text_message, new_task
+from a2a.utils.errors import ServerError
+import asyncio
 import json
-import random
-import re
 import logging
-import datetime
+import random
+import time
+from typing import AsyncIterator, Dict, List, Optional, Set
+from uuid import uuid4
 
 from .gemini_agent import WholesalerGeminiAgent
-from .models import AgentConfig
-from .config import DEFAULT_AGENT_NAME, DEFAULT_PERSONALITY
-
-# Configure detailed logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('/tmp/wholesaler-agent.log')
-    ]
+from .restock_batcher import RestockBatcher
+from .concurrency_limiter import OverloadedError
+from .allocation import AllocationEngine
+from .message_parts import extract_message
+from .restock_parser import (
+    PayloadTooLargeError,
+    check_item_count,
+    check_payload_size,
+    parse_restock_items,
+    render_restock_message,
+)
+from .inventory_store import InventoryStore, SQLiteInventoryStore
+from .metrics import FALLBACKS, REQUESTS, REQUESTS_IN_FLIGHT, STAGE_SECONDS
+from .models import AgentConfig, ProductRestockRequest
+from .config import (
+    ALLOCATION_CHUNK_INTERVAL,
+    ALLOCATION_CHUNK_SIZE,
+    DEFAULT_AGENT_NAME,
+    DEFAULT_PERSONALITY,
+    FAST_PATH_ENABLED,
+    LOG_PAYLOAD_SAMPLE_RATE,
+    RESTOCK_ARTIFACT_NAME,
 )
 
 logger = logging.getLogger(__name__)
 
+TERMINAL_TASK_STATES = {
+    TaskState.completed,
+    TaskState.canceled,
+    TaskState.failed,
+    TaskState.rejected,
+}
+
 def log_message_details(direction: str, message: str, context: str = ""):
-    """Log message details with timestamp and direction."""
-    timestamp = datetime.datetime.now().isoformat()
-    separator = "=" * 80
-    logger.info(f"\n{separator}")
-    logger.info(f"[{timestamp}] {direction} MESSAGE")
-    if context:
-        logger.info(f"Context: {context}")
-    logger.info(f"Content: {message}")
-    logger.info(f"{separator}\n")
+    """Log message details as a single structured record.
+
+    The full payload is only included for a LOG_PAYLOAD_SAMPLE_RATE fraction
+    of messages; the rest record its size.
+    """
+    fields = {
+        "direction": direction,
+        "context": context,
+        "content_length": len(message),
+    }
+    if LOG_PAYLOAD_SAMPLE_RATE >= 1.0 or random.random() < LOG_PAYLOAD_SAMPLE_RATE:
+        fields["content"] = message
+    logger.info(f"{direction} MESSAGE", extra=fields)
 
 
 # --8<-- [start:WholesalerAgent]
 class WholesalerAgent:
     """Wholesaler Agent that processes restock requests using Gemini."""
 
-    def __init__(self):
-        """Initialize the wholesaler agent with Gemini."""
+    def __init__(self, llm=None, inventory: Optional[InventoryStore] = None):
+        """Initialize the wholesaler agent with Gemini.
+
+        Args:
+            llm: Chat model to use instead of ChatGoogleGenerativeAI.
+            inventory: Inventory store; defaults to the SQLite store.
+        """
         self.gemini_agent = None
-        self._initialize_gemini()
+        self.restock_batcher = None
+        self.allocation_engine = AllocationEngine(
+            inventory if inventory is not None else SQLiteInventoryStore()
+        )
+        self._initialize_gemini(llm)
 
-    def _initialize_gemini(self):
+    def _initialize_gemini(self, llm=None):
         """Initialize the Gemini agent."""
         try:
             self.gemini_agent = WholesalerGeminiAgent.create_default(
                 name=DEFAULT_AGENT_NAME,
                 personality=DEFAULT_PERSONALITY
             )
-            self.gemini_agent.initialize()
+            self.gemini_agent.initialize(llm)
+            self.restock_batcher = RestockBatcher(
+                self.gemini_agent.process_restock_batch
+            )
             logger.info("Wholesaler Gemini agent initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize Gemini agent: {e}")
             self.gemini_agent = None
 
+    async def warm_up(self) -> None:
+        """Prepare the agent for its first request."""
+        if self.gemini_agent:
+            await self.gemini_agent.warm_up()
+
     def cleanup(self):
         """Clean up resources."""
         try:
             if self.gemini_agent:
                 self.gemini_agent.cleanup()
                 self.gemini_agent = None
+            if self.allocation_engine:
+                self.allocation_engine.inventory.close()
+                self.allocation_engine = None
             logger.info("WholesalerAgent cleaned up successfully")
         except Exception as e:
             logger.warning(f"Error during WholesalerAgent cleanup: {e}")
@@ -74,23 +121,100 @@ class WholesalerAgent:
         except Exception:
             pass  # Ignore errors during destruction
 
-    async def invoke(self, message: str) -> str:
-        """Process a restock request and return available quantities using Gemini."""
+    def streams_allocations(
+        self, message: str, items: Optional[List[ProductRestockRequest]]
+    ) -> bool:
+        """Tell whether the rule engine answers this request product by product.
+
+        That is the case for structured restock lists within the size limits
+        when the fast path is on; ``invoke`` handles everything else.
+        """
+        if items is None or not FAST_PATH_ENABLED:
+            return False
+        try:
+            check_item_count(items)
+            check_payload_size(message)
+        except PayloadTooLargeError:
+            return False
+        return True
+
+    async def stream_allocations(
+        self, items: List[ProductRestockRequest]
+    ) -> AsyncIterator[Dict[str, int]]:
+        """Allocate a structured restock list, yielding each product once it is reserved."""
+        REQUESTS.labels(path="fast_path").inc()
+        for allocation in self.allocation_engine.iter_allocate(items):
+            yield allocation
+            # Give the event loop a turn to send it before the next product
+            await asyncio.sleep(0)
+
+    async def invoke(
+        self, message: str, items: Optional[List[ProductRestockRequest]] = None
+    ) -> str:
+        """Process a restock request and return available quantities using Gemini.
+
+        Args:
+            message: Text of the request.
+            items: Restock list sent as structured data, used without parsing
+                ``message``.
+        """
+
+        try:
+            if items is not None:
+                check_item_count(items)
+            check_payload_size(message)
+        except PayloadTooLargeError as e:
+            logger.warning(str(e))
+            REQUESTS.labels(path="rejected").inc()
+            return json.dumps({
+                "status": "error",
+                "message": f"Restock request rejected: {e}",
+                "restockable_products": []
+            }, indent=2)
+
+        # Structured product_id/quantity payloads are answered by the rule engine
+        if items is not None:
+            if FAST_PATH_ENABLED:
+                REQUESTS.labels(path="fast_path").inc()
+                return self.allocation_engine.process(items)
+            message = "\n".join(filter(None, [message, render_restock_message(items)]))
+        elif FAST_PATH_ENABLED:
+            fast_response = self.allocation_engine.try_process(message)
+            if fast_response is not None:
+                logger.info("Restock request answered by the allocation engine")
+                REQUESTS.labels(path="fast_path").inc()
+                return fast_response
 
         # Try to use Gemini agent if available
         if self.gemini_agent and self.gemini_agent.is_initialized():
+            if self.gemini_agent.breaker.is_open:
+                # Gemini keeps failing: answer locally without waiting on it
+                REQUESTS.labels(path="fallback").inc()
+                FALLBACKS.labels(reason="circuit_open").inc()
+                return self._fallback_restock_processing(message)
             try:
                 if "restock" in message.lower() and "product" in message.lower():
-                    return await self.gemini_agent.process_restock_request(message)
+                    REQUESTS.labels(path="llm_restock").inc()
+                    response = await self.restock_batcher.submit(message)
+                    # Quantities proposed by Gemini are reserved against real stock
+                    return self.allocation_engine.reserve_response(response)
                 else:
                     # For non-restock messages, use Gemini for general responses
+                    REQUESTS.labels(path="llm_general").inc()
                     return await self.gemini_agent.process_restock_request(
                         f"Responde a este mensaje como un mayorista: {message}"
                     )
+            except OverloadedError:
+                # Rejected fast instead of answering with fallback quantities
+                REQUESTS.labels(path="overloaded").inc()
+                raise
             except Exception:
+                FALLBACKS.labels(reason="agent_error").inc()
                 return self._fallback_restock_processing(message)
         else:
             # Fallback to original logic if Gemini is not available
+            REQUESTS.labels(path="fallback").inc()
+            FALLBACKS.labels(reason="agent_unavailable").inc()
             return self._fallback_restock_processing(message)
 
     def _fallback_restock_processing(self, message: str) -> str:
@@ -109,38 +233,11 @@ class WholesalerAgent:
         logger.info("Processing restock request using fallback logic")
 
         try:
-            products_data = []
-
-            # Extract product_id and quantity patterns - handle both single and double quotes
-            patterns = [
-                r'"product_id":\s*(\d+),\s*"quantity":\s*(\d+)',  # JSON with double quotes
-                r"'product_id':\s*(\d+),\s*'quantity':\s*(\d+)",  # Python dict with single quotes
-                r"product_id[=:]?\s*(\d+).*?quantity[=:]?\s*(\d+)",  # Natural language
-            ]
-
-            matches = []
-            for pattern in patterns:
-                matches.extend(re.findall(pattern, message))
-                if matches:  # If we found matches, use them
-                    logger.info(f"Found product matches using pattern: {pattern}")
-                    break
-
-            logger.info(f"Extracted {len(matches)} product requests from message")
-
-            if matches:
-                for product_id_str, quantity_str in matches:
-                    product_id = int(product_id_str)
-                    requested_quantity = int(quantity_str)
+            items = parse_restock_items(message)
+            logger.info(f"Extracted {len(items)} product requests from message")
 
-                    # Simulate wholesaler availability: 0 to requested quantity
-                    available_quantity = random.randint(0, requested_quantity)
-
-                    logger.info(f"Product {product_id}: requested={requested_quantity}, available={available_quantity}")
-
-                    products_data.append({
-                        "product_id": product_id,
-                        "quantity": available_quantity
-                    })
+            # Availability comes from the inventory store
+            products_data = self.allocation_engine.allocate(items) if items else []
 
             # Return structured JSON response
             response = {
@@ -170,8 +267,15 @@ class WholesalerAgent:
 class WholesalerAgentExecutor(AgentExecutor):
     """Wholesaler Agent Executor Implementation."""
 
-    def __init__(self):
-        self.agent = WholesalerAgent()
+    def __init__(self, agent: Optional[WholesalerAgent] = None):
+        self.agent = agent if agent is not None else WholesalerAgent()
+        # In-flight agent invocations by A2A task id, used by cancel()
+        self._running: Dict[str, asyncio.Task] = {}
+        self._canceled: Set[str] = set()
+
+    async def warm_up(self) -> None:
+        """Warm up the agent before the server reports itself ready."""
+        await self.agent.warm_up()
 
     def cleanup(self):
         """Clean up resources."""
@@ -195,57 +299,201 @@ class WholesalerAgentExecutor(AgentExecutor):
         self,
         context: RequestContext,
         event_queue: EventQueue,
+    ) -> None:
+        with REQUESTS_IN_FLIGHT.track_inprogress(), STAGE_SECONDS.labels(stage="total").time():
+            await self._execute(context, event_queue)
+
+    async def _execute(
+        self,
+        context: RequestContext,
+        event_queue: EventQueue,
     ) -> None:
         # Log execution start
         logger.info("WholesalerAgentExecutor.execute called")
+        started = time.perf_counter()
 
-        # Extract message from context
-        message_text = ""
-        if hasattr(context, 'message') and context.message:
-            if hasattr(context.message, 'parts') and context.message.parts:
-                # Handle different Part object structures
-                part = context.message.parts[0]
-                if hasattr(part, 'text'):
-                    message_text = part.text
-                elif hasattr(part, 'content') and hasattr(part.content, 'text'):
-                    message_text = part.content.text
-                elif hasattr(part, 'kind') and part.kind == 'text':
-                    # Try to access text content in different ways
-                    if hasattr(part, 'text'):
-                        message_text = part.text
-                    elif hasattr(part, 'content'):
-                        message_text = str(part.content)
-                else:
-                    # If we can't extract text properly, convert to string and extract
-                    part_str = str(part)
-                    # Extract text from TextPart string representation like: root=TextPart(kind='text', metadata=None, text='actual text')
-                    import re
-                    match = re.search(r"text='([^']*)'", part_str)
-                    if match:
-                        message_text = match.group(1)
-                    else:
-                        message_text = part_str
+        # Extract the text and any structured restock list from every part
+        content = extract_message(context.message)
+        message_text = content.text
+
+        STAGE_SECONDS.labels(stage="extract").observe(time.perf_counter() - started)
 
         # Log extracted message
         log_message_details("EXTRACTED", message_text, "WholesalerAgentExecutor.execute")
 
-        # Process the message
-        result = await self.agent.invoke(message_text)
+        # Publish the task and a working status right away so streaming
+        # clients get a first event before the allocation is decided
+        task = context.current_task
+        if not task:
+            task = new_task(context.message)
+            await event_queue.enqueue_event(task)
+        updater = TaskUpdater(event_queue, task.id, task.context_id)
+        await updater.start_work()
+
+        # Structured lists are published in chunks while they are allocated;
+        # other requests are answered in one piece
+        streamed = self.agent.streams_allocations(message_text, content.items)
+        if streamed:
+            work = self._stream_allocations(updater, content.items)
+        else:
+            work = self.agent.invoke(message_text, content.items)
+
+        # Process the message in its own task so cancel() can stop it
+        invoke_task = asyncio.ensure_future(work)
+        self._running[task.id] = invoke_task
+        started = time.perf_counter()
+        try:
+            result = await invoke_task
+            STAGE_SECONDS.labels(stage="invoke").observe(time.perf_counter() - started)
+        except OverloadedError as e:
+            await self._reject_overloaded(updater, e)
+            return
+        except asyncio.CancelledError:
+            if task.id in self._canceled:
+                # Stopped by cancel(), which already published the status
+                logger.info(f"Task {task.id} was canceled")
+                return
+            raise
+        finally:
+            self._running.pop(task.id, None)
+            self._canceled.discard(task.id)
+
+        # The JSON result is parsed once and also sent as structured data,
+        # so clients don't have to parse the text part again
+        with STAGE_SECONDS.labels(stage="validate").time():
+            try:
+                data = json.loads(result)
+            except ValueError:
+                data = None
+        started = time.perf_counter()
+        parts = [Part(root=TextPart(text=result))]
+        if isinstance(data, dict):
+            if not streamed:
+                # Stream the allocated products as chunks of the same artifact
+                await self._publish_allocations(updater, data)
+            parts.append(Part(root=DataPart(data=data)))
 
         # Log final result being sent to event queue
         log_message_details("QUEUING", result, "WholesalerAgentExecutor.execute - to event_queue")
 
-        await event_queue.enqueue_event(new_agent_text_message(result))
+        await updater.complete(message=updater.new_agent_message(parts))
+        STAGE_SECONDS.labels(stage="enqueue").observe(time.perf_counter() - started)
 
         logger.info("WholesalerAgentExecutor.execute completed successfully")
 
+    async def _reject_overloaded(self, updater: TaskUpdater, error: OverloadedError) -> None:
+        """Finish the task as rejected so the client can retry later (A2A's 429)."""
+        data = {
+            "status": "error",
+            "message": str(error),
+            "restockable_products": [],
+            "retry_after": error.retry_after,
+        }
+        logger.warning(f"Task {updater.task_id} rejected: {error}")
+        await updater.reject(updater.new_agent_message([
+            Part(root=TextPart(text=json.dumps(data, indent=2))),
+            Part(root=DataPart(data=data)),
+        ]))
+
+    async def _stream_allocations(
+        self, updater: TaskUpdater, items: List[ProductRestockRequest]
+    ) -> str:
+        """Emit artifact chunks while the products are being allocated.
+
+        The first product goes out on its own; after that, products are
+        grouped up to ``ALLOCATION_CHUNK_SIZE`` per chunk, or whatever was
+        allocated within ``ALLOCATION_CHUNK_INTERVAL`` seconds, so the number
+        of events does not grow one-to-one with the order.
+
+        Returns the JSON response with every allocation.
+        """
+        artifact_id = str(uuid4())
+        allocations = []
+        chunk = []
+        sent_at = time.monotonic()
+        async for product in self.agent.stream_allocations(items):
+            allocations.append(product)
+            chunk.append(product)
+            if (
+                len(allocations) == 1
+                or len(chunk) >= ALLOCATION_CHUNK_SIZE
+                or time.monotonic() - sent_at >= ALLOCATION_CHUNK_INTERVAL
+            ):
+                await self._publish_chunk(
+                    updater, artifact_id, chunk,
+                    append=len(allocations) > len(chunk),
+                    last_chunk=len(allocations) == len(items),
+                )
+                chunk = []
+                sent_at = time.monotonic()
+        if chunk:
+            await self._publish_chunk(
+                updater, artifact_id, chunk,
+                append=len(allocations) > len(chunk), last_chunk=True,
+            )
+        return AllocationEngine.render(allocations)
+
+    async def _publish_allocations(self, updater: TaskUpdater, data: dict) -> None:
+        """Emit the restockable products of the result in chunks of the same artifact."""
+        products = data.get("restockable_products") or []
+
+        artifact_id = str(uuid4())
+        for start in range(0, len(products), ALLOCATION_CHUNK_SIZE):
+            await self._publish_chunk(
+                updater, artifact_id, products[start:start + ALLOCATION_CHUNK_SIZE],
+                append=start > 0,
+                last_chunk=start + ALLOCATION_CHUNK_SIZE >= len(products),
+            )
+
+    @staticmethod
+    async def _publish_chunk(
+        updater: TaskUpdater,
+        artifact_id: str,
+        products: List[dict],
+        append: bool,
+        last_chunk: bool,
+    ) -> None:
+        await updater.add_artifact(
+            [Part(root=DataPart(data=product)) for product in products],
+            artifact_id=artifact_id,
+            name=RESTOCK_ARTIFACT_NAME,
+            append=append,
+            last_chunk=last_chunk,
+        )
+
     # --8<-- [end:WholesalerAgentExecutor_execute]
 
     # --8<-- [start:WholesalerAgentExecutor_cancel]
     async def cancel(
         self, context: RequestContext, event_queue: EventQueue
     ) -> None:
-        raise Exception('cancel not supported')
+        """Stop the in-flight processing of a task and mark it as canceled.
+
+        Only the worker running the task can stop it. Anywhere else the task
+        is not canceled, since the worker running it would still finish it
+        and reserve the stock; with several workers, cancel requests need to
+        reach the worker that received the task.
+        """
+        task = context.current_task
+        if task and task.status.state in TERMINAL_TASK_STATES:
+            raise ServerError(error=TaskNotCancelableError())
+
+        running = self._running.pop(context.task_id, None)
+        if running is None:
+            logger.info(f"Task {context.task_id} is not running in this worker")
+            raise ServerError(error=TaskNotCancelableError(
+                message="Task is not running in this worker"
+            ))
+        self._canceled.add(context.task_id)
+        running.cancel()
+        logger.info(f"Canceled in-flight processing for task {context.task_id}")
+
+        updater = TaskUpdater(event_queue, context.task_id, context.context_id)
+        await updater.cancel(
+            updater.new_agent_message(
+                [Part(root=TextPart(text="Solicitud de reposición cancelada"))]
+            )
+        )
 
     # --8<-- [end:WholesalerAgentExecutor_cancel]
 
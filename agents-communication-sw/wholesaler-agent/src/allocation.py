@@ -0,0 +1,106 @@
+"""
+Rule-based allocation engine for structured restock requests.
+"""
+import json
+import logging
+from typing import Dict, Iterator, List, Optional
+
+from .config import MAX_UNITS_PER_PRODUCT, PRODUCT_CAPS
+from .inventory_store import InMemoryInventoryStore, InventoryStore
+from .models import ProductRestockRequest
+from .restock_parser import extract_structured_items, to_request
+
+logger = logging.getLogger(__name__)
+
+
+class AllocationEngine:
+    """Allocates stock for restock requests without calling the LLM.
+
+    Each product gets ``min(requested, cap, available stock)`` units, where the
+    cap is the per-product override (``WHOLESALER_PRODUCT_CAPS`` by default) or
+    ``max_per_request``. Allocated units are reserved in the inventory store.
+    """
+
+    def __init__(
+        self,
+        inventory: Optional[InventoryStore] = None,
+        max_per_request: int = MAX_UNITS_PER_PRODUCT,
+        product_caps: Optional[Dict[int, int]] = None,
+    ):
+        self.inventory = inventory if inventory is not None else InMemoryInventoryStore()
+        self.max_per_request = max_per_request
+        self.product_caps: Dict[int, int] = dict(
+            PRODUCT_CAPS if product_caps is None else product_caps
+        )
+
+    def available(self, product_id: int) -> int:
+        """Return the units currently available for a product."""
+        return self.inventory.available(product_id)
+
+    def _wanted(self, item: ProductRestockRequest) -> int:
+        return min(item.quantity, self.product_caps.get(item.product_id, self.max_per_request))
+
+    @staticmethod
+    def _allocation(item: ProductRestockRequest, quantity: int) -> Dict[str, int]:
+        logger.info(
+            f"Product {item.product_id}: requested={item.quantity}, allocated={quantity}"
+        )
+        return {"product_id": item.product_id, "quantity": quantity}
+
+    def allocate(self, items: List[ProductRestockRequest]) -> List[Dict[str, int]]:
+        """Allocate units for each requested product and reserve them."""
+        reserved = self.inventory.reserve(
+            [(item.product_id, self._wanted(item)) for item in items]
+        )
+        return [self._allocation(item, quantity) for item, quantity in zip(items, reserved)]
+
+    def iter_allocate(
+        self, items: List[ProductRestockRequest]
+    ) -> Iterator[Dict[str, int]]:
+        """Allocate and reserve products one at a time, yielding each allocation.
+
+        Products after the one being yielded are not reserved yet, so
+        stopping the iteration leaves their stock untouched.
+        """
+        for item in items:
+            (quantity,) = self.inventory.reserve([(item.product_id, self._wanted(item))])
+            yield self._allocation(item, quantity)
+
+    def reserve_response(self, response: str) -> str:
+        """Reserve the quantities of a JSON restock response against the inventory.
+
+        Used for answers produced elsewhere (LLM or fallback) so every path
+        draws from the same stock. Non-JSON responses are returned unchanged.
+        """
+        try:
+            data = json.loads(response)
+        except ValueError:
+            return response
+        if not isinstance(data, dict) or not data.get("restockable_products"):
+            return response
+
+        items = [to_request(item) for item in data["restockable_products"]]
+        if not all(items):
+            return response
+        data["restockable_products"] = self.allocate(items)
+        return json.dumps(data, indent=2)
+
+    def try_process(self, message: str) -> Optional[str]:
+        """Answer a structured restock message, or return None if it is free text."""
+        items = extract_structured_items(message)
+        if not items:
+            return None
+        return self.process(items)
+
+    def process(self, items: List[ProductRestockRequest]) -> str:
+        """Allocate a structured restock list and return the JSON response."""
+        return self.render(self.allocate(items))
+
+    @staticmethod
+    def render(allocations: List[Dict[str, int]]) -> str:
+        """JSON response for the allocations of a restock list."""
+        return json.dumps({
+            "status": "success",
+            "restockable_products": allocations,
+            "message": f"Wholesaler can restock {len(allocations)} products"
+        }, indent=2)
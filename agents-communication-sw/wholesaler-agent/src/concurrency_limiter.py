@@ -0,0 +1,173 @@
+"""
+Adaptive (AIMD) concurrency limiter with a bounded admission queue for LLM calls.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Optional
+
+from .config import (
+    LLM_BACKOFF_RATIO,
+    LLM_CONCURRENCY_INITIAL,
+    LLM_CONCURRENCY_MAX,
+    LLM_CONCURRENCY_MIN,
+    LLM_LATENCY_TARGET,
+    LLM_QUEUE_SIZE,
+    LLM_QUEUE_TIMEOUT,
+)
+from .exceptions import WholesalerAgentError
+from .metrics import LLM_CONCURRENCY_LIMIT, LLM_QUEUE_DEPTH, LLM_REJECTED
+
+logger = logging.getLogger(__name__)
+
+
+class OverloadedError(WholesalerAgentError):
+    """Raised when an LLM call is rejected because the wholesaler is saturated."""
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """Tell whether an LLM error means Gemini is rate limiting or overloaded."""
+    while error is not None:
+        if isinstance(error, (asyncio.TimeoutError, OverloadedError)):
+            return True
+        code = getattr(error, "code", None) or getattr(error, "status_code", None)
+        # Only the status: a 429 anywhere in the text (an id, a quantity) means nothing
+        if code == 429 or "RESOURCE_EXHAUSTED" in str(error):
+            return True
+        error = error.__cause__
+    return False
+
+
+class AdaptiveConcurrencyLimiter:
+    """Bounds concurrent LLM calls with a limit adjusted by AIMD.
+
+    Each successful call raises the limit by ``1 / limit`` (about +1 per
+    round of calls); a rate-limit error, timeout or a call slower than
+    ``latency_target`` multiplies it by ``backoff_ratio``. Callers beyond the
+    limit wait in a FIFO queue of at most ``max_queue`` entries; when the
+    queue is full, or a caller waits longer than ``queue_timeout``, it is
+    rejected right away with OverloadedError instead of piling up.
+    """
+
+    def __init__(
+        self,
+        initial_limit: float = LLM_CONCURRENCY_INITIAL,
+        min_limit: float = LLM_CONCURRENCY_MIN,
+        max_limit: float = LLM_CONCURRENCY_MAX,
+        max_queue: int = LLM_QUEUE_SIZE,
+        queue_timeout: float = LLM_QUEUE_TIMEOUT,
+        backoff_ratio: float = LLM_BACKOFF_RATIO,
+        latency_target: Optional[float] = LLM_LATENCY_TARGET,
+    ):
+        self.min_limit = max(1.0, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = min(self.max_limit, max(self.min_limit, initial_limit))
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.backoff_ratio = backoff_ratio
+        self.latency_target = latency_target or None
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        LLM_CONCURRENCY_LIMIT.set(self.limit)
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def _has_capacity(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    def _reject(self, reason: str) -> OverloadedError:
+        LLM_REJECTED.labels(reason=reason).inc()
+        logger.warning(
+            f"Rejecting LLM call ({reason}): {self.in_flight} in flight, "
+            f"limit {self.limit:.1f}, {self.queue_depth} queued"
+        )
+        return OverloadedError(
+            "Wholesaler is overloaded, retry later", retry_after=self.queue_timeout
+        )
+
+    async def acquire(self) -> None:
+        """Wait for a free slot, or raise OverloadedError."""
+        if self._has_capacity() and not self._waiters:
+            self.in_flight += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            raise self._reject("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        LLM_QUEUE_DEPTH.set(self.queue_depth)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the wait timed out
+                self._release_slot()
+            raise self._reject("queue_timeout") from None
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release_slot()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            waiter.cancel()
+            LLM_QUEUE_DEPTH.set(self.queue_depth)
+
+    def try_acquire(self) -> bool:
+        """Take a free slot without queueing; False when none is free."""
+        if self._has_capacity() and not self._waiters:
+            self.in_flight += 1
+            return True
+        return False
+
+    def _release_slot(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        """Hand free slots to queued callers, oldest first."""
+        while self._waiters and self._has_capacity():
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+        LLM_QUEUE_DEPTH.set(self.queue_depth)
+
+    def release(self, latency: float, error: Optional[BaseException] = None) -> None:
+        """Free a slot and adapt the limit to the outcome of the call."""
+        if (error is not None and is_overload_error(error)) or (
+            error is None and self.latency_target and latency > self.latency_target
+        ):
+            self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+            logger.info(f"LLM concurrency limit decreased to {self.limit:.1f}")
+        elif error is None and self.in_flight >= int(self.limit):
+            # Only grow while the current limit is actually used
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        LLM_CONCURRENCY_LIMIT.set(self.limit)
+        self._release_slot()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold a slot for the enclosed LLM call."""
+        await self.acquire()
+        async with self.held():
+            yield
+
+    @asynccontextmanager
+    async def held(self) -> AsyncIterator[None]:
+        """Release a slot already taken when the enclosed LLM call ends."""
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            self.release(time.perf_counter() - started, e)
+            raise
+        self.release(time.perf_counter() - started)
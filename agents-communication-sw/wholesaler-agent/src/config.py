@@ -1,11 +1,119 @@
 """
 Configuration constants and settings for the wholesaler agent.
 """
+import os
+
+from dotenv import load_dotenv
+
+# Load .env before reading any setting below
+load_dotenv()
 
 # Agent constants
 DEFAULT_AGENT_NAME = "Wholesaler"
 DEFAULT_PERSONALITY = "un mayorista eficiente que maneja inventarios y reposición de productos"
 
+# Server: host/port and number of uvicorn worker processes
+SERVER_HOST = os.getenv("WHOLESALER_HOST", "localhost")
+SERVER_PORT = int(os.getenv("WHOLESALER_PORT", "8586"))
+SERVER_WORKERS = int(os.getenv("WHOLESALER_WORKERS", "1"))
+SERVER_PUBLIC_URL = os.getenv("WHOLESALER_PUBLIC_URL", f"http://localhost:{SERVER_PORT}/")
+# With several workers, per-process caches cannot be trusted for shared state
+MULTI_WORKER = SERVER_WORKERS > 1
+
+# A2A task store: "sqlite" (durable, bounded) or "memory"
+TASK_STORE_BACKEND = os.getenv("WHOLESALER_TASK_STORE", "sqlite")
+TASK_DB_PATH = os.getenv("WHOLESALER_TASK_DB", "/tmp/wholesaler-tasks.db")
+TASK_TTL_SECONDS = float(os.getenv("WHOLESALER_TASK_TTL", "3600"))
+TASK_CACHE_SIZE = int(
+    os.getenv("WHOLESALER_TASK_CACHE_SIZE", "0" if MULTI_WORKER else "1024")
+)
+TASK_EVICTION_INTERVAL = float(os.getenv("WHOLESALER_TASK_EVICTION_INTERVAL", "60"))
+# Longest time streamed artifact chunks stay in memory before being written
+TASK_ARTIFACT_FLUSH_INTERVAL = float(
+    os.getenv("WHOLESALER_TASK_ARTIFACT_FLUSH_INTERVAL", "1.0")
+)
+
+# Logging: records are written by a background listener as single-line JSON
+LOG_LEVEL = os.getenv("WHOLESALER_LOG_LEVEL", "INFO")
+LOG_FILE_PATH = os.getenv("WHOLESALER_LOG_FILE", "/tmp/wholesaler-agent.log")
+LOG_MAX_BYTES = int(os.getenv("WHOLESALER_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("WHOLESALER_LOG_BACKUP_COUNT", "5"))
+# Fraction of messages whose full payload is logged (the rest log only the size)
+LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv("WHOLESALER_LOG_PAYLOAD_SAMPLE_RATE", "1.0"))
+
+# LLM response cache (LRU + TTL); set WHOLESALER_RESPONSE_CACHE_DB to add a disk tier
+RESPONSE_CACHE_SIZE = int(os.getenv("WHOLESALER_RESPONSE_CACHE_SIZE", "256"))
+RESPONSE_CACHE_TTL = float(os.getenv("WHOLESALER_RESPONSE_CACHE_TTL", "300"))
+RESPONSE_CACHE_DB_PATH = os.getenv("WHOLESALER_RESPONSE_CACHE_DB") or None
+
+# Name of the streamed artifact holding the allocated products
+RESTOCK_ARTIFACT_NAME = "restockable_products"
+# Products per artifact chunk, and longest wait before a partial chunk is sent
+ALLOCATION_CHUNK_SIZE = int(os.getenv("WHOLESALER_ALLOCATION_CHUNK_SIZE", "100"))
+ALLOCATION_CHUNK_INTERVAL = float(os.getenv("WHOLESALER_ALLOCATION_CHUNK_INTERVAL", "0.05"))
+
+# Restock request coalescing: requests arriving within the window share one LLM call
+RESTOCK_BATCH_WINDOW = float(os.getenv("WHOLESALER_BATCH_WINDOW_MS", "20")) / 1000
+RESTOCK_BATCH_MAX_SIZE = int(os.getenv("WHOLESALER_BATCH_MAX_SIZE", "16"))
+
+# Rule-based allocation for structured restock payloads (no LLM involved)
+FAST_PATH_ENABLED = os.getenv("WHOLESALER_FAST_PATH", "1") != "0"
+DEFAULT_PRODUCT_STOCK = int(os.getenv("WHOLESALER_DEFAULT_STOCK", "500"))
+MAX_UNITS_PER_PRODUCT = int(os.getenv("WHOLESALER_MAX_UNITS_PER_PRODUCT", "100"))
+
+
+def parse_product_caps(value: str) -> dict:
+    """Per-product caps from ``"product_id:units,..."``, e.g. ``"7:20,12:5"``."""
+    caps = {}
+    for entry in filter(None, (part.strip() for part in value.split(","))):
+        product_id, _, units = entry.partition(":")
+        try:
+            caps[int(product_id)] = int(units)
+        except ValueError:
+            raise ValueError(
+                f"Invalid WHOLESALER_PRODUCT_CAPS entry {entry!r}, expected product_id:units"
+            ) from None
+    return caps
+
+
+# Overrides of MAX_UNITS_PER_PRODUCT for single products
+PRODUCT_CAPS = parse_product_caps(os.getenv("WHOLESALER_PRODUCT_CAPS", ""))
+# Restock messages longer than this are rejected before any parsing
+MAX_RESTOCK_PAYLOAD_CHARS = int(os.getenv("WHOLESALER_MAX_PAYLOAD_CHARS", "1000000"))
+# Same cap for restock lists sent as structured data
+MAX_RESTOCK_ITEMS = int(os.getenv("WHOLESALER_MAX_RESTOCK_ITEMS", "10000"))
+
+# Persistent inventory store
+INVENTORY_DB_PATH = os.getenv("WHOLESALER_INVENTORY_DB", "/tmp/wholesaler-inventory.db")
+INVENTORY_FLUSH_BATCH = int(os.getenv("WHOLESALER_INVENTORY_FLUSH_BATCH", "32"))
+INVENTORY_FLUSH_INTERVAL = float(os.getenv("WHOLESALER_INVENTORY_FLUSH_INTERVAL", "1.0"))
+# Reserve directly in the database instead of the per-process hot cache
+INVENTORY_WRITE_THROUGH = os.getenv(
+    "WHOLESALER_INVENTORY_WRITE_THROUGH", "1" if MULTI_WORKER else "0"
+) == "1"
+
+# Adaptive (AIMD) limit on concurrent Gemini calls and its admission queue
+LLM_CONCURRENCY_INITIAL = float(os.getenv("WHOLESALER_LLM_CONCURRENCY", "4"))
+LLM_CONCURRENCY_MIN = float(os.getenv("WHOLESALER_LLM_CONCURRENCY_MIN", "1"))
+LLM_CONCURRENCY_MAX = float(os.getenv("WHOLESALER_LLM_CONCURRENCY_MAX", "32"))
+LLM_BACKOFF_RATIO = float(os.getenv("WHOLESALER_LLM_BACKOFF_RATIO", "0.5"))
+# Calls slower than this (seconds) count as overload; 0 disables the check
+LLM_LATENCY_TARGET = float(os.getenv("WHOLESALER_LLM_LATENCY_TARGET", "0"))
+LLM_QUEUE_SIZE = int(os.getenv("WHOLESALER_LLM_QUEUE_SIZE", "64"))
+LLM_QUEUE_TIMEOUT = float(os.getenv("WHOLESALER_LLM_QUEUE_TIMEOUT", "10"))
+
+# Circuit breaker on Gemini and optional hedged requests
+GEMINI_BREAKER_FAILURE_THRESHOLD = int(os.getenv("WHOLESALER_GEMINI_BREAKER_FAILURES", "5"))
+GEMINI_BREAKER_RECOVERY_TIMEOUT = float(os.getenv("WHOLESALER_GEMINI_BREAKER_RECOVERY", "30"))
+LLM_HEDGING_ENABLED = os.getenv("WHOLESALER_LLM_HEDGING", "0") == "1"
+# A second attempt starts once a call is slower than this latency percentile
+LLM_HEDGE_PERCENTILE = float(os.getenv("WHOLESALER_LLM_HEDGE_PERCENTILE", "95"))
+LLM_HEDGE_DEFAULT_DELAY = float(os.getenv("WHOLESALER_LLM_HEDGE_DEFAULT_DELAY", "5"))
+
+# Startup warm-up: a tiny Gemini call opens the connection before /ready flips
+WARMUP_LLM_CALL = os.getenv("WHOLESALER_WARMUP_LLM_CALL", "1") != "0"
+WARMUP_TIMEOUT = float(os.getenv("WHOLESALER_WARMUP_TIMEOUT", "15"))
+
 # System prompt for the wholesaler agent
 WHOLESALER_SYSTEM_PROMPT = """
 Eres un agente mayorista de IA especializado en reposición de productos.
@@ -37,6 +145,20 @@ INSTRUCCIONES IMPORTANTES:
 6. Considera factores como disponibilidad de stock, tipo de producto, etc.
 
 EJEMPLO:
-Solicitud: "Please restock: [{'product_id': 1, 'quantity': 50}, {'product_id': 2, 'quantity': 30}]"
+Solicitud: "Please restock: [{{'product_id': 1, 'quantity': 50}}, {{'product_id': 2, 'quantity': 30}}]"
 Respuesta: {{"status": "success", "restockable_products": [{{"product_id": 1, "quantity": 40}}, {{"product_id": 2, "quantity": 25}}], "message": "Puedo suministrar parcialmente los productos solicitados"}}
 """
+
+# Instructions appended to the system prompt when several requests share one call
+WHOLESALER_BATCH_PROMPT = """
+MODO LOTE:
+Recibirás varias solicitudes independientes, cada una precedida por
+"Solicitud <request_id>:". Procesa cada una por separado y responde con un
+único JSON válido en este formato exacto:
+{{
+  "responses": [
+    {{"request_id": <request_id>, "status": "success", "restockable_products": [...], "message": "..."}}
+  ]
+}}
+Incluye exactamente una entrada por cada request_id recibido.
+"""
@@ -1,15 +1,41 @@
 """
 Gemini agent for the wholesaler application.
 """
+import asyncio
 import os
+import time
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import SystemMessage, HumanMessage
 import logging
 import json
+from typing import List, Optional
 
-from .models import AgentConfig
-from .config import WHOLESALER_SYSTEM_PROMPT
+from .models import AgentConfig, RestockBatchResponse, RestockResponse
+from .config import (
+    GEMINI_BREAKER_FAILURE_THRESHOLD,
+    GEMINI_BREAKER_RECOVERY_TIMEOUT,
+    LLM_HEDGE_DEFAULT_DELAY,
+    LLM_HEDGE_PERCENTILE,
+    LLM_HEDGING_ENABLED,
+    WARMUP_LLM_CALL,
+    WARMUP_TIMEOUT,
+    WHOLESALER_BATCH_PROMPT,
+    WHOLESALER_SYSTEM_PROMPT,
+)
+from .concurrency_limiter import AdaptiveConcurrencyLimiter, OverloadedError
 from .exceptions import AgentInitializationError
+from .metrics import (
+    FALLBACKS,
+    LLM_CALLS,
+    LLM_CLIENTS,
+    LLM_IN_FLIGHT,
+    LLM_SECONDS,
+    record_llm_usage,
+)
+from .llm_registry import llm_key, llm_registry
+from .resilience import CircuitBreaker, CircuitOpenError, LatencyTracker, hedged
+from .response_cache import ResponseCache
+from .restock_parser import parse_restock_items
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +46,25 @@ class WholesalerGeminiAgent:
     def __init__(self, config: AgentConfig):
         self.config = config
         self.llm = None
+        self.restock_llm = None
+        self.batch_llm = None
         self._initialized = False
+        self.response_cache = ResponseCache(
+            namespace=f"{config.model_name}:{config.temperature}"
+        )
+        self.limiter = AdaptiveConcurrencyLimiter()
+        self.breaker = CircuitBreaker(
+            "gemini",
+            failure_threshold=GEMINI_BREAKER_FAILURE_THRESHOLD,
+            recovery_timeout=GEMINI_BREAKER_RECOVERY_TIMEOUT,
+        )
+        self.latency = LatencyTracker()
+        # The prompts only depend on the config, so they are formatted once
+        self.system_prompt = WHOLESALER_SYSTEM_PROMPT.format(
+            agent_name=config.name,
+            personality=config.personality
+        )
+        self.batch_system_prompt = self.system_prompt + WHOLESALER_BATCH_PROMPT.format()
 
     @classmethod
     def create_default(cls, name: str, personality: str):
@@ -31,22 +75,44 @@ class WholesalerGeminiAgent:
         )
         return cls(config)
 
-    def initialize(self):
-        """Initialize the agent's LLM."""
+    def initialize(self, llm=None):
+        """Initialize the agent's LLM.
+
+        Args:
+            llm: Chat model to use instead of building ChatGoogleGenerativeAI,
+                e.g. the simulated model of the load-test harness.
+        """
         if self._initialized:
             logger.info("Agent already initialized, skipping")
             return
 
         try:
-            # Get API key from environment variable
-            api_key = os.getenv("GOOGLE_API_KEY")
-            if not api_key:
-                raise AgentInitializationError("GOOGLE_API_KEY environment variable not set")
-
-            self.llm = ChatGoogleGenerativeAI(
-                model=self.config.model_name,
-                temperature=self.config.temperature,
-                api_key=api_key
+            if llm is None:
+                # Get API key from environment variable
+                api_key = os.getenv("GOOGLE_API_KEY")
+                if not api_key:
+                    raise AgentInitializationError("GOOGLE_API_KEY environment variable not set")
+
+                # One client per model and temperature for the whole process.
+                # A worker serves every request from one event loop, so the
+                # client is called directly rather than through the registry.
+                llm = llm_registry.get(
+                    llm_key(self.config.model_name, self.config.temperature),
+                    lambda: ChatGoogleGenerativeAI(
+                        model=self.config.model_name,
+                        temperature=self.config.temperature,
+                        api_key=api_key
+                    ),
+                )
+                LLM_CLIENTS.set(llm_registry.stats()["clients"])
+            self.llm = llm
+            # Schema-constrained runnables return validated pydantic models;
+            # the raw message is kept for its usage_metadata
+            self.restock_llm = self.llm.with_structured_output(
+                RestockResponse, include_raw=True
+            )
+            self.batch_llm = self.llm.with_structured_output(
+                RestockBatchResponse, include_raw=True
             )
             self._initialized = True
             logger.info("Wholesaler Gemini agent initialized successfully")
@@ -56,79 +122,202 @@ class WholesalerGeminiAgent:
                 f"Wholesaler agent initialization failed: {e}"
             ) from e
 
+    async def warm_up(self, timeout: float = WARMUP_TIMEOUT) -> bool:
+        """Open the connection to Gemini with a tiny request.
+
+        Returns True when the call succeeded. Failures are only logged: the
+        agent still answers through the fallback path.
+        """
+        if not self.is_initialized() or not WARMUP_LLM_CALL:
+            return False
+        try:
+            await asyncio.wait_for(
+                self.llm.ainvoke([HumanMessage(content="ping")]), timeout
+            )
+            logger.info("Gemini connection warmed up")
+            return True
+        except Exception as e:
+            logger.warning(f"Gemini warm-up call failed: {e}")
+            return False
+
     async def process_restock_request(self, message: str) -> str:
-        """Process a restock request using Gemini."""
+        """Process a restock request using Gemini.
+
+        Identical messages are answered from the response cache, and
+        concurrent identical messages share a single Gemini call.
+
+        Raises:
+            OverloadedError: If the LLM admission queue rejects the call.
+        """
         if not self.is_initialized():
+            return self._create_fallback_response(message, reason="llm_unavailable")
+
+        json_part = await self.response_cache.get_or_compute(
+            message, lambda: self._invoke_llm(message)
+        )
+        if json_part is None:
             return self._create_fallback_response(message)
+        return json_part
 
+    async def _invoke_llm(self, message: str) -> Optional[str]:
+        """Ask Gemini for a JSON answer; None if it fails or returns no valid JSON."""
         try:
-            # Prepare the system prompt
-            system_prompt = WHOLESALER_SYSTEM_PROMPT.format(
-                agent_name=self.config.name,
-                personality=self.config.personality
-            )
-
-            # Create messages
             messages = [
-                SystemMessage(content=system_prompt),
+                SystemMessage(content=self.system_prompt),
                 HumanMessage(content=message)
             ]
 
-            # Get response from Gemini
-            response = await self.llm.ainvoke(messages)
+            # Gemini answers in the RestockResponse schema, parsed once here
+            response = await self._ainvoke_structured(self.restock_llm, "single", messages)
+            return response.model_dump_json(indent=2)
 
-            # Extract text content
-            response_text = response.content if hasattr(response, 'content') else str(response)
+        except OverloadedError:
+            raise
+        except Exception as e:
+            logger.warning(f"Structured Gemini call failed: {e}")
+            return None
 
-            # Try to extract and validate JSON response
-            json_start = response_text.find('{')
-            json_end = response_text.rfind('}') + 1
+    async def _ainvoke_structured(self, llm, call: str, messages):
+        """Run a structured-output call and record its latency, outcome and tokens.
 
-            if json_start != -1 and json_end > json_start:
-                json_part = response_text[json_start:json_end]
-                # Validate JSON
-                parsed_json = json.loads(json_part)
-                return json_part
-            else:
-                return self._create_fallback_response(message)
+        The call waits for a slot of the adaptive concurrency limiter and goes
+        through the circuit breaker. Returns the parsed model; raises
+        ValueError if the output does not match the schema, OverloadedError
+        if the limiter rejects the call and CircuitOpenError while Gemini is
+        considered down.
+        """
+        if self.breaker.is_open:
+            LLM_CALLS.labels(call=call, outcome="circuit_open").inc()
+            raise CircuitOpenError("Gemini circuit is open")
 
-        except Exception:
-            return self._create_fallback_response(message)
+        async with self.limiter.slot():
+            with LLM_IN_FLIGHT.track_inprogress(), LLM_SECONDS.labels(call=call).time():
+                try:
+                    result = await self.breaker.call(self._ainvoke, llm, messages)
+                except CircuitOpenError:
+                    LLM_CALLS.labels(call=call, outcome="circuit_open").inc()
+                    raise
+                except Exception:
+                    LLM_CALLS.labels(call=call, outcome="error").inc()
+                    raise
 
-    def _create_fallback_response(self, message: str) -> str:
-        """Create a fallback response when Gemini doesn't return valid JSON."""
+        record_llm_usage(call, result.get("raw"))
+        if result.get("parsing_error") is not None or result.get("parsed") is None:
+            LLM_CALLS.labels(call=call, outcome="invalid_output").inc()
+            raise ValueError(
+                f"Gemini output does not match the schema: {result.get('parsing_error')}"
+            )
+        LLM_CALLS.labels(call=call, outcome="success").inc()
+        return result["parsed"]
+
+    async def _ainvoke(self, llm, messages):
+        """Call the LLM, hedging slow calls when enabled and capacity allows.
+
+        The first attempt runs in the caller's limiter slot; a hedged
+        attempt needs a slot of its own and is skipped when none is free.
+        """
+        if not LLM_HEDGING_ENABLED:
+            return await self._timed_ainvoke(llm, messages)
+        delay = self.latency.percentile(LLM_HEDGE_PERCENTILE) or LLM_HEDGE_DEFAULT_DELAY
+        attempts = 0
+
+        async def attempt():
+            nonlocal attempts
+            attempts += 1
+            if attempts == 1:
+                return await self._timed_ainvoke(llm, messages)
+            if not self.limiter.try_acquire():
+                # hedged() then keeps waiting for the first attempt
+                raise OverloadedError("No free LLM slot for a hedged attempt")
+            async with self.limiter.held():
+                return await self._timed_ainvoke(llm, messages)
+
+        return await hedged(attempt, delay)
+
+    async def _timed_ainvoke(self, llm, messages):
+        started = time.perf_counter()
         try:
-            import re
-            import random
-
-            # Extract product info from the message
-            patterns = [
-                r'"product_id":\s*(\d+),\s*"quantity":\s*(\d+)',
-                r"'product_id':\s*(\d+),\s*'quantity':\s*(\d+)",
-                r"product_id[=:]?\s*(\d+).*?quantity[=:]?\s*(\d+)",
-                r"(\d+).*?(\d+)",  # Simple: any two numbers
+            result = await llm.ainvoke(messages)
+        except asyncio.CancelledError:
+            # Lost to a hedged attempt: it was at least this slow, and
+            # leaving it out would drag the percentile down
+            self.latency.observe(time.perf_counter() - started)
+            raise
+        self.latency.observe(time.perf_counter() - started)
+        return result
+
+    async def process_restock_batch(self, messages: List[str]) -> List[str]:
+        """Process several restock requests with a single Gemini call.
+
+        Returns one JSON response per message, in the same order. Requests the
+        model leaves out of its answer get the fallback response.
+        """
+        if len(messages) == 1:
+            return [await self.process_restock_request(messages[0])]
+        if not self.is_initialized():
+            return [
+                self._create_fallback_response(m, reason="llm_unavailable")
+                for m in messages
             ]
 
-            products = []
-            for pattern in patterns:
-                try:
-                    matches = re.findall(pattern, message, re.IGNORECASE)
-                    if matches:
-                        for match in matches:
-                            try:
-                                product_id = int(match[0])
-                                requested_quantity = int(match[1])
-                                available_quantity = random.randint(0, requested_quantity)
-
-                                products.append({
-                                    "product_id": product_id,
-                                    "quantity": available_quantity
-                                })
-                            except (ValueError, IndexError):
-                                continue
-                        break
-                except Exception:
-                    continue
+        # Only messages missing from the cache go to Gemini
+        cached = [await self.response_cache.get(m) for m in messages]
+        missing = [i for i, response in enumerate(cached) if response is None]
+        if not missing:
+            return cached
+        if len(missing) < len(messages):
+            answers = await self.process_restock_batch([messages[i] for i in missing])
+            for i, answer in zip(missing, answers):
+                cached[i] = answer
+            return cached
+
+        try:
+            batch_text = "\n\n".join(
+                f"Solicitud {request_id}: {message}"
+                for request_id, message in enumerate(messages)
+            )
+
+            response = await self._ainvoke_structured(self.batch_llm, "batch", [
+                SystemMessage(content=self.batch_system_prompt),
+                HumanMessage(content=batch_text)
+            ])
+
+            answers = {}
+            for entry in response.responses:
+                if 0 <= entry.request_id < len(messages):
+                    answers[entry.request_id] = entry.model_dump_json(
+                        exclude={"request_id"}, indent=2
+                    )
+                    await self.response_cache.put(
+                        messages[entry.request_id], answers[entry.request_id]
+                    )
+
+            logger.info(f"Batch of {len(messages)} requests answered with {len(answers)} entries")
+            return [
+                answers.get(request_id)
+                or self._create_fallback_response(message, reason="batch_missing")
+                for request_id, message in enumerate(messages)
+            ]
+
+        except OverloadedError:
+            raise
+        except Exception as e:
+            logger.warning(f"Batch restock call failed, using fallback: {e}")
+            return [self._create_fallback_response(m) for m in messages]
+
+    def _create_fallback_response(self, message: str, reason: str = "llm_failed") -> str:
+        """Create a fallback response when Gemini doesn't return valid JSON.
+
+        Products are returned with the requested quantity; the caller reserves
+        them against the inventory store, which decides what is available.
+        ``reason`` labels the fallback counter.
+        """
+        FALLBACKS.labels(reason=reason).inc()
+        try:
+            products = [
+                {"product_id": item.product_id, "quantity": item.quantity}
+                for item in parse_restock_items(message, lenient=True)
+            ]
 
             # Create response
             if "restock" in message.lower() or "product" in message.lower():
@@ -166,8 +355,11 @@ class WholesalerGeminiAgent:
         """Clean up resources."""
         try:
             if self.llm:
-                # Clear the LLM reference
+                # Clear the LLM references
                 self.llm = None
+                self.restock_llm = None
+                self.batch_llm = None
+            self.response_cache.close()
             self._initialized = False
             logger.info("Wholesaler Gemini agent cleaned up successfully")
         except Exception as e:
@@ -0,0 +1,253 @@
+"""
+Inventory stores backing the wholesaler's stock allocations.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .config import (
+    DEFAULT_PRODUCT_STOCK,
+    INVENTORY_DB_PATH,
+    INVENTORY_FLUSH_BATCH,
+    INVENTORY_FLUSH_INTERVAL,
+    INVENTORY_WRITE_THROUGH,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class InventoryStore:
+    """Base class for stores that hold the available units per product."""
+
+    def __init__(self, default_stock: int = DEFAULT_PRODUCT_STOCK):
+        self.default_stock = default_stock
+        self._lock = threading.Lock()
+        self._cache: Dict[int, int] = {}
+
+    def _load(self, product_id: int) -> int:
+        """Load the units of a product missing from the cache."""
+        return self.default_stock
+
+    def _record(self, product_id: int, available: int) -> None:
+        """Persist the new units of a product after a reservation."""
+
+    def available(self, product_id: int) -> int:
+        """Return the units currently available for a product."""
+        with self._lock:
+            if product_id not in self._cache:
+                self._cache[product_id] = self._load(product_id)
+            return self._cache[product_id]
+
+    def reserve(self, requests: List[Tuple[int, int]]) -> List[int]:
+        """Atomically take up to the requested units of each product.
+
+        Args:
+            requests: (product_id, wanted units) pairs.
+
+        Returns:
+            The units actually reserved for each pair, in the same order.
+        """
+        reserved = []
+        with self._lock:
+            for product_id, wanted in requests:
+                if product_id not in self._cache:
+                    self._cache[product_id] = self._load(product_id)
+                quantity = max(0, min(wanted, self._cache[product_id]))
+                self._cache[product_id] -= quantity
+                self._record(product_id, self._cache[product_id])
+                reserved.append(quantity)
+            self._after_reserve()
+        return reserved
+
+    def _after_reserve(self) -> None:
+        """Hook run under the lock after each reservation."""
+
+    def set_stock(self, product_id: int, available: int) -> None:
+        """Set the units available for a product."""
+        with self._lock:
+            self._cache[product_id] = available
+            self._record(product_id, available)
+
+    def close(self) -> None:
+        """Release any resources held by the store."""
+
+
+class InMemoryInventoryStore(InventoryStore):
+    """Inventory kept only in process memory."""
+
+    def __init__(
+        self,
+        stock: Optional[Dict[int, int]] = None,
+        default_stock: int = DEFAULT_PRODUCT_STOCK,
+    ):
+        super().__init__(default_stock)
+        self._cache.update(stock or {})
+
+
+class SQLiteInventoryStore(InventoryStore):
+    """Inventory persisted in SQLite with an in-memory hot cache.
+
+    The table is loaded into the cache when the store opens. Reservations
+    are decided against the cache under a single short lock, and a
+    background writer thread stores the changed products (every
+    ``flush_batch`` changes or ``flush_interval`` seconds), so reservations
+    do no disk I/O. The database runs in WAL mode so readers are not
+    blocked by those writes.
+
+    With ``write_through`` (used when several server processes share the
+    database) the cache is bypassed and each reservation runs in its own
+    ``BEGIN IMMEDIATE`` transaction, which is atomic across processes. That
+    transaction runs on the caller's thread, so the event loop blocks on
+    it, for up to the 5 s SQLite busy timeout when another process holds
+    the write lock.
+    """
+
+    def __init__(
+        self,
+        path: str = INVENTORY_DB_PATH,
+        default_stock: int = DEFAULT_PRODUCT_STOCK,
+        flush_batch: int = INVENTORY_FLUSH_BATCH,
+        flush_interval: float = INVENTORY_FLUSH_INTERVAL,
+        write_through: bool = INVENTORY_WRITE_THROUGH,
+    ):
+        super().__init__(default_stock)
+        self.write_through = write_through
+        self.path = path
+        self.flush_batch = flush_batch
+        self.flush_interval = flush_interval
+        self._dirty: Dict[int, int] = {}
+        self._last_flush = time.monotonic()
+        # Serializes use of the connection between the writer and flush()
+        self._write_lock = threading.Lock()
+        self._flush_wanted = threading.Event()
+        self._stopping = False
+        self._writer: Optional[threading.Thread] = None
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS inventory ("
+            "product_id INTEGER PRIMARY KEY, "
+            "available INTEGER NOT NULL)"
+        )
+        self._conn.commit()
+        if not write_through:
+            # Only this process writes the table, so the cache can own it
+            self._cache.update(self._conn.execute(
+                "SELECT product_id, available FROM inventory"
+            ).fetchall())
+            self._writer = threading.Thread(
+                target=self._write_loop, name="inventory-writer", daemon=True
+            )
+            self._writer.start()
+        logger.info(f"Inventory store opened at {path}")
+
+    def available(self, product_id: int) -> int:
+        if not self.write_through:
+            return super().available(product_id)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT available FROM inventory WHERE product_id = ?", (product_id,)
+            ).fetchone()
+            return row[0] if row is not None else self.default_stock
+
+    def reserve(self, requests: List[Tuple[int, int]]) -> List[int]:
+        if not self.write_through:
+            return super().reserve(requests)
+
+        reserved = []
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for product_id, wanted in requests:
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO inventory (product_id, available) "
+                        "VALUES (?, ?)",
+                        (product_id, self.default_stock),
+                    )
+                    (available,) = self._conn.execute(
+                        "SELECT available FROM inventory WHERE product_id = ?",
+                        (product_id,),
+                    ).fetchone()
+                    quantity = max(0, min(wanted, available))
+                    self._conn.execute(
+                        "UPDATE inventory SET available = available - ? "
+                        "WHERE product_id = ?",
+                        (quantity, product_id),
+                    )
+                    reserved.append(quantity)
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+        return reserved
+
+    def set_stock(self, product_id: int, available: int) -> None:
+        if not self.write_through:
+            return super().set_stock(product_id, available)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO inventory (product_id, available) VALUES (?, ?) "
+                "ON CONFLICT(product_id) DO UPDATE SET available = excluded.available",
+                (product_id, available),
+            )
+            self._conn.commit()
+
+    def _load(self, product_id: int) -> int:
+        # Every stored product was loaded at open: this one is new
+        self._dirty[product_id] = self.default_stock
+        return self.default_stock
+
+    def _record(self, product_id: int, available: int) -> None:
+        self._dirty[product_id] = available
+
+    def _after_reserve(self) -> None:
+        if (
+            len(self._dirty) >= self.flush_batch
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self._flush_wanted.set()
+
+    def _write_loop(self) -> None:
+        while not self._stopping:
+            self._flush_wanted.wait(self.flush_interval)
+            self._flush_wanted.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                logger.warning(f"Inventory flush failed, retrying later: {e}")
+
+    def flush(self) -> None:
+        """Write pending changes to the database."""
+        with self._write_lock:
+            with self._lock:
+                pending, self._dirty = self._dirty, {}
+                self._last_flush = time.monotonic()
+            if not pending:
+                return
+            try:
+                self._conn.executemany(
+                    "INSERT INTO inventory (product_id, available) VALUES (?, ?) "
+                    "ON CONFLICT(product_id) DO UPDATE SET available = excluded.available",
+                    list(pending.items()),
+                )
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                with self._lock:
+                    # Keep values changed since then, requeue the rest
+                    for product_id, available in pending.items():
+                        self._dirty.setdefault(product_id, available)
+                raise
+
+    def close(self) -> None:
+        self._stopping = True
+        self._flush_wanted.set()
+        if self._writer is not None:
+            self._writer.join()
+        try:
+            self.flush()
+        finally:
+            self._conn.close()
@@ -0,0 +1,74 @@
+"""
+Process-wide registry of chat model clients.
+
+Same ``llm_key``/``get``/``stats``/``clear`` API as the supermarket's
+registry, which also forwards async calls to a loop of its own because its
+Streamlit sessions each run their own loop. A wholesaler worker serves every
+request from one event loop and calls its clients directly.
+"""
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+LLMKey = Tuple[str, float, Tuple[str, ...], str]
+
+
+def llm_key(
+    model: str, temperature: float, tools: Iterable = (), tools_version: str = ""
+) -> LLMKey:
+    """Registry key of a chat model: model name, temperature and bound tools.
+
+    ``tools`` may be tool objects or names. ``tools_version`` tells apart
+    tools whose names are unchanged but whose schemas differ.
+    """
+    names = tuple(sorted(getattr(tool, "name", None) or str(tool) for tool in tools))
+    return (model, float(temperature), names, tools_version)
+
+
+class LLMClientRegistry:
+    """Shares chat model clients between the agents of a process.
+
+    Every ChatGoogleGenerativeAI opens its own HTTP transports, so a client is
+    built once per key and reused.
+    """
+
+    def __init__(self):
+        # Reentrant so a factory can build on another registry entry
+        self._lock = threading.RLock()
+        self._clients: Dict[LLMKey, Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: LLMKey, factory: Callable[[], Any]) -> Any:
+        """Return the client for ``key``, building it with ``factory`` on first use."""
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self.hits += 1
+                return client
+            client = factory()
+            self._clients[key] = client
+            self.misses += 1
+        logger.info(f"Created LLM client {key}")
+        return client
+
+    def stats(self) -> Dict[str, int]:
+        """Number of clients and lookups served from the pool."""
+        with self._lock:
+            return {
+                "clients": len(self._clients),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def clear(self) -> None:
+        """Forget every client and reset the counters, e.g. after the API key changed."""
+        with self._lock:
+            self._clients.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+llm_registry = LLMClientRegistry()
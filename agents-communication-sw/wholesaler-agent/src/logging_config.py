@@ -0,0 +1,117 @@
+"""
+Non-blocking logging setup for the wholesaler agent.
+
+Log calls only put the record on an in-memory queue; a background
+``QueueListener`` thread formats it as single-line JSON and writes it to the
+console and to a size-rotated file, so disk flushes never run on the event
+loop thread.
+"""
+import atexit
+import copy
+import datetime
+import json
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+
+from .config import (
+    LOG_BACKUP_COUNT,
+    LOG_FILE_PATH,
+    LOG_LEVEL,
+    LOG_MAX_BYTES,
+    MULTI_WORKER,
+)
+
+# Attributes every LogRecord has; anything else was passed through ``extra``.
+# uvicorn adds an ANSI-coloured copy of each message that is not worth keeping.
+_RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {
+    "message", "asctime", "color_message"
+}
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line, including ``extra`` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.datetime.fromtimestamp(record.created).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(QueueHandler):
+    """Queues records with their traceback as text for ``JsonFormatter``.
+
+    ``QueueHandler.prepare`` would fold the traceback into the message and
+    drop ``exc_info``; here the message is only merged with its arguments and
+    the traceback is kept in ``exc_text``, so it ends up in ``"exception"``.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # Text only: the traceback's frames are not kept alive in the queue
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(
+    level: str = LOG_LEVEL,
+    log_file: Optional[str] = LOG_FILE_PATH,
+) -> QueueListener:
+    """Route the root logger through a queue to console and rotating file handlers.
+
+    Safe to call more than once; only the first call installs the handlers.
+    With several worker processes each one writes its own file (suffixed with
+    the pid), since rotating a shared file from many processes is unsafe.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    formatter = JsonFormatter()
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        if MULTI_WORKER:
+            log_file = f"{log_file}.{os.getpid()}"
+        handlers.append(RotatingFileHandler(
+            log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT
+        ))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers = [_QueueHandler(log_queue)]
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """Flush pending records and stop the background listener."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
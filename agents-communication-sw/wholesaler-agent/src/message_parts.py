@@ -0,0 +1,107 @@
+"""
+Typed extraction of A2A message parts for the wholesaler executor.
+"""
+import base64
+import binascii
+import json
+import logging
+from functools import singledispatch
+from typing import Any, Dict, List, Optional
+
+from a2a.types import DataPart, FilePart, FileWithBytes, Message, TextPart
+
+from .models import ProductRestockRequest
+from .restock_parser import to_request
+
+logger = logging.getLogger(__name__)
+
+# DataPart keys that may hold a structured restock list
+RESTOCK_DATA_KEYS = ("products", "restockable_products")
+
+# Mime types of file parts read as text
+TEXT_MIME_PREFIXES = ("text/", "application/json")
+
+
+class ExtractedMessage:
+    """Content of an incoming message: its text and any structured restock items."""
+
+    def __init__(self):
+        self.texts: List[str] = []
+        self.data: List[Dict[str, Any]] = []
+        self.items: Optional[List[ProductRestockRequest]] = None
+
+    @property
+    def text(self) -> str:
+        """Text of the message; other data parts are rendered as JSON if there is none.
+
+        Structured restock items are not included, they are passed on as is.
+        """
+        if self.texts:
+            return "\n".join(self.texts)
+        return "\n".join(json.dumps(data) for data in self.data)
+
+    def add_items(self, items: List[ProductRestockRequest]) -> None:
+        if self.items is None:
+            self.items = []
+        self.items.extend(items)
+
+
+def _restock_items(data: Dict[str, Any]) -> Optional[List[ProductRestockRequest]]:
+    """Return the restock list of a DataPart, or None if it does not hold one."""
+    for key in RESTOCK_DATA_KEYS:
+        entries = data.get(key)
+        if isinstance(entries, list):
+            items = [to_request(entry) for entry in entries]
+            return items if all(items) else None
+    return None
+
+
+@singledispatch
+def _extract_part(part, content: ExtractedMessage) -> None:
+    logger.warning(f"Ignoring unsupported message part: {type(part).__name__}")
+
+
+@_extract_part.register
+def _(part: TextPart, content: ExtractedMessage) -> None:
+    content.texts.append(part.text)
+
+
+@_extract_part.register
+def _(part: DataPart, content: ExtractedMessage) -> None:
+    items = _restock_items(part.data)
+    if items is not None:
+        content.add_items(items)
+    else:
+        content.data.append(part.data)
+
+
+@_extract_part.register
+def _(part: FilePart, content: ExtractedMessage) -> None:
+    file = part.file
+    mime_type = file.mime_type or ""
+    if not isinstance(file, FileWithBytes) or not mime_type.startswith(TEXT_MIME_PREFIXES):
+        logger.warning(f"Ignoring file part {file.name or ''} ({mime_type or 'unknown type'})")
+        return
+    try:
+        text = base64.b64decode(file.bytes, validate=True).decode("utf-8")
+    except (binascii.Error, UnicodeDecodeError) as e:
+        logger.warning(f"Ignoring unreadable file part {file.name or ''}: {e}")
+        return
+    if mime_type == "application/json":
+        try:
+            data = json.loads(text)
+        except ValueError:
+            data = None
+        if isinstance(data, dict):
+            _extract_part(DataPart(data=data), content)
+            return
+    content.texts.append(text)
+
+
+def extract_message(message: Optional[Message]) -> ExtractedMessage:
+    """Collect the text and structured restock items of every part of a message."""
+    content = ExtractedMessage()
+    if message is not None:
+        for part in message.parts:
+            _extract_part(part.root, content)
+    return content
@@ -0,0 +1,134 @@
+"""
+Prometheus metrics for the wholesaler.
+
+With several workers, ``PROMETHEUS_MULTIPROC_DIR`` must point to a directory
+shared by all of them (``__main__`` sets one up) before ``prometheus_client``
+is imported. Every worker then writes its values there and ``/metrics``
+reports the sum over all workers, whichever one answers the scrape.
+"""
+import os
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.metrics import MetricWrapperBase
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+# Where time goes inside WholesalerAgentExecutor.execute
+STAGE_SECONDS = Histogram(
+    "wholesaler_stage_duration_seconds",
+    "Time spent in each stage of a request.",
+    ["stage"],
+    buckets=DEFAULT_BUCKETS,
+)
+REQUESTS = Counter(
+    "wholesaler_requests_total",
+    "Requests by the path that answered them.",
+    ["path"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "wholesaler_requests_in_flight",
+    "Requests currently being executed.",
+    multiprocess_mode="livesum",
+)
+
+# Gemini calls
+LLM_SECONDS = Histogram(
+    "wholesaler_llm_duration_seconds",
+    "Latency of Gemini calls.",
+    ["call"],
+    buckets=DEFAULT_BUCKETS,
+)
+LLM_CALLS = Counter(
+    "wholesaler_llm_calls_total",
+    "Gemini calls by outcome.",
+    ["call", "outcome"],
+)
+LLM_TOKENS = Counter(
+    "wholesaler_llm_tokens_total",
+    "Tokens reported by Gemini usage_metadata.",
+    ["call", "kind"],
+)
+LLM_IN_FLIGHT = Gauge(
+    "wholesaler_llm_calls_in_flight",
+    "Gemini calls currently waiting for an answer.",
+    multiprocess_mode="livesum",
+)
+LLM_CLIENTS = Gauge(
+    "wholesaler_llm_clients",
+    "Gemini clients held by the client registries of all workers.",
+    multiprocess_mode="livesum",
+)
+LLM_CONCURRENCY_LIMIT = Gauge(
+    "wholesaler_llm_concurrency_limit",
+    "Current adaptive limit on concurrent Gemini calls, summed over workers.",
+    multiprocess_mode="livesum",
+)
+LLM_QUEUE_DEPTH = Gauge(
+    "wholesaler_llm_queue_depth",
+    "Gemini calls waiting for a concurrency slot.",
+    multiprocess_mode="livesum",
+)
+LLM_REJECTED = Counter(
+    "wholesaler_llm_rejected_total",
+    "Gemini calls rejected by the admission queue.",
+    ["reason"],
+)
+FALLBACKS = Counter(
+    "wholesaler_fallback_total",
+    "Answers produced by the rule-based fallback instead of Gemini.",
+    ["reason"],
+)
+
+
+def record_llm_usage(call: str, message) -> None:
+    """Add the token counts of a Gemini message to LLM_TOKENS."""
+    usage = getattr(message, "usage_metadata", None) or {}
+    for kind in ("input_tokens", "output_tokens", "total_tokens"):
+        if usage.get(kind):
+            LLM_TOKENS.labels(call=call, kind=kind.rsplit("_", 1)[0]).inc(usage[kind])
+
+
+def value(metric: MetricWrapperBase, **labels: str) -> float:
+    """Current value of a counter or gauge in this process (0 if never set)."""
+    for family in metric.collect():
+        for sample in family.samples:
+            if sample.name.endswith("_created") or sample.labels != labels:
+                continue
+            return sample.value
+    return 0.0
+
+
+def total(metric: MetricWrapperBase) -> float:
+    """Sum of a counter over every label set in this process."""
+    return sum(
+        sample.value
+        for family in metric.collect()
+        for sample in family.samples
+        if sample.name.endswith("_total")
+    )
+
+
+def render() -> bytes:
+    """Every metric in the Prometheus text format, summed over all workers."""
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not path:
+        return generate_latest(REGISTRY)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=path)
+    return generate_latest(registry)
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges from the shared directory on exit."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(os.getpid())
@@ -1,8 +1,8 @@
 """
 Models for the wholesaler agent.
 """
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
 
 
 class AgentConfig(BaseModel):
@@ -17,11 +17,21 @@ class AgentConfig(BaseModel):
 class ProductRestockRequest(BaseModel):
     """Model for product restock requests."""
     product_id: int
-    quantity: int
+    quantity: int = Field(ge=0)
 
 
 class RestockResponse(BaseModel):
-    """Model for restock responses."""
-    status: str
-    restockable_products: list
-    message: str
+    """Model for restock responses, also used as the Gemini output schema."""
+    status: Literal["success", "error"]
+    restockable_products: List[ProductRestockRequest] = Field(default_factory=list)
+    message: str = ""
+
+
+class RestockBatchEntry(RestockResponse):
+    """Answer to one request of a batched Gemini call."""
+    request_id: int
+
+
+class RestockBatchResponse(BaseModel):
+    """Gemini output schema for batched restock requests."""
+    responses: List[RestockBatchEntry] = Field(default_factory=list)
@@ -0,0 +1,196 @@
+"""
+Circuit breaker and hedged requests for calls to the Gemini API.
+
+CircuitBreaker is the same as in the supermarket agent, which keeps only
+the breaker since it does not hedge its calls.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Deque, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a dependency whose circuit is open."""
+    pass
+
+
+class CircuitBreaker:
+    """Stops calling a dependency after repeated failures.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls fail immediately with CircuitOpenError. Once ``recovery_timeout``
+    seconds have passed it lets ``half_open_max_calls`` trial calls through:
+    a success closes the circuit, a failure opens it again.
+
+    ``is_failure`` decides which exceptions count against the dependency;
+    by default all of them do. The breaker is thread-safe so one instance
+    can be shared by every event loop of the process.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        is_failure: Optional[Callable[[BaseException], bool]] = None,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self.is_failure = is_failure or (lambda error: True)
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_calls = 0
+
+    def _current_state(self) -> str:
+        if (
+            self._state == self.OPEN
+            and time.monotonic() - self._opened_at >= self.recovery_timeout
+        ):
+            self._state = self.HALF_OPEN
+            self._trial_calls = 0
+        return self._state
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    @property
+    def is_open(self) -> bool:
+        """True while calls are being short-circuited."""
+        return self.state == self.OPEN
+
+    def _acquire(self) -> None:
+        with self._lock:
+            state = self._current_state()
+            if state == self.OPEN or (
+                state == self.HALF_OPEN and self._trial_calls >= self.half_open_max_calls
+            ):
+                raise CircuitOpenError(f"Circuit '{self.name}' is open")
+            if state == self.HALF_OPEN:
+                self._trial_calls += 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"Circuit '{self.name}' closed")
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(
+                        f"Circuit '{self.name}' opened after {self._failures} failures"
+                    )
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def _release_trial(self) -> None:
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._trial_calls > 0:
+                self._trial_calls -= 1
+
+    @asynccontextmanager
+    async def guard(self) -> AsyncIterator[None]:
+        """Count the enclosed block as one call through the breaker.
+
+        Used for calls that are not a single awaitable, such as streams.
+        """
+        self._acquire()
+        try:
+            yield
+        except Exception as e:
+            if self.is_failure(e):
+                self.record_failure()
+            else:
+                self._release_trial()
+            raise
+        except BaseException:
+            # Cancelled or abandoned: says nothing about the dependency
+            self._release_trial()
+            raise
+        self.record_success()
+
+    async def call(self, func: Callable[..., Awaitable[T]], *args, **kwargs) -> T:
+        """Await ``func(*args, **kwargs)`` through the breaker."""
+        async with self.guard():
+            return await func(*args, **kwargs)
+
+
+class LatencyTracker:
+    """Rolling window of recent call latencies."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Return the ``p``-th percentile, or None until enough samples exist."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+async def hedged(
+    attempt: Callable[[], Awaitable[T]],
+    delay: float,
+    max_attempts: int = 2,
+) -> T:
+    """Run ``attempt`` and start another copy every ``delay`` seconds it is pending.
+
+    The first attempt to succeed wins and the others are cancelled. If an
+    attempt fails while others are still running, they are awaited instead;
+    the last error is raised when all of them fail. An attempt can decline
+    to run, e.g. when a concurrency limit is reached, by failing at once.
+    """
+    tasks = [asyncio.ensure_future(attempt())]
+    started = 1
+    error: Optional[BaseException] = None
+    try:
+        while tasks:
+            timeout = delay if started < max_attempts else None
+            done, _ = await asyncio.wait(
+                tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                logger.info(f"Hedging slow call after {delay:.2f}s")
+                tasks.append(asyncio.ensure_future(attempt()))
+                started += 1
+                continue
+            for task in done:
+                tasks.remove(task)
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
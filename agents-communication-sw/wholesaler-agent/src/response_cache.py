@@ -0,0 +1,176 @@
+"""
+LRU + TTL cache for wholesaler LLM responses, with in-flight de-duplication.
+"""
+import asyncio
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from .config import RESPONSE_CACHE_DB_PATH, RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_message(message: str) -> str:
+    """Normalize a message so trivially different repeats share a cache key."""
+    return _WHITESPACE.sub(" ", message).strip().casefold()
+
+
+class _DiskTier:
+    """SQLite table holding cached responses across restarts."""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, "
+            "value TEXT NOT NULL, "
+            "created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+    def put(self, key: str, value: str, created_at: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at) "
+                "VALUES (?, ?, ?)",
+                (key, value, created_at),
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class ResponseCache:
+    """Caches responses by a hash of the normalized message.
+
+    Entries live in an in-memory LRU of ``max_size`` items for ``ttl``
+    seconds, optionally backed by a SQLite file. Concurrent requests for the
+    same key share one computation; it is cancelled only when every waiter
+    has given up.
+    """
+
+    def __init__(
+        self,
+        namespace: str = "",
+        max_size: int = RESPONSE_CACHE_SIZE,
+        ttl: float = RESPONSE_CACHE_TTL,
+        db_path: Optional[str] = RESPONSE_CACHE_DB_PATH,
+    ):
+        self.namespace = namespace
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._inflight: Dict[str, Tuple[asyncio.Task, list]] = {}
+        self._disk = _DiskTier(db_path) if db_path else None
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, message: str) -> str:
+        """Return the cache key of a message."""
+        payload = f"{self.namespace}\x00{normalize_message(message)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _fresh(self, created_at: float) -> bool:
+        return time.time() - created_at < self.ttl
+
+    def _remember(self, key: str, value: str, created_at: float) -> None:
+        self._entries[key] = (value, created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def get(self, message: str) -> Optional[str]:
+        """Return the cached response for a message, or None."""
+        key = self.key(message)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if self._fresh(entry[1]):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            del self._entries[key]
+
+        if self._disk is not None:
+            row = await asyncio.to_thread(self._disk.get, key)
+            if row is not None and self._fresh(row[1]):
+                self._remember(key, row[0], row[1])
+                self.hits += 1
+                return row[0]
+
+        self.misses += 1
+        return None
+
+    async def put(self, message: str, value: str) -> None:
+        """Store a response for a message."""
+        key = self.key(message)
+        created_at = time.time()
+        self._remember(key, value, created_at)
+        if self._disk is not None:
+            await asyncio.to_thread(self._disk.put, key, value, created_at)
+
+    async def get_or_compute(
+        self,
+        message: str,
+        compute: Callable[[], Awaitable[Optional[str]]],
+    ) -> Optional[str]:
+        """Return the cached response or compute it once for all concurrent callers.
+
+        ``compute`` returning None means the result must not be cached.
+        """
+        cached = await self.get(message)
+        if cached is not None:
+            return cached
+
+        key = self.key(message)
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            task = asyncio.ensure_future(self._compute_and_store(message, compute))
+            inflight = (task, [0])
+            self._inflight[key] = inflight
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            logger.info("Sharing in-flight LLM call for identical message")
+
+        task, waiters = inflight
+        waiters[0] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and waiters[0] == 1:
+                task.cancel()
+            raise
+        finally:
+            waiters[0] -= 1
+
+    async def _compute_and_store(
+        self,
+        message: str,
+        compute: Callable[[], Awaitable[Optional[str]]],
+    ) -> Optional[str]:
+        value = await compute()
+        if value is not None:
+            await self.put(message, value)
+        return value
+
+    def close(self) -> None:
+        """Close the on-disk tier, if any."""
+        if self._disk is not None:
+            self._disk.close()
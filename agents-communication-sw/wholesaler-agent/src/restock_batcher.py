@@ -0,0 +1,103 @@
+"""
+Coalesces restock requests arriving close together into a single LLM call.
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .config import RESTOCK_BATCH_MAX_SIZE, RESTOCK_BATCH_WINDOW
+
+logger = logging.getLogger(__name__)
+
+BatchProcessor = Callable[[List[str]], Awaitable[List[str]]]
+
+
+class RestockBatcher:
+    """Collects restock messages for a short window and processes them together.
+
+    The first message of a batch starts a timer of ``window`` seconds; every
+    message received before it fires (up to ``max_size``) joins the batch.
+    The processor receives the messages in arrival order and must return one
+    response per message, which is handed back to the waiting caller.
+
+    A caller that is cancelled leaves its batch; when every caller of an
+    in-flight batch has gone, the processing (and its LLM call) is cancelled.
+    """
+
+    def __init__(
+        self,
+        processor: BatchProcessor,
+        window: float = RESTOCK_BATCH_WINDOW,
+        max_size: int = RESTOCK_BATCH_MAX_SIZE,
+    ):
+        self.processor = processor
+        self.window = window
+        self.max_size = max(1, max_size)
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight: Dict[asyncio.Task, List[asyncio.Future]] = {}
+
+    async def submit(self, message: str) -> str:
+        """Queue a message and wait for its response."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((message, future))
+
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        try:
+            return await future
+        except asyncio.CancelledError:
+            self._abandon(future)
+            raise
+
+    def _abandon(self, future: asyncio.Future) -> None:
+        """Drop a cancelled caller, cancelling its batch if nobody is left."""
+        self._pending = [item for item in self._pending if item[1] is not future]
+        if not self._pending and self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        for task, futures in self._inflight.items():
+            if future in futures:
+                if all(f.cancelled() for f in futures):
+                    logger.info("All callers of a restock batch left, cancelling it")
+                    task.cancel()
+                break
+
+    def _flush(self) -> None:
+        """Hand the pending messages to a processing task."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._process(batch))
+            self._inflight[task] = [future for _, future in batch]
+            task.add_done_callback(lambda t: self._inflight.pop(t, None))
+
+    async def _process(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Run the processor and fan the responses back out."""
+        messages = [message for message, _ in batch]
+        logger.info(f"Processing restock batch of {len(messages)} requests")
+
+        try:
+            responses = await self.processor(messages)
+            if len(responses) != len(batch):
+                raise ValueError(
+                    f"Batch processor returned {len(responses)} responses "
+                    f"for {len(batch)} requests"
+                )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), response in zip(batch, responses):
+            if not future.done():
+                future.set_result(response)
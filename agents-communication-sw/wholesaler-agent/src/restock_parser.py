@@ -0,0 +1,162 @@
+"""
+Restock payload parser shared by the allocation engine and the fallbacks.
+
+All patterns are compiled once at import time and every scan is a single
+linear pass over the message, so parsing cost grows with payload size and
+never with the number of pattern retries.
+"""
+import ast
+import json
+import re
+from typing import List, Optional
+
+from .config import MAX_RESTOCK_ITEMS, MAX_RESTOCK_PAYLOAD_CHARS
+from .exceptions import WholesalerAgentError
+from .models import ProductRestockRequest
+
+_LIST_PATTERN = re.compile(r"\[[^\[\]]*\]")
+_DICT_PATTERN = re.compile(r"\{[^{}]*\}")
+# "product_id": 1 / 'quantity': 5 / product_id=1 / quantity 5 ...
+_KEYED_PATTERN = re.compile(
+    r"(product_id|quantity)['\"]?[ \t]*[=:]?[ \t]*['\"]?(\d+)", re.IGNORECASE
+)
+_NUMBER_PATTERN = re.compile(r"\d+")
+
+
+class PayloadTooLargeError(WholesalerAgentError):
+    """Raised when a restock message exceeds MAX_RESTOCK_PAYLOAD_CHARS or MAX_RESTOCK_ITEMS."""
+    pass
+
+
+def check_payload_size(message: str, limit: int = MAX_RESTOCK_PAYLOAD_CHARS) -> None:
+    """Raise PayloadTooLargeError when a message is over the size cap."""
+    if len(message) > limit:
+        raise PayloadTooLargeError(
+            f"Restock message has {len(message)} characters (limit {limit})"
+        )
+
+
+def check_item_count(
+    items: List[ProductRestockRequest], limit: int = MAX_RESTOCK_ITEMS
+) -> None:
+    """Raise PayloadTooLargeError when a structured restock list is over the cap."""
+    if len(items) > limit:
+        raise PayloadTooLargeError(
+            f"Restock request has {len(items)} products (limit {limit})"
+        )
+
+
+def render_restock_message(items: List[ProductRestockRequest]) -> str:
+    """Write structured restock items as the text message the supermarket used to send."""
+    products = [{"product_id": item.product_id, "quantity": item.quantity} for item in items]
+    return f"Please restock the following products: {products}"
+
+
+def _literal(text: str):
+    """Parse a JSON or Python literal, returning None when it is neither."""
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        return None
+
+
+def to_request(item) -> Optional[ProductRestockRequest]:
+    """Build a restock request from a parsed dict, or None if malformed."""
+    if not isinstance(item, dict) or "product_id" not in item or "quantity" not in item:
+        return None
+    try:
+        request = ProductRestockRequest(
+            product_id=int(item["product_id"]),
+            quantity=int(item["quantity"]),
+        )
+    except (TypeError, ValueError):
+        return None
+    return request
+
+
+def _to_requests(parsed) -> Optional[List[ProductRestockRequest]]:
+    """Convert a parsed list (or single dict) into requests, or None."""
+    if isinstance(parsed, dict):
+        parsed = [parsed]
+    if not isinstance(parsed, list) or not parsed:
+        return None
+    items = [to_request(item) for item in parsed]
+    return items if all(items) else None
+
+
+def extract_structured_items(message: str) -> Optional[List[ProductRestockRequest]]:
+    """Extract product_id/quantity pairs written as JSON or Python literals.
+
+    Accepts a list of dicts (``[{'product_id': 1, 'quantity': 10}]``) or loose
+    dicts in free text. Returns None when the message has no well-formed pair
+    or any dict-like fragment is malformed, so ambiguous input goes to the LLM.
+    """
+    check_payload_size(message)
+
+    # A bare literal payload is parsed in one go
+    stripped = message.strip()
+    if stripped[:1] in ("[", "{"):
+        items = _to_requests(_literal(stripped))
+        if items:
+            return items
+
+    for match in _LIST_PATTERN.finditer(message):
+        items = _to_requests(_literal(match.group()))
+        if items:
+            return items
+
+    fragments = _DICT_PATTERN.findall(message)
+    if not fragments:
+        return None
+    items = [to_request(_literal(fragment)) for fragment in fragments]
+    return items if all(items) else None
+
+
+def _scan_keyed_pairs(message: str) -> List[ProductRestockRequest]:
+    """Pair each ``product_id`` value with the next ``quantity`` value."""
+    items = []
+    product_id = None
+    for match in _KEYED_PATTERN.finditer(message):
+        key, value = match.groups()
+        if key.lower() == "product_id":
+            product_id = int(value)
+        elif product_id is not None:
+            items.append(ProductRestockRequest(product_id=product_id, quantity=int(value)))
+            product_id = None
+    return items
+
+
+def _scan_number_pairs(message: str) -> List[ProductRestockRequest]:
+    """Pair consecutive numbers on each line as (product_id, quantity)."""
+    items = []
+    for line in message.splitlines():
+        numbers = _NUMBER_PATTERN.findall(line)
+        for product_id, quantity in zip(numbers[0::2], numbers[1::2]):
+            items.append(
+                ProductRestockRequest(product_id=int(product_id), quantity=int(quantity))
+            )
+    return items
+
+
+def parse_restock_items(message: str, lenient: bool = False) -> List[ProductRestockRequest]:
+    """Extract the requested products from a restock message.
+
+    Structured literals are tried first, then ``product_id ... quantity``
+    pairs anywhere in the text. With ``lenient`` any two numbers on a line
+    are taken as a product id and a quantity as a last resort.
+
+    Raises:
+        PayloadTooLargeError: If the message exceeds MAX_RESTOCK_PAYLOAD_CHARS.
+    """
+    items = extract_structured_items(message)
+    if items:
+        return items
+
+    items = _scan_keyed_pairs(message)
+    if items or not lenient:
+        return items
+    return _scan_number_pairs(message)
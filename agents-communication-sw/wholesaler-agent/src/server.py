@@ -0,0 +1,162 @@
+"""
+A2A Starlette application factory for the wholesaler agent.
+"""
+import asyncio
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from a2a.server.apps import A2AStarletteApplication
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import TaskStore
+from a2a.types import (
+    AgentCapabilities,
+    AgentCard,
+    AgentSkill,
+)
+from a2a.utils.constants import AGENT_CARD_WELL_KNOWN_PATH
+from prometheus_client import CONTENT_TYPE_LATEST
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from .agent_executor import WholesalerAgentExecutor
+from .config import SERVER_PUBLIC_URL
+from .logging_config import setup_logging
+from .metrics import mark_process_dead, render
+from .task_store import create_task_store
+
+logger = logging.getLogger(__name__)
+
+
+def build_agent_card() -> AgentCard:
+    """Build the public-facing agent card."""
+    # --8<-- [start:AgentSkill]
+    restock_skill = AgentSkill(
+        id='restock_products',
+        name='Process product restock requests',
+        description='Processes restock requests and returns available quantities for products',
+        tags=['restock', 'wholesaler', 'inventory'],
+        examples=['Please restock products', 'Check availability for products', 'Restock request'],
+    )
+
+    general_skill = AgentSkill(
+        id='general_assistance',
+        name='General wholesaler assistance',
+        description='Provides general assistance and information about wholesaler services',
+        tags=['assistance', 'wholesaler', 'general'],
+        examples=['hello', 'help', 'what can you do'],
+    )
+    # --8<-- [end:AgentSkill]
+
+    logger.info("Created agent skills for restock and general assistance")
+
+    # --8<-- [start:AgentCard]
+    # This will be the public-facing agent card
+    public_agent_card = AgentCard(
+        name='Wholesaler Agent',
+        description='AI-powered wholesaler agent for processing restock requests and inventory management',
+        url=SERVER_PUBLIC_URL,
+        version='2.0.0',
+        defaultInputModes=['text'],
+        defaultOutputModes=['text'],
+        capabilities=AgentCapabilities(streaming=True),
+        skills=[restock_skill, general_skill],  # Updated skills
+        supportsAuthenticatedExtendedCard=False,  # Simplified for now
+    )
+    # --8<-- [end:AgentCard]
+
+    logger.info("Created public agent card")
+    return public_agent_card
+
+
+def _agent_card_route(agent_card: AgentCard) -> Route:
+    """Serve the agent card from a body rendered once at startup."""
+    body = json.dumps(
+        agent_card.model_dump(exclude_none=True, by_alias=True)
+    ).encode("utf-8")
+
+    async def get_agent_card(request: Request) -> Response:
+        return Response(body, media_type="application/json")
+
+    return Route(AGENT_CARD_WELL_KNOWN_PATH, get_agent_card, methods=["GET"])
+
+
+async def health(request: Request) -> JSONResponse:
+    """Liveness probe: the process is up."""
+    return JSONResponse({"status": "ok"})
+
+
+async def ready(request: Request) -> JSONResponse:
+    """Readiness probe: 503 until the startup warm-up has finished."""
+    if request.app.state.ready:
+        return JSONResponse({"status": "ready"})
+    return JSONResponse({"status": "warming_up"}, status_code=503)
+
+
+async def metrics(request: Request) -> Response:
+    """Prometheus scrape endpoint, summed over every worker."""
+    return Response(render(), media_type=CONTENT_TYPE_LATEST)
+
+
+async def _warm_up(app: Starlette, agent_executor: WholesalerAgentExecutor) -> None:
+    started = time.perf_counter()
+    try:
+        await agent_executor.warm_up()
+    except Exception as e:
+        logger.warning(f"Warm-up failed, serving anyway: {e}")
+    app.state.ready = True
+    logger.info(f"Warm-up finished in {time.perf_counter() - started:.2f}s, ready for traffic")
+
+
+def create_app(
+    agent_executor: Optional[WholesalerAgentExecutor] = None,
+    task_store: Optional[TaskStore] = None,
+) -> Starlette:
+    """Application factory, called once per uvicorn worker process.
+
+    Everything built here (agent executor, LLM client, stores) is local to the
+    worker; state shared between workers lives in the SQLite task and
+    inventory databases. Each worker warms itself up in the background once
+    it starts listening and only then reports ready on ``/ready``.
+    """
+    setup_logging()
+
+    agent_executor = agent_executor or WholesalerAgentExecutor()
+    request_handler = DefaultRequestHandler(
+        agent_executor=agent_executor,
+        task_store=task_store or create_task_store(),
+    )
+
+    logger.info("Created request handler with WholesalerAgentExecutor")
+
+    agent_card = build_agent_card()
+    server = A2AStarletteApplication(
+        agent_card=agent_card,
+        http_handler=request_handler,
+    )
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        warm_up = asyncio.create_task(_warm_up(app, agent_executor))
+        yield
+        warm_up.cancel()
+        mark_process_dead()
+
+    # Routes passed here are matched before the A2A ones
+    app = server.build(
+        routes=[
+            _agent_card_route(agent_card),
+            Route("/health", health, methods=["GET"]),
+            Route("/ready", ready, methods=["GET"]),
+            Route("/metrics", metrics, methods=["GET"]),
+        ],
+        lifespan=lifespan,
+    )
+    app.state.ready = False
+
+    logger.info("Created A2A Starlette application")
+    return app
@@ -0,0 +1,229 @@
+"""
+Durable, bounded A2A task store for the wholesaler server.
+"""
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from a2a.server.tasks import InMemoryTaskStore, TaskStore
+from a2a.types import Task, TaskState, TaskStatus
+
+from .config import (
+    TASK_CACHE_SIZE,
+    TASK_DB_PATH,
+    TASK_ARTIFACT_FLUSH_INTERVAL,
+    TASK_EVICTION_INTERVAL,
+    TASK_STORE_BACKEND,
+    TASK_TTL_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+# States after which the task waits for the client or never changes again
+_SETTLED_STATES = {
+    TaskState.completed,
+    TaskState.canceled,
+    TaskState.failed,
+    TaskState.rejected,
+    TaskState.input_required,
+    TaskState.auth_required,
+}
+
+
+class SQLiteTaskStore(TaskStore):
+    """Task store persisted in SQLite with TTL eviction and an LRU memory front.
+
+    Tasks are indexed by task id (primary key) and context id. Only the
+    ``cache_size`` most recently used tasks are kept in memory; tasks not
+    updated for ``ttl`` seconds are treated as missing and purged from disk
+    every ``eviction_interval`` seconds. Database calls run in a worker thread
+    so they never block the event loop.
+
+    Saves that only append artifact chunks are not written right away: the
+    latest task is kept in memory and reaches disk with the next status
+    change, or once ``artifact_flush_interval`` seconds have passed since its
+    last write. A long streamed answer then costs a few writes instead of
+    one full serialization of the growing task per chunk.
+    """
+
+    def __init__(
+        self,
+        path: str = TASK_DB_PATH,
+        ttl: float = TASK_TTL_SECONDS,
+        cache_size: int = TASK_CACHE_SIZE,
+        eviction_interval: float = TASK_EVICTION_INTERVAL,
+        artifact_flush_interval: float = TASK_ARTIFACT_FLUSH_INTERVAL,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.cache_size = cache_size
+        self.eviction_interval = eviction_interval
+        self.artifact_flush_interval = artifact_flush_interval
+        self._cache: "OrderedDict[str, tuple[Task, float]]" = OrderedDict()
+        # Running tasks: the status last written and when it was written
+        self._written: Dict[str, Tuple[TaskStatus, float]] = {}
+        # Tasks whose latest artifacts are not on disk yet
+        self._pending: Dict[str, Task] = {}
+        self._last_eviction = time.monotonic()
+        self._db_lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "task_id TEXT PRIMARY KEY, "
+            "context_id TEXT NOT NULL, "
+            "data TEXT NOT NULL, "
+            "updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_context_id ON tasks (context_id)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_updated_at ON tasks (updated_at)"
+        )
+        self._conn.commit()
+        logger.info(f"Task store opened at {path}")
+
+    # --- cache helpers -------------------------------------------------
+
+    def _cache_put(self, task: Task, updated_at: float) -> None:
+        self._cache[task.id] = (task, updated_at)
+        self._cache.move_to_end(task.id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _expired(self, updated_at: float) -> bool:
+        return time.time() - updated_at > self.ttl
+
+    # --- database helpers (run in a worker thread) ---------------------
+
+    def _db_save(self, task: Task, data: str, updated_at: float) -> None:
+        with self._db_lock:
+            self._conn.execute(
+                "INSERT INTO tasks (task_id, context_id, data, updated_at) "
+                "VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(task_id) DO UPDATE SET "
+                "context_id = excluded.context_id, data = excluded.data, "
+                "updated_at = excluded.updated_at",
+                (task.id, task.context_id, data, updated_at),
+            )
+            self._conn.commit()
+
+    def _db_get(self, task_id: str) -> Optional[tuple]:
+        with self._db_lock:
+            return self._conn.execute(
+                "SELECT data, updated_at FROM tasks WHERE task_id = ?", (task_id,)
+            ).fetchone()
+
+    def _db_by_context(self, context_id: str, cutoff: float) -> List[tuple]:
+        with self._db_lock:
+            return self._conn.execute(
+                "SELECT data FROM tasks WHERE context_id = ? AND updated_at >= ? "
+                "ORDER BY updated_at",
+                (context_id, cutoff),
+            ).fetchall()
+
+    def _db_delete(self, task_id: str) -> None:
+        with self._db_lock:
+            self._conn.execute("DELETE FROM tasks WHERE task_id = ?", (task_id,))
+            self._conn.commit()
+
+    def _db_evict(self, cutoff: float) -> int:
+        with self._db_lock:
+            cursor = self._conn.execute(
+                "DELETE FROM tasks WHERE updated_at < ?", (cutoff,)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    # --- TaskStore interface -------------------------------------------
+
+    async def save(self, task: Task, context=None) -> None:
+        """Saves or updates a task."""
+        updated_at = time.time()
+        self._cache_put(task, updated_at)
+        written = self._written.get(task.id)
+        if (
+            written is not None
+            and written[0] is task.status
+            and time.monotonic() - written[1] < self.artifact_flush_interval
+        ):
+            # Same status, so only artifacts changed since the last write
+            self._pending[task.id] = task
+            return
+
+        self._pending.pop(task.id, None)
+        if task.status.state in _SETTLED_STATES:
+            self._written.pop(task.id, None)
+        else:
+            self._written[task.id] = (task.status, time.monotonic())
+        await asyncio.to_thread(
+            self._db_save, task, task.model_dump_json(), updated_at
+        )
+        await self._maybe_evict()
+
+    async def get(self, task_id: str, context=None) -> Optional[Task]:
+        """Retrieves a task by id, or None if missing or expired."""
+        pending = self._pending.get(task_id)
+        if pending is not None:
+            return pending
+        cached = self._cache.get(task_id)
+        if cached is not None:
+            task, updated_at = cached
+            if not self._expired(updated_at):
+                self._cache.move_to_end(task_id)
+                return task
+            self._cache.pop(task_id, None)
+            return None
+
+        row = await asyncio.to_thread(self._db_get, task_id)
+        if row is None or self._expired(row[1]):
+            return None
+        task = Task.model_validate_json(row[0])
+        self._cache_put(task, row[1])
+        return task
+
+    async def delete(self, task_id: str, context=None) -> None:
+        """Deletes a task by id."""
+        self._cache.pop(task_id, None)
+        self._pending.pop(task_id, None)
+        self._written.pop(task_id, None)
+        await asyncio.to_thread(self._db_delete, task_id)
+
+    async def list_by_context(self, context_id: str) -> List[Task]:
+        """Return the live tasks of a context, oldest first."""
+        rows = await asyncio.to_thread(
+            self._db_by_context, context_id, time.time() - self.ttl
+        )
+        tasks = [Task.model_validate_json(row[0]) for row in rows]
+        return [self._pending.get(task.id, task) for task in tasks]
+
+    async def _maybe_evict(self) -> None:
+        if time.monotonic() - self._last_eviction < self.eviction_interval:
+            return
+        self._last_eviction = time.monotonic()
+        removed = await asyncio.to_thread(self._db_evict, time.time() - self.ttl)
+        if removed:
+            logger.info(f"Evicted {removed} expired tasks")
+
+    def close(self) -> None:
+        """Write the pending tasks and close the database connection."""
+        pending, self._pending = self._pending, {}
+        for task in pending.values():
+            self._db_save(task, task.model_dump_json(), time.time())
+        with self._db_lock:
+            self._conn.close()
+
+
+def create_task_store(backend: str = TASK_STORE_BACKEND) -> TaskStore:
+    """Build the task store selected by ``WHOLESALER_TASK_STORE``."""
+    if backend == "memory":
+        return InMemoryTaskStore()
+    if backend == "sqlite":
+        return SQLiteTaskStore()
+    raise ValueError(f"Unknown task store backend: {backend}")
@@ -0,0 +1,99 @@
+"""Tests for the rule-based allocation engine."""
+
+import json
+import unittest
+from unittest.mock import patch
+
+from src.allocation import AllocationEngine, extract_structured_items
+from src.config import parse_product_caps
+from src.inventory_store import InMemoryInventoryStore
+
+
+class TestExtractStructuredItems(unittest.TestCase):
+    """Test cases for structured payload detection."""
+
+    def test_python_list_from_supermarket(self):
+        """The supermarket's repr-formatted list is recognised."""
+        message = (
+            "Please restock the following products: "
+            "[{'product_id': '1', 'quantity': 10}, {'product_id': '2', 'quantity': 5}]"
+        )
+        items = extract_structured_items(message)
+        self.assertEqual(
+            [(i.product_id, i.quantity) for i in items], [(1, 10), (2, 5)]
+        )
+
+    def test_loose_json_dicts(self):
+        """Separate JSON objects in free text are recognised."""
+        message = (
+            'Please restock products: {"product_id": 3, "quantity": 15} '
+            'and {"product_id": 4, "quantity": 20}'
+        )
+        items = extract_structured_items(message)
+        self.assertEqual([i.product_id for i in items], [3, 4])
+
+    def test_free_text_is_not_structured(self):
+        """Messages without well-formed pairs are left for the LLM."""
+        self.assertIsNone(extract_structured_items("Hola, ¿cómo estás?"))
+        self.assertIsNone(
+            extract_structured_items("restock product 3, about {a dozen} units")
+        )
+
+
+class TestAllocationEngine(unittest.TestCase):
+    """Test cases for stock allocation."""
+
+    def test_allocation_respects_caps_and_stock(self):
+        """Allocations are limited by caps and deplete the stock table."""
+        engine = AllocationEngine(
+            InMemoryInventoryStore(stock={1: 30}, default_stock=0),
+            max_per_request=20,
+            product_caps={2: 5},
+        )
+        message = "[{'product_id': 1, 'quantity': 50}, {'product_id': 2, 'quantity': 10}]"
+
+        first = json.loads(engine.try_process(message))
+        second = json.loads(engine.try_process(message))
+
+        self.assertEqual(first["status"], "success")
+        self.assertEqual(
+            first["restockable_products"],
+            [{"product_id": 1, "quantity": 20}, {"product_id": 2, "quantity": 0}],
+        )
+        self.assertEqual(second["restockable_products"][0]["quantity"], 10)
+        self.assertEqual(engine.available(1), 0)
+
+    def test_reserve_response_clamps_to_stock(self):
+        """Quantities proposed by the LLM are limited by the inventory."""
+        engine = AllocationEngine(InMemoryInventoryStore(stock={7: 3}))
+        response = json.dumps({
+            "status": "success",
+            "restockable_products": [{"product_id": 7, "quantity": 10}],
+            "message": "ok",
+        })
+
+        reserved = json.loads(engine.reserve_response(response))
+
+        self.assertEqual(reserved["restockable_products"][0]["quantity"], 3)
+        self.assertEqual(reserved["message"], "ok")
+
+    def test_free_text_returns_none(self):
+        """Free-text messages are not answered by the engine."""
+        self.assertIsNone(AllocationEngine().try_process("What do you sell?"))
+
+    def test_product_caps_come_from_the_environment(self):
+        """WHOLESALER_PRODUCT_CAPS overrides the cap of the listed products."""
+        self.assertEqual(parse_product_caps(" 7:20, 12:5,"), {7: 20, 12: 5})
+        self.assertEqual(parse_product_caps(""), {})
+        with self.assertRaises(ValueError):
+            parse_product_caps("7=20")
+
+        with patch("src.allocation.PRODUCT_CAPS", {7: 2}):
+            engine = AllocationEngine(InMemoryInventoryStore(), max_per_request=50)
+        message = "[{'product_id': 7, 'quantity': 10}, {'product_id': 8, 'quantity': 10}]"
+        allocated = json.loads(engine.try_process(message))["restockable_products"]
+        self.assertEqual([product["quantity"] for product in allocated], [2, 10])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+"""Tests for cancelling in-flight restock requests."""
+
+import asyncio
+import unittest
+from unittest.mock import patch
+from uuid import uuid4
+
+from a2a.server.agent_execution import RequestContext
+from a2a.server.events import EventQueue
+from a2a.types import (
+    Message,
+    MessageSendParams,
+    Part,
+    Role,
+    Task,
+    TaskNotCancelableError,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+from a2a.utils.errors import ServerError
+
+from src.agent_executor import WholesalerAgentExecutor
+from src.restock_batcher import RestockBatcher
+
+
+class SlowAgent:
+    """Agent stand-in whose invocation never finishes on its own."""
+
+    def __init__(self):
+        self.cancelled = asyncio.Event()
+
+    async def invoke(self, message: str, items=None) -> str:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            self.cancelled.set()
+            raise
+        return "{}"
+
+    def streams_allocations(self, message: str, items) -> bool:
+        return False
+
+    def cleanup(self):
+        pass
+
+
+def _drain(queue: EventQueue) -> list:
+    events = []
+    while not queue.queue.empty():
+        events.append(queue.queue.get_nowait())
+    return events
+
+
+class TestExecutorCancel(unittest.TestCase):
+    """Test cases for WholesalerAgentExecutor.cancel."""
+
+    def test_cancel_stops_invocation_and_publishes_status(self):
+        """Canceling a running task stops the agent and emits a canceled status."""
+        async def run():
+            with patch("src.agent_executor.WholesalerAgent", SlowAgent):
+                executor = WholesalerAgentExecutor()
+            queue = EventQueue()
+            message = Message(
+                role=Role.user,
+                message_id=uuid4().hex,
+                parts=[Part(root=TextPart(text="restock product 1"))],
+            )
+            context = RequestContext(request=MessageSendParams(message=message))
+
+            execution = asyncio.ensure_future(executor.execute(context, queue))
+            await asyncio.sleep(0.05)
+            task = next(e for e in _drain(queue) if isinstance(e, Task))
+
+            await executor.cancel(
+                RequestContext(None, task_id=task.id, context_id=task.context_id, task=task),
+                queue,
+            )
+            await asyncio.wait_for(execution, timeout=1.0)
+            return executor.agent.cancelled.is_set(), _drain(queue)
+
+        agent_cancelled, events = asyncio.run(run())
+        self.assertTrue(agent_cancelled)
+        statuses = [e for e in events if isinstance(e, TaskStatusUpdateEvent)]
+        self.assertEqual(statuses[-1].status.state, TaskState.canceled)
+        self.assertTrue(statuses[-1].final)
+
+    def test_task_running_elsewhere_is_not_marked_canceled(self):
+        """A worker that is not running the task refuses to cancel it."""
+        async def run():
+            with patch("src.agent_executor.WholesalerAgent", SlowAgent):
+                executor = WholesalerAgentExecutor()
+            queue = EventQueue()
+            task = Task(
+                id=uuid4().hex,
+                context_id=uuid4().hex,
+                status=TaskStatus(state=TaskState.working),
+            )
+            with self.assertRaises(ServerError) as raised:
+                await executor.cancel(
+                    RequestContext(None, task_id=task.id, context_id=task.context_id, task=task),
+                    queue,
+                )
+            return raised.exception, _drain(queue)
+
+        error, events = asyncio.run(run())
+        self.assertIsInstance(error.error, TaskNotCancelableError)
+        self.assertEqual(events, [])
+
+
+class TestBatcherCancel(unittest.TestCase):
+    """Test cases for cancellation inside the restock batcher."""
+
+    def test_batch_is_cancelled_when_all_callers_leave(self):
+        """The processor call is cancelled once every waiting caller is gone."""
+        async def run():
+            cancelled = asyncio.Event()
+
+            async def processor(messages):
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    cancelled.set()
+                    raise
+                return messages
+
+            batcher = RestockBatcher(processor, window=0.0)
+            callers = [asyncio.ensure_future(batcher.submit(m)) for m in "ab"]
+            await asyncio.sleep(0.05)
+            for caller in callers:
+                caller.cancel()
+            await asyncio.wait_for(cancelled.wait(), timeout=1.0)
+            return cancelled.is_set()
+
+        self.assertTrue(asyncio.run(run()))
+
+
+if __name__ == '__main__':
+    unittest.main()
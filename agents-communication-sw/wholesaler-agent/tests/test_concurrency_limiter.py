@@ -0,0 +1,145 @@
+"""Tests for the adaptive LLM concurrency limiter."""
+
+import asyncio
+import unittest
+from uuid import uuid4
+
+from a2a.server.agent_execution import RequestContext
+from a2a.server.events import EventQueue
+from a2a.types import (
+    Message,
+    MessageSendParams,
+    Part,
+    Role,
+    TaskState,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+
+from src.agent_executor import WholesalerAgentExecutor
+from src.concurrency_limiter import (
+    AdaptiveConcurrencyLimiter,
+    OverloadedError,
+    is_overload_error,
+)
+
+
+class RateLimited(Exception):
+    code = 429
+
+
+class TestAdaptiveConcurrencyLimiter(unittest.TestCase):
+    """Test cases for the AIMD limiter and its admission queue."""
+
+    def test_limits_concurrency_and_rejects_when_queue_is_full(self):
+        """Calls beyond limit + queue are rejected immediately."""
+        limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=2, max_limit=2, max_queue=1, queue_timeout=5
+        )
+        peak = 0
+        release = None
+
+        async def call():
+            nonlocal peak
+            async with limiter.slot():
+                peak = max(peak, limiter.in_flight)
+                await release.wait()
+
+        async def run():
+            nonlocal release
+            release = asyncio.Event()
+            tasks = [asyncio.create_task(call()) for _ in range(3)]
+            await asyncio.sleep(0.01)
+            self.assertEqual(limiter.queue_depth, 1)
+            with self.assertRaises(OverloadedError):
+                await call()
+            release.set()
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+        self.assertEqual(peak, 2)
+        self.assertEqual(limiter.in_flight, 0)
+
+    def test_queue_timeout_rejects(self):
+        """A caller waiting longer than queue_timeout is rejected."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, queue_timeout=0.01)
+
+        async def run():
+            await limiter.acquire()
+            with self.assertRaises(OverloadedError):
+                await limiter.acquire()
+            self.assertEqual(limiter.queue_depth, 0)
+
+        asyncio.run(run())
+
+    def test_aimd_adjusts_limit(self):
+        """Rate-limit errors halve the limit; saturated successes grow it."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8, min_limit=1, max_limit=16)
+
+        async def run():
+            with self.assertRaises(RateLimited):
+                async with limiter.slot():
+                    raise RateLimited("quota")
+            self.assertEqual(limiter.limit, 4)
+
+            for _ in range(4):
+                await limiter.acquire()
+            for _ in range(4):
+                limiter.release(0.1)
+            self.assertGreater(limiter.limit, 4)
+
+        asyncio.run(run())
+
+    def test_overload_detection(self):
+        """429s, RESOURCE_EXHAUSTED and timeouts count as overload."""
+        self.assertTrue(is_overload_error(RateLimited()))
+        self.assertTrue(is_overload_error(RuntimeError("RESOURCE_EXHAUSTED: quota")))
+        self.assertTrue(is_overload_error(asyncio.TimeoutError()))
+        self.assertFalse(is_overload_error(ValueError("bad schema")))
+        self.assertFalse(is_overload_error(ValueError("product 429 not found")))
+
+
+class OverloadedAgent:
+    """Agent stand-in whose LLM admission queue is always full."""
+
+    async def invoke(self, message: str, items=None) -> str:
+        raise OverloadedError("Wholesaler is overloaded, retry later", retry_after=2.0)
+
+    def streams_allocations(self, message: str, items) -> bool:
+        return False
+
+    def cleanup(self):
+        pass
+
+
+class TestOverloadRejection(unittest.TestCase):
+    """Test cases for rejecting requests when the wholesaler is overloaded."""
+
+    def test_task_is_rejected_with_retry_after(self):
+        """An overloaded request ends as a rejected task, not a fallback answer."""
+        async def run():
+            executor = WholesalerAgentExecutor(OverloadedAgent())
+            queue = EventQueue()
+            message = Message(
+                role=Role.user,
+                message_id=uuid4().hex,
+                parts=[Part(root=TextPart(text="restock product 1"))],
+            )
+            await executor.execute(
+                RequestContext(request=MessageSendParams(message=message)), queue
+            )
+            events = []
+            while not queue.queue.empty():
+                events.append(queue.queue.get_nowait())
+            return events
+
+        statuses = [e for e in asyncio.run(run()) if isinstance(e, TaskStatusUpdateEvent)]
+        final = statuses[-1]
+        self.assertEqual(final.status.state, TaskState.rejected)
+        self.assertTrue(final.final)
+        data = final.status.message.parts[1].root.data
+        self.assertEqual(data["retry_after"], 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
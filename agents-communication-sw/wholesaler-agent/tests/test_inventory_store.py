@@ -0,0 +1,80 @@
+"""Tests for the persistent inventory store."""
+
+import os
+import tempfile
+import threading
+import unittest
+
+from src.inventory_store import SQLiteInventoryStore
+
+
+class TestSQLiteInventoryStore(unittest.TestCase):
+    """Test cases for the SQLite inventory store."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "inventory.db")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_reservations_persist_across_reopen(self):
+        """Reserved units are written back and survive a restart."""
+        store = SQLiteInventoryStore(self.path, default_stock=10, flush_batch=100)
+        self.assertEqual(store.reserve([(1, 4), (2, 15)]), [4, 10])
+        store.close()
+
+        reopened = SQLiteInventoryStore(self.path, default_stock=10)
+        self.assertEqual(reopened.available(1), 6)
+        self.assertEqual(reopened.available(2), 0)
+        reopened.close()
+
+    def test_reservations_do_not_wait_on_disk(self):
+        """A slow database write does not hold up reservations."""
+        store = SQLiteInventoryStore(self.path, default_stock=10, flush_batch=1)
+        with store._write_lock:
+            # The writer is stuck; reservations keep being answered
+            for _ in range(5):
+                store.reserve([(1, 1)])
+            self.assertEqual(store.available(1), 5)
+        store.close()
+
+        reopened = SQLiteInventoryStore(self.path, default_stock=10)
+        self.assertEqual(reopened.available(1), 5)
+        reopened.close()
+
+    def test_concurrent_reservations_never_oversell(self):
+        """Parallel reservations never hand out more than the stock."""
+        store = SQLiteInventoryStore(self.path, default_stock=100)
+        results = []
+
+        def worker():
+            for _ in range(50):
+                results.extend(store.reserve([(1, 1)]))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sum(results), 100)
+        self.assertEqual(store.available(1), 0)
+        store.close()
+
+    def test_write_through_stores_share_stock(self):
+        """Two write-through stores on one database never oversell."""
+        first = SQLiteInventoryStore(self.path, default_stock=10, write_through=True)
+        second = SQLiteInventoryStore(self.path, default_stock=10, write_through=True)
+
+        self.assertEqual(first.reserve([(1, 7)]), [7])
+        self.assertEqual(second.reserve([(1, 7)]), [3])
+        self.assertEqual(first.available(1), 0)
+        second.set_stock(1, 4)
+        self.assertEqual(first.available(1), 4)
+        first.close()
+        second.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
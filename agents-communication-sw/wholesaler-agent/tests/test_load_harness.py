@@ -0,0 +1,42 @@
+"""Tests for the offline load-test harness."""
+
+import asyncio
+import unittest
+
+from benchmarks.load_test import build_messages, run_load_test
+
+
+class TestLoadHarness(unittest.TestCase):
+    """Test cases for the load-test harness."""
+
+    def test_messages_are_reproducible(self):
+        """The same seed builds the same workload."""
+        self.assertEqual(
+            build_messages(20, 0.5, 0, seed=3), build_messages(20, 0.5, 0, seed=3)
+        )
+        self.assertEqual(len(set(build_messages(50, 0.5, 4, seed=3))), 4)
+
+    def test_run_reports_latencies_and_llm_usage(self):
+        """A short run answers every request through the real app."""
+        result = asyncio.run(run_load_test(
+            requests=30, concurrency=5, llm_ratio=1.0, llm_latency=0.001, seed=1
+        ))
+        self.assertEqual(result.requests, 30)
+        self.assertEqual(result.error_count, 0)
+        self.assertGreater(result.llm_calls, 0)
+        self.assertGreater(result.llm_tokens, 0)
+        self.assertLessEqual(result.percentile(50), result.percentile(99))
+        self.assertGreater(result.throughput, 0)
+
+    def test_llm_failures_fall_back(self):
+        """Simulated Gemini errors are absorbed by the fallback path."""
+        result = asyncio.run(run_load_test(
+            requests=10, concurrency=2, llm_ratio=1.0, llm_latency=0.001,
+            llm_error_rate=1.0, seed=2,
+        ))
+        self.assertEqual(result.error_count, 0)
+        self.assertGreaterEqual(result.fallbacks, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
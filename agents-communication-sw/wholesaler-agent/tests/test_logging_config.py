@@ -0,0 +1,56 @@
+"""Tests for the structured logging setup."""
+
+import json
+import logging
+import queue
+import unittest
+
+from src.logging_config import JsonFormatter, _QueueHandler
+
+
+class TestJsonFormatter(unittest.TestCase):
+    """Test cases for the JSON log formatter."""
+
+    def test_record_is_single_line_json_with_extra_fields(self):
+        """Extra fields are included and newlines stay escaped."""
+        record = logging.makeLogRecord({
+            "name": "wholesaler",
+            "levelname": "INFO",
+            "msg": "QUEUING MESSAGE",
+            "direction": "QUEUING",
+            "content": '{\n  "status": "success"\n}',
+        })
+
+        line = JsonFormatter().format(record)
+        entry = json.loads(line)
+
+        self.assertNotIn("\n", line)
+        self.assertEqual(entry["message"], "QUEUING MESSAGE")
+        self.assertEqual(entry["direction"], "QUEUING")
+        self.assertEqual(entry["logger"], "wholesaler")
+        self.assertNotIn("args", entry)
+
+    def test_exception_survives_the_queue(self):
+        """logger.exception records keep their traceback under "exception"."""
+        log_queue = queue.SimpleQueue()
+        logger = logging.getLogger("wholesaler.test_queue")
+        logger.addHandler(_QueueHandler(log_queue))
+        logger.propagate = False
+        try:
+            try:
+                raise ValueError("bad stock")
+            except ValueError:
+                logger.exception("Restock for %s failed", "product 1")
+        finally:
+            logger.handlers.clear()
+            logger.propagate = True
+
+        entry = json.loads(JsonFormatter().format(log_queue.get_nowait()))
+
+        self.assertEqual(entry["message"], "Restock for product 1 failed")
+        self.assertIn("ValueError: bad stock", entry["exception"])
+        self.assertNotIn("Traceback", entry["message"])
+
+
+if __name__ == '__main__':
+    unittest.main()
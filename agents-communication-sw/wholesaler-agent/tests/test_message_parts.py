@@ -0,0 +1,158 @@
+"""Tests for extracting the parts of incoming A2A messages."""
+
+import asyncio
+import base64
+import json
+import unittest
+from unittest.mock import patch
+
+from a2a.server.agent_execution import RequestContext
+from a2a.server.events import EventQueue
+from a2a.types import (
+    DataPart,
+    FilePart,
+    FileWithBytes,
+    FileWithUri,
+    Message,
+    MessageSendParams,
+    Part,
+    Role,
+    TaskArtifactUpdateEvent,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+
+from src.agent_executor import WholesalerAgent, WholesalerAgentExecutor
+from src.inventory_store import InMemoryInventoryStore
+from src.message_parts import extract_message
+from src.restock_parser import PayloadTooLargeError, check_item_count
+
+
+def make_message(*parts) -> Message:
+    return Message(
+        role=Role.user,
+        parts=[Part(root=part) for part in parts],
+        messageId="message-1",
+    )
+
+
+class TestExtractMessage(unittest.TestCase):
+    """Test cases for extract_message."""
+
+    def test_text_parts_are_joined(self):
+        """Every text part is kept, not only the first one."""
+        content = extract_message(make_message(
+            TextPart(text="Please restock"), TextPart(text="product 3, 4 units")
+        ))
+        self.assertEqual(content.text, "Please restock\nproduct 3, 4 units")
+        self.assertIsNone(content.items)
+
+    def test_data_part_restock_list(self):
+        """A products list in a data part becomes restock items without any text."""
+        content = extract_message(make_message(DataPart(data={"products": [
+            {"product_id": 1, "quantity": 5},
+            {"product_id": "2", "quantity": 3},
+        ]})))
+        self.assertEqual(
+            [(item.product_id, item.quantity) for item in content.items], [(1, 5), (2, 3)]
+        )
+        self.assertEqual(content.text, "")
+
+    def test_other_data_and_files(self):
+        """Unrelated data is rendered as JSON; text files are decoded; URIs are ignored."""
+        encoded = base64.b64encode("restock product 7".encode()).decode()
+        content = extract_message(make_message(
+            FilePart(file=FileWithBytes(bytes=encoded, mime_type="text/plain")),
+            FilePart(file=FileWithUri(uri="https://example.com/a.pdf")),
+        ))
+        self.assertEqual(content.text, "restock product 7")
+
+        content = extract_message(make_message(DataPart(data={"question": "hours?"})))
+        self.assertEqual(json.loads(content.text), {"question": "hours?"})
+        self.assertIsNone(content.items)
+
+    def test_invalid_restock_list_is_kept_as_data(self):
+        """A list with malformed entries is not treated as restock items."""
+        content = extract_message(make_message(
+            DataPart(data={"products": [{"product_id": 1, "quantity": -2}]})
+        ))
+        self.assertIsNone(content.items)
+
+
+class TestStructuredInvoke(unittest.TestCase):
+    """Test cases for restock lists passed to WholesalerAgent.invoke."""
+
+    def setUp(self):
+        self.agent = WholesalerAgent(inventory=InMemoryInventoryStore())
+
+    def tearDown(self):
+        self.agent.cleanup()
+
+    def test_items_skip_message_parsing(self):
+        """Structured items are allocated without parsing the message text."""
+        content = extract_message(make_message(
+            DataPart(data={"products": [{"product_id": 8, "quantity": 6}]})
+        ))
+        with patch("src.allocation.extract_structured_items") as parser:
+            response = asyncio.run(self.agent.invoke(content.text, content.items))
+        parser.assert_not_called()
+        self.assertEqual(
+            json.loads(response)["restockable_products"], [{"product_id": 8, "quantity": 6}]
+        )
+
+    def test_too_many_items_are_rejected(self):
+        """Structured lists over the item cap are rejected like oversized text."""
+        content = extract_message(make_message(DataPart(data={"products": [
+            {"product_id": 1, "quantity": 1}
+        ] * 3})))
+        with self.assertRaises(PayloadTooLargeError):
+            check_item_count(content.items, limit=2)
+        check_item_count(content.items, limit=3)
+
+
+
+class TestAllocationStream(unittest.TestCase):
+    """Test cases for publishing structured allocations while they are reserved."""
+
+    def test_chunks_are_published_before_the_rest_is_reserved(self):
+        """The first product goes out alone, the rest in chunks, while reserving."""
+        inventory = InMemoryInventoryStore(stock={i: 5 for i in range(1, 6)})
+        executor = WholesalerAgentExecutor(WholesalerAgent(inventory=inventory))
+        queue = EventQueue()
+        published_before_reserve = []
+        reserve = inventory.reserve
+
+        def recording_reserve(requests):
+            chunks = [e for e in queue.queue._queue if isinstance(e, TaskArtifactUpdateEvent)]
+            published_before_reserve.append(sum(len(c.artifact.parts) for c in chunks))
+            return reserve(requests)
+
+        inventory.reserve = recording_reserve
+        message = make_message(DataPart(data={"products": [
+            {"product_id": i, "quantity": 2 * i} for i in range(1, 6)
+        ]}))
+
+        with patch("src.agent_executor.ALLOCATION_CHUNK_SIZE", 2), \
+                patch("src.agent_executor.ALLOCATION_CHUNK_INTERVAL", 60):
+            asyncio.run(executor.execute(
+                RequestContext(request=MessageSendParams(message=message)), queue
+            ))
+        events = []
+        while not queue.queue.empty():
+            events.append(queue.queue.get_nowait())
+        executor.cleanup()
+
+        self.assertEqual(published_before_reserve, [0, 1, 1, 3, 3])
+        chunks = [e for e in events if isinstance(e, TaskArtifactUpdateEvent)]
+        self.assertEqual(
+            [[p.root.data["quantity"] for p in c.artifact.parts] for c in chunks],
+            [[2], [4, 5], [5, 5]],
+        )
+        self.assertEqual([c.append for c in chunks], [False, True, True])
+        self.assertEqual([c.last_chunk for c in chunks], [False, False, True])
+        final = [e for e in events if isinstance(e, TaskStatusUpdateEvent)][-1]
+        data = final.status.message.parts[1].root.data
+        self.assertEqual(len(data["restockable_products"]), 5)
+
+if __name__ == "__main__":
+    unittest.main()
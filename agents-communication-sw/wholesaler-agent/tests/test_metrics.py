@@ -0,0 +1,51 @@
+"""Tests for the Prometheus metrics."""
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.metrics import FALLBACKS, REQUESTS_IN_FLIGHT, render, total, value
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKER = """
+from src.metrics import REQUESTS, STAGE_SECONDS
+REQUESTS.labels(path="fast_path").inc()
+STAGE_SECONDS.labels(stage="total").observe(0.5)
+"""
+
+
+class TestMetrics(unittest.TestCase):
+    """Test cases for reading and rendering the metrics."""
+
+    def test_value_and_total(self):
+        """Helpers read counters and gauges of this process."""
+        before = total(FALLBACKS)
+        FALLBACKS.labels(reason="test").inc()
+        FALLBACKS.labels(reason="test").inc(2)
+        self.assertEqual(total(FALLBACKS) - before, 3)
+        self.assertGreaterEqual(value(FALLBACKS, reason="test"), 3)
+        self.assertEqual(value(FALLBACKS, reason="never"), 0)
+        with REQUESTS_IN_FLIGHT.track_inprogress():
+            self.assertGreaterEqual(value(REQUESTS_IN_FLIGHT), 1)
+
+    def test_workers_are_summed(self):
+        """With a shared directory, a scrape reports every worker's values."""
+        with tempfile.TemporaryDirectory() as metrics_dir:
+            env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=metrics_dir)
+            for _ in range(2):
+                subprocess.run(
+                    [sys.executable, "-c", WORKER], cwd=PROJECT_DIR, env=env, check=True
+                )
+            with patch.dict(os.environ, PROMETHEUS_MULTIPROC_DIR=metrics_dir):
+                text = render().decode()
+
+        self.assertIn('wholesaler_requests_total{path="fast_path"} 2.0', text)
+        self.assertIn('wholesaler_stage_duration_seconds_count{stage="total"} 2.0', text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+"""Tests for hedged requests and latency tracking."""
+
+import asyncio
+import time
+import unittest
+
+from src.resilience import LatencyTracker, hedged
+
+
+class TestHedged(unittest.TestCase):
+    """Test cases for hedged requests."""
+
+    def test_hedged_request_beats_slow_first_attempt(self):
+        """A hedge started after the delay wins over a stuck first attempt."""
+        delays = iter([1.0, 0.01])
+
+        async def attempt():
+            await asyncio.sleep(next(delays))
+            return "done"
+
+        start = time.perf_counter()
+        self.assertEqual(asyncio.run(hedged(attempt, delay=0.05)), "done")
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+    def test_hedged_request_survives_a_failed_attempt(self):
+        """If one attempt fails the other one's result is used."""
+        outcomes = iter(["slow", "fail"])
+
+        async def attempt():
+            if next(outcomes) == "fail":
+                raise ConnectionError("boom")
+            await asyncio.sleep(0.1)
+            return "done"
+
+        self.assertEqual(asyncio.run(hedged(attempt, delay=0.02)), "done")
+
+
+class TestLatencyTracker(unittest.TestCase):
+    """Test cases for the rolling latency window."""
+
+    def test_percentile(self):
+        """Percentiles are only reported once enough samples were seen."""
+        tracker = LatencyTracker(min_samples=10)
+        for value in range(9):
+            tracker.observe(value / 100)
+        self.assertIsNone(tracker.percentile(95))
+        tracker.observe(1.0)
+        self.assertEqual(tracker.percentile(95), 1.0)
+        self.assertEqual(tracker.percentile(50), 0.04)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""Tests for the LLM response cache."""
+
+import asyncio
+import os
+import tempfile
+import unittest
+
+from src.response_cache import ResponseCache
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test cases for the response cache."""
+
+    def test_concurrent_identical_messages_share_one_call(self):
+        """Identical messages, even with different spacing, compute once."""
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return '{"status": "success"}'
+
+        async def run():
+            cache = ResponseCache(db_path=None)
+            results = await asyncio.gather(
+                cache.get_or_compute("Hola", compute),
+                cache.get_or_compute("  hola ", compute),
+                cache.get_or_compute("HOLA", compute),
+            )
+            results.append(await cache.get_or_compute("hola", compute))
+            return results
+
+        results = asyncio.run(run())
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(set(results), {'{"status": "success"}'})
+
+    def test_failed_results_are_not_cached(self):
+        """A None result is returned but computed again next time."""
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            return None
+
+        async def run():
+            cache = ResponseCache(db_path=None)
+            await cache.get_or_compute("hola", compute)
+            await cache.get_or_compute("hola", compute)
+
+        asyncio.run(run())
+        self.assertEqual(len(calls), 2)
+
+    def test_entries_expire_and_disk_tier_survives_restart(self):
+        """Expired entries miss; fresh ones are read back from disk."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "cache.db")
+
+            async def run():
+                expired = ResponseCache(ttl=0.0, db_path=None)
+                await expired.put("hola", "a")
+                stale = await expired.get("hola")
+
+                first = ResponseCache(db_path=path)
+                await first.put("hola", "b")
+                first.close()
+                second = ResponseCache(db_path=path)
+                restored = await second.get("hola")
+                second.close()
+                return stale, restored
+
+            stale, restored = asyncio.run(run())
+        self.assertIsNone(stale)
+        self.assertEqual(restored, "b")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+"""Tests for restock request coalescing."""
+
+import asyncio
+import unittest
+
+from src.restock_batcher import RestockBatcher
+
+
+class TestRestockBatcher(unittest.TestCase):
+    """Test cases for the restock batcher."""
+
+    def test_requests_within_window_share_one_call(self):
+        """Concurrent submissions are processed in a single batch."""
+        calls = []
+
+        async def processor(messages):
+            calls.append(list(messages))
+            return [f"answer:{m}" for m in messages]
+
+        async def run():
+            batcher = RestockBatcher(processor, window=0.01, max_size=10)
+            return await asyncio.gather(*(batcher.submit(f"m{i}") for i in range(3)))
+
+        results = asyncio.run(run())
+        self.assertEqual(results, ["answer:m0", "answer:m1", "answer:m2"])
+        self.assertEqual(calls, [["m0", "m1", "m2"]])
+
+    def test_max_size_flushes_early(self):
+        """A full batch is processed without waiting for the window."""
+        calls = []
+
+        async def processor(messages):
+            calls.append(len(messages))
+            return messages
+
+        async def run():
+            batcher = RestockBatcher(processor, window=10.0, max_size=2)
+            return await asyncio.wait_for(
+                asyncio.gather(*(batcher.submit(str(i)) for i in range(4))),
+                timeout=1.0,
+            )
+
+        self.assertEqual(asyncio.run(run()), ["0", "1", "2", "3"])
+        self.assertEqual(calls, [2, 2])
+
+    def test_processor_error_reaches_every_caller(self):
+        """A failing batch raises in every waiting submitter."""
+        async def processor(messages):
+            raise RuntimeError("llm down")
+
+        async def run():
+            batcher = RestockBatcher(processor, window=0.01)
+            return await asyncio.gather(
+                batcher.submit("a"), batcher.submit("b"), return_exceptions=True
+            )
+
+        results = asyncio.run(run())
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+
+
+if __name__ == '__main__':
+    unittest.main()
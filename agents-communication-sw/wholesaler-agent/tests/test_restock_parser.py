@@ -0,0 +1,68 @@
+"""Tests for the shared restock payload parser."""
+
+import time
+import unittest
+
+from src.restock_parser import (
+    PayloadTooLargeError,
+    check_payload_size,
+    extract_structured_items,
+    parse_restock_items,
+)
+
+
+def _pairs(items):
+    return [(item.product_id, item.quantity) for item in items]
+
+
+class TestParseRestockItems(unittest.TestCase):
+    """Test cases for restock payload parsing."""
+
+    def test_bare_json_payload(self):
+        """A message that is only a JSON list is parsed directly."""
+        items = extract_structured_items('[{"product_id": 7, "quantity": 3}]')
+        self.assertEqual(_pairs(items), [(7, 3)])
+
+    def test_keyed_pairs_in_free_text(self):
+        """product_id/quantity mentions are paired in order."""
+        message = "restock product_id=4 quantity=12 and product_id: 9, quantity 1"
+        self.assertEqual(_pairs(parse_restock_items(message)), [(4, 12), (9, 1)])
+
+    def test_unpaired_product_id_is_ignored(self):
+        """A product_id without a following quantity yields nothing."""
+        self.assertEqual(parse_restock_items("restock product_id 4"), [])
+
+    def test_lenient_number_pairs(self):
+        """Lenient mode pairs consecutive numbers on each line."""
+        message = "restock 3 x 20\nand 5 x 8 please"
+        self.assertEqual(parse_restock_items(message), [])
+        self.assertEqual(
+            _pairs(parse_restock_items(message, lenient=True)), [(3, 20), (5, 8)]
+        )
+
+    def test_size_cap(self):
+        """Messages over the cap are rejected before parsing."""
+        with self.assertRaises(PayloadTooLargeError):
+            check_payload_size("x" * 11, limit=10)
+        check_payload_size("x" * 10, limit=10)
+
+    def test_large_payloads_parse_in_linear_time(self):
+        """10k-item payloads and adversarial free text parse quickly."""
+        structured = "Please restock the following products: " + repr(
+            [{"product_id": str(i), "quantity": i % 50} for i in range(10_000)]
+        )
+        keyed = " ".join(
+            f"product_id={i} quantity={i % 50}" for i in range(10_000)
+        )
+        adversarial = "product_id 1 " * 20_000 + "7 " * 20_000
+
+        start = time.perf_counter()
+        self.assertEqual(len(parse_restock_items(structured)), 10_000)
+        self.assertEqual(len(parse_restock_items(keyed)), 10_000)
+        self.assertEqual(parse_restock_items(adversarial), [])
+        self.assertEqual(len(parse_restock_items(adversarial, lenient=True)), 20_000)
+        self.assertLess(time.perf_counter() - start, 5.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
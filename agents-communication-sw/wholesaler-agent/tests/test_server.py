@@ -0,0 +1,76 @@
+"""Tests for the wholesaler Starlette application."""
+
+import asyncio
+import time
+import unittest
+
+from a2a.server.agent_execution import AgentExecutor
+from a2a.server.tasks import InMemoryTaskStore
+from starlette.testclient import TestClient
+
+from src.server import build_agent_card, create_app
+
+
+class SlowWarmUpExecutor(AgentExecutor):
+    """Executor whose warm-up takes a noticeable amount of time."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.warmed_up = False
+
+    async def warm_up(self):
+        await asyncio.sleep(self.delay)
+        self.warmed_up = True
+
+    async def execute(self, context, event_queue):
+        pass
+
+    async def cancel(self, context, event_queue):
+        pass
+
+
+class TestServer(unittest.TestCase):
+    """Test cases for the readiness and agent card endpoints."""
+
+    def test_ready_flips_after_warm_up(self):
+        """/ready is 503 while warming up and 200 afterwards; /health is always 200."""
+        executor = SlowWarmUpExecutor(delay=0.3)
+        app = create_app(agent_executor=executor, task_store=InMemoryTaskStore())
+
+        with TestClient(app) as client:
+            self.assertEqual(client.get("/health").status_code, 200)
+            self.assertEqual(client.get("/ready").status_code, 503)
+
+            deadline = time.monotonic() + 5
+            while client.get("/ready").status_code != 200:
+                self.assertLess(time.monotonic(), deadline)
+                time.sleep(0.05)
+            self.assertTrue(executor.warmed_up)
+
+    def test_agent_card_is_served_prerendered(self):
+        """The agent card endpoint returns the card built at startup."""
+        app = create_app(
+            agent_executor=SlowWarmUpExecutor(delay=0), task_store=InMemoryTaskStore()
+        )
+        with TestClient(app) as client:
+            response = client.get("/.well-known/agent.json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["name"], build_agent_card().name)
+        self.assertTrue(response.json()["capabilities"]["streaming"])
+
+    def test_metrics_endpoint(self):
+        """/metrics serves the Prometheus text format."""
+        app = create_app(
+            agent_executor=SlowWarmUpExecutor(delay=0), task_store=InMemoryTaskStore()
+        )
+        with TestClient(app) as client:
+            response = client.get("/metrics")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain"))
+        self.assertIn("# TYPE wholesaler_stage_duration_seconds histogram", response.text)
+
+
+if __name__ == "__main__":
+    unittest.main()
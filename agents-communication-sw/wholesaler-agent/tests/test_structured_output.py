@@ -0,0 +1,170 @@
+"""Tests for the schema-constrained Gemini calls."""
+
+import asyncio
+import json
+import unittest
+from unittest.mock import patch
+
+from langchain_core.messages import AIMessage
+
+from src.concurrency_limiter import AdaptiveConcurrencyLimiter
+from src.gemini_agent import WholesalerGeminiAgent
+from src.metrics import LLM_TOKENS, value
+from src.models import RestockBatchEntry, RestockBatchResponse, RestockResponse
+from src.resilience import CircuitBreaker
+from src.response_cache import ResponseCache
+
+
+class FakeStructuredLLM:
+    """Stands in for ``llm.with_structured_output(schema, include_raw=True)``."""
+
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        if isinstance(self.result, Exception):
+            raise self.result
+        raw = AIMessage(content="", usage_metadata={
+            "input_tokens": 120, "output_tokens": 30, "total_tokens": 150,
+        })
+        return {"raw": raw, "parsed": self.result, "parsing_error": None}
+
+
+class SlowFirstLLM(FakeStructuredLLM):
+    """Structured LLM whose first call is much slower than the next ones."""
+
+    def __init__(self, result, delays):
+        super().__init__(result)
+        self.delays = list(delays)
+        self.started = 0
+        self.peak = 0
+        self.running = 0
+
+    async def ainvoke(self, messages):
+        delay = self.delays[min(self.started, len(self.delays) - 1)]
+        self.started += 1
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(delay)
+            return await super().ainvoke(messages)
+        finally:
+            self.running -= 1
+
+
+def make_agent(restock_result=None, batch_result=None):
+    agent = WholesalerGeminiAgent.create_default(name="Test", personality="test")
+    agent.response_cache = ResponseCache(db_path=None)
+    agent.llm = object()
+    agent.restock_llm = FakeStructuredLLM(restock_result)
+    agent.batch_llm = FakeStructuredLLM(batch_result)
+    agent._initialized = True
+    return agent
+
+
+class TestStructuredOutput(unittest.TestCase):
+    """Test cases for structured restock responses."""
+
+    def test_restock_response_is_serialized_from_the_model(self):
+        """The validated model is returned as JSON without re-parsing text."""
+        agent = make_agent(RestockResponse(
+            status="success",
+            restockable_products=[{"product_id": 1, "quantity": 4}],
+            message="ok",
+        ))
+        before = value(LLM_TOKENS, call="single", kind="output")
+        response = asyncio.run(agent.process_restock_request("restock product 1"))
+        self.assertEqual(value(LLM_TOKENS, call="single", kind="output") - before, 30)
+        self.assertEqual(json.loads(response), {
+            "status": "success",
+            "restockable_products": [{"product_id": 1, "quantity": 4}],
+            "message": "ok",
+        })
+
+    def test_invalid_output_uses_fallback(self):
+        """A schema violation from the model falls back to the local parser."""
+        agent = make_agent(ValueError("output does not match schema"))
+        response = asyncio.run(
+            agent.process_restock_request("restock product_id=2 quantity=7")
+        )
+        self.assertEqual(
+            json.loads(response)["restockable_products"],
+            [{"product_id": 2, "quantity": 7}],
+        )
+
+    def test_open_circuit_skips_gemini(self):
+        """After repeated failures Gemini is not called until recovery."""
+        agent = make_agent(RuntimeError("Gemini unavailable"))
+        agent.breaker = CircuitBreaker("gemini", failure_threshold=2, recovery_timeout=60)
+        for quantity in (1, 2, 3):
+            response = asyncio.run(agent.process_restock_request(
+                f"restock product_id=4 quantity={quantity}"
+            ))
+            self.assertEqual(
+                json.loads(response)["restockable_products"],
+                [{"product_id": 4, "quantity": quantity}],
+            )
+        self.assertTrue(agent.breaker.is_open)
+        self.assertEqual(agent.restock_llm.calls, 2)
+
+    def test_batch_entries_are_matched_by_request_id(self):
+        """Batch answers are routed by request_id; missing ones fall back."""
+        agent = make_agent(batch_result=RestockBatchResponse(responses=[
+            RestockBatchEntry(
+                request_id=1,
+                status="success",
+                restockable_products=[{"product_id": 9, "quantity": 3}],
+            ),
+        ]))
+        first, second = asyncio.run(agent.process_restock_batch([
+            "restock product_id=5 quantity=1",
+            "restock product_id=9 quantity=8",
+        ]))
+        self.assertEqual(
+            json.loads(first)["restockable_products"],
+            [{"product_id": 5, "quantity": 1}],
+        )
+        self.assertNotIn("request_id", json.loads(second))
+        self.assertEqual(
+            json.loads(second)["restockable_products"],
+            [{"product_id": 9, "quantity": 3}],
+        )
+
+
+
+@patch("src.gemini_agent.LLM_HEDGE_DEFAULT_DELAY", 0.05)
+@patch("src.gemini_agent.LLM_HEDGING_ENABLED", True)
+class TestHedging(unittest.TestCase):
+    """Test cases for hedged Gemini calls under the concurrency limiter."""
+
+    RESULT = RestockResponse(status="success", restockable_products=[], message="ok")
+
+    def _run(self, limit):
+        agent = make_agent(self.RESULT)
+        agent.restock_llm = SlowFirstLLM(self.RESULT, delays=[0.3, 0.01])
+        agent.limiter = AdaptiveConcurrencyLimiter(initial_limit=limit, max_limit=limit)
+        asyncio.run(agent.process_restock_request("restock product 1"))
+        return agent
+
+    def test_hedge_takes_its_own_slot(self):
+        """With a spare slot the hedge runs and wins, and the slow attempt is measured."""
+        agent = self._run(limit=2)
+        self.assertEqual(agent.restock_llm.started, 2)
+        self.assertEqual(agent.limiter.in_flight, 0)
+        samples = sorted(agent.latency._samples)
+        # The cancelled first attempt is recorded at least as slow as the delay
+        self.assertEqual(len(samples), 2)
+        self.assertGreaterEqual(samples[1], 0.05)
+
+    def test_no_hedge_without_a_free_slot(self):
+        """A full limiter keeps Gemini concurrency at the limit: no hedge runs."""
+        agent = self._run(limit=1)
+        self.assertEqual(agent.restock_llm.started, 1)
+        self.assertEqual(agent.restock_llm.peak, 1)
+        self.assertEqual(agent.limiter.in_flight, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+"""Tests for the durable task store."""
+
+import asyncio
+import os
+import tempfile
+import unittest
+from uuid import uuid4
+
+from a2a.types import Task, TaskState, TaskStatus
+from starlette.testclient import TestClient
+
+from src.agent_executor import WholesalerAgent, WholesalerAgentExecutor
+from src.inventory_store import InMemoryInventoryStore
+from src.server import create_app
+from src.task_store import SQLiteTaskStore
+
+
+def _task(task_id: str, context_id: str = "ctx") -> Task:
+    return Task(
+        id=task_id,
+        context_id=context_id,
+        status=TaskStatus(state=TaskState.completed),
+    )
+
+
+class TestSQLiteTaskStore(unittest.TestCase):
+    """Test cases for the SQLite task store."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "tasks.db")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_tasks_survive_restart_and_cache_is_bounded(self):
+        """Tasks evicted from the LRU front are still read from disk."""
+        async def run():
+            store = SQLiteTaskStore(self.path, cache_size=2)
+            for i in range(5):
+                await store.save(_task(f"t{i}"))
+            self.assertEqual(len(store._cache), 2)
+            self.assertEqual((await store.get("t0")).id, "t0")
+            store.close()
+
+            reopened = SQLiteTaskStore(self.path)
+            found = await reopened.get("t4")
+            by_context = await reopened.list_by_context("ctx")
+            reopened.close()
+            return found, by_context
+
+        found, by_context = asyncio.run(run())
+        self.assertEqual(found.status.state, TaskState.completed)
+        self.assertEqual([t.id for t in by_context], [f"t{i}" for i in range(5)])
+
+    def test_expired_tasks_are_evicted(self):
+        """Tasks older than the TTL are not returned and get purged."""
+        async def run():
+            store = SQLiteTaskStore(self.path, ttl=0.0, eviction_interval=0.0)
+            await store.save(_task("old"))
+            await asyncio.sleep(0.01)
+            missing = await store.get("old")
+            await store.save(_task("new"))
+            remaining = store._db_get("old")
+            store.close()
+            return missing, remaining
+
+        missing, remaining = asyncio.run(run())
+        self.assertIsNone(missing)
+        self.assertIsNone(remaining)
+
+    def test_streamed_artifacts_are_written_with_the_status(self):
+        """A restock of thousands of products is not written once per chunk."""
+        products = 3000
+        store = SQLiteTaskStore(self.path)
+        writes = []
+        db_save = store._db_save
+
+        def counting_save(task, data, updated_at):
+            writes.append(task.status.state)
+            db_save(task, data, updated_at)
+
+        store._db_save = counting_save
+        agent = WholesalerAgent(inventory=InMemoryInventoryStore(default_stock=10))
+        executor = WholesalerAgentExecutor(agent)
+        app = create_app(agent_executor=executor, task_store=store)
+        request = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "message/send",
+            "params": {"message": {
+                "role": "user",
+                "messageId": uuid4().hex,
+                "parts": [{"kind": "data", "data": {"products": [
+                    {"product_id": i, "quantity": 1} for i in range(1, products + 1)
+                ]}}],
+            }},
+        }
+
+        with TestClient(app) as client:
+            response = client.post("/", json=request, timeout=60)
+        executor.cleanup()
+        task = response.json()["result"]
+
+        self.assertEqual(task["status"]["state"], "completed")
+        self.assertEqual(len(task["artifacts"][0]["parts"]), products)
+        self.assertLess(len(writes), 20)
+        self.assertEqual(writes[-1], TaskState.completed)
+
+        stored = asyncio.run(store.get(task["id"]))
+        store.close()
+        self.assertEqual(len(stored.artifacts[0].parts), products)
+
+
+if __name__ == '__main__':
+    unittest.main()
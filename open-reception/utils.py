@@ -13,6 +13,8 @@ import requests
 import json
 import time
 
+from llm_registry import llm_key, llm_registry
+
 logger = get_logger('Langchain-Chatbot')
 logger.setLevel("DEBUG")
 
@@ -60,19 +62,24 @@ def display_msg(msg, author):
     """Display a message in the chat UI."""
     st.chat_message(author).write(msg)
 
-def configure_llm():
+def configure_llm(model=GEMINI_MODEL_NAME, temperature=0):
     # They come by default with the model
     # safety_settings = [
     #     {"category": "HARM_CATEGORY_DEROGATORY", "threshold": 1},
     #     {"category": "HARM_CATEGORY_VIOLENCE", "threshold": 2},
     #     {"category": "HARM_CATEGORY_SEXUAL", "threshold": 2},]
-    llm = ChatGoogleGenerativeAI(
-        model=GEMINI_MODEL_NAME,
-        temperature=0,
-        disable_streaming=False,
-        api_key=st.secrets["GOOGLE_API_KEY"]
+    # One client per model and temperature for the whole process. Kept in
+    # llm_registry rather than st.cache_resource, which enable_chat_history
+    # clears on page switches.
+    return llm_registry.get(
+        llm_key(model, temperature),
+        lambda: ChatGoogleGenerativeAI(
+            model=model,
+            temperature=temperature,
+            disable_streaming=False,
+            api_key=st.secrets["GOOGLE_API_KEY"]
+        ),
     )
-    return llm
 
 def print_qa(cls, question, answer):
     log_str = "\nUsecase: {}\nQuestion: {}\nAnswer: {}\n" + "------"*10